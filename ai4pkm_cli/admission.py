@@ -0,0 +1,153 @@
+"""Admission control for agent-backed web requests."""
+
+import math
+import threading
+import time
+from collections import deque, OrderedDict
+from typing import Dict, Any
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is turned away; ``retry_after`` is in seconds."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Request rejected: {reason}")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionTicket:
+    """A granted slot. ``release`` frees it and may be called more than once."""
+
+    def __init__(self, controller: "AdmissionController"):
+        self.controller = controller
+        self.started = time.monotonic()
+        self._released = False
+        self._lock = threading.Lock()
+
+    def release(self):
+        """Give the slot back."""
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        self.controller._release(time.monotonic() - self.started)
+
+
+class _Waiter:
+    def __init__(self, client: str):
+        self.client = client
+        self.event = threading.Event()
+        self.granted = False
+
+
+class AdmissionController:
+    """Bounded, per-client fair queue in front of agent calls.
+
+    At most ``max_concurrent`` requests run at once. Further requests wait
+    in a queue of at most ``max_queue`` entries, and at most
+    ``max_queue_per_client`` of those may come from one client. Free slots
+    go to waiting clients in turn, so one busy client cannot starve the
+    others. A request that cannot be queued, or waits longer than
+    ``max_wait``, is rejected with an ``AdmissionRejected`` that carries an
+    estimated ``retry_after``.
+    """
+
+    WINDOW = 200  # Recent requests used for wait and service time metrics
+
+    def __init__(self, max_concurrent: int = 4, max_queue: int = 16, max_queue_per_client: int = 4,
+                 max_wait: float = 10.0):
+        """Initialize the controller."""
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max_queue
+        self.max_queue_per_client = max_queue_per_client
+        self.max_wait = max_wait
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.queues = OrderedDict()  # client -> deque of waiters, in serving order
+        self.queued = 0
+        self.admitted = 0
+        self.rejected = {'queue_full': 0, 'client_queue_full': 0, 'wait_timeout': 0}
+        self.waits = deque(maxlen=self.WINDOW)
+        self.service_times = deque(maxlen=self.WINDOW)
+
+    def acquire(self, client: str) -> AdmissionTicket:
+        """Wait for a slot for a client's request.
+
+        Raises AdmissionRejected when the queue is full or the wait exceeds
+        ``max_wait``.
+        """
+        with self.lock:
+            if self.in_flight < self.max_concurrent and not self.queued:
+                self.in_flight += 1
+                return self._admit(0.0)
+            if self.queued >= self.max_queue:
+                raise self._reject('queue_full')
+            if len(self.queues.get(client, ())) >= self.max_queue_per_client:
+                raise self._reject('client_queue_full')
+            waiter = _Waiter(client)
+            self.queues.setdefault(client, deque()).append(waiter)
+            self.queued += 1
+
+        queued_at = time.monotonic()
+        waiter.event.wait(self.max_wait)
+        with self.lock:
+            if waiter.granted:
+                return self._admit(time.monotonic() - queued_at)
+            client_queue = self.queues[client]
+            client_queue.remove(waiter)
+            if not client_queue:
+                del self.queues[client]
+            self.queued -= 1
+            raise self._reject('wait_timeout')
+
+    def _admit(self, waited: float) -> AdmissionTicket:
+        """Count an admitted request that holds a slot. Caller must hold the lock."""
+        self.admitted += 1
+        self.waits.append(waited)
+        return AdmissionTicket(self)
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        """Count a rejection and build its error. Caller must hold the lock."""
+        self.rejected[reason] += 1
+        return AdmissionRejected(reason, self._retry_after())
+
+    def _retry_after(self) -> int:
+        """Estimate seconds until a slot frees up for a new request. Caller must hold the lock."""
+        service_time = sum(self.service_times) / len(self.service_times) if self.service_times else 5.0
+        ahead = self.queued + self.in_flight - self.max_concurrent + 1
+        return max(1, math.ceil(service_time * max(ahead, 1) / self.max_concurrent))
+
+    def _release(self, service_time: float):
+        """Free a slot and hand it to the next client in turn."""
+        with self.lock:
+            self.service_times.append(service_time)
+            self.in_flight -= 1
+            if self.queues:
+                client, client_queue = next(iter(self.queues.items()))
+                waiter = client_queue.popleft()
+                # Move the client to the back of the rotation, or drop it when it has no more waiters
+                del self.queues[client]
+                if client_queue:
+                    self.queues[client] = client_queue
+                self.queued -= 1
+                self.in_flight += 1
+                waiter.granted = True
+                waiter.event.set()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Get current queue state and recent wait times."""
+        with self.lock:
+            waits = sorted(self.waits)
+            return {
+                'in_flight': self.in_flight,
+                'max_concurrent': self.max_concurrent,
+                'queue_depth': self.queued,
+                'max_queue': self.max_queue,
+                'queued_by_client': {client: len(waiters) for client, waiters in self.queues.items()},
+                'admitted': self.admitted,
+                'rejected': dict(self.rejected),
+                'wait_p50': waits[len(waits) // 2] if waits else 0.0,
+                'wait_p95': waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0,
+                'wait_max': waits[-1] if waits else 0.0,
+            }
@@ -1,8 +1,11 @@
 """Factory for creating AI agents based on configuration."""
 
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 from .config import Config
-from .agents import BaseAgent, ClaudeAgent, GeminiAgent, CodexAgent
+from .agents import BaseAgent, ClaudeAgent, GeminiAgent, CodexAgent, ReplayAgent
+from .agents.response_cache import ResponseCache
+from .agent_pool import AgentPool, PooledAgent, CircuitBreaker
 
 
 class AgentFactory:
@@ -11,16 +14,19 @@ class AgentFactory:
     AGENT_CLASSES = {
         'claude_code': ClaudeAgent,
         'gemini_cli': GeminiAgent,
-        'codex_cli': CodexAgent
+        'codex_cli': CodexAgent,
+        'replay': ReplayAgent
     }
     
     @classmethod
-    def create_agent(cls, logger, config: Optional[Config] = None) -> BaseAgent:
+    def create_agent(cls, logger, config: Optional[Config] = None, pooled: bool = False) -> BaseAgent:
         """Create an agent based on configuration.
         
         Args:
             logger: Logger instance
             config: Configuration instance (will create default if None)
+            pooled: Return an AgentPool over all available agents when
+                agent_pool.enabled is set, with the default agent preferred
             
         Returns:
             BaseAgent instance
@@ -30,16 +36,31 @@ class AgentFactory:
         """
         if config is None:
             config = Config()
-            
+
+        agent = None
+        if pooled and config.get_agent_pool_config()['enabled']:
+            agent = cls._create_pool(logger, config)
+        if agent is None:
+            agent = cls._create_agent(logger, config)
+
+        cache_config = config.get_response_cache_config()
+        if cache_config['enabled']:
+            agent.response_cache = ResponseCache(
+                max_bytes=int(cache_config['max_mb'] * 1024 * 1024),
+                max_age=cache_config['max_age_days'] * 24 * 3600,
+            )
+        return agent
+
+    @classmethod
+    def _create_agent(cls, logger, config: Config) -> BaseAgent:
+        """Create the configured agent, falling back when it is not available."""
         agent_type = config.get_agent()
-        agent_config = config.get_agent_config(agent_type)
         
         if agent_type not in cls.AGENT_CLASSES:
             raise ValueError(f"Unknown agent type: {agent_type}. Available: {list(cls.AGENT_CLASSES.keys())}")
             
         # Create the agent
-        agent_class = cls.AGENT_CLASSES[agent_type]
-        agent = agent_class(logger, agent_config)
+        agent = cls._build_agent(logger, config, agent_type)
         
         # Check if agent is available
         if not agent.is_available():
@@ -50,6 +71,51 @@ class AgentFactory:
         logger.info(f"🤖 Using agent: {agent.get_agent_name()}")
         return agent
         
+    @classmethod
+    def _build_agent(cls, logger, config: Config, agent_type: str) -> BaseAgent:
+        """Instantiate an agent of a type, wiring up a replay agent's record source."""
+        agent = cls.AGENT_CLASSES[agent_type](logger, config.get_agent_config(agent_type))
+        if agent_type == 'replay':
+            cls._attach_record_source(logger, config, agent)
+        return agent
+
+    @classmethod
+    def _attach_record_source(cls, logger, config: Config, agent: ReplayAgent):
+        """Set the real agent a replay agent records from, if configured."""
+        source_type = agent.config.get('record_from')
+        if not source_type:
+            return
+        if source_type not in cls.AGENT_CLASSES or source_type == 'replay':
+            raise ValueError(f"Invalid replay record_from agent: {source_type}")
+        agent.source = cls.AGENT_CLASSES[source_type](logger, config.get_agent_config(source_type))
+
+    @classmethod
+    def _create_pool(cls, logger, config: Config) -> Optional[AgentPool]:
+        """Create a pool of the configured agents that are available, or None if none is."""
+        pool_config = config.get_agent_pool_config()
+        default_agent = config.get_agent()
+        agent_types = sorted(pool_config['agents'], key=lambda agent_type: agent_type != default_agent)
+
+        members = []
+        for agent_type in agent_types:
+            if agent_type not in cls.AGENT_CLASSES:
+                logger.warning(f"Unknown agent type in agent_pool: {agent_type}")
+                continue
+            agent = cls._build_agent(logger, config, agent_type)
+            if agent.is_available():
+                breaker = CircuitBreaker(pool_config['breaker_failures'], pool_config['breaker_reset_seconds'])
+                members.append(PooledAgent(agent, pool_config['max_concurrent'].get(agent_type, 1), breaker))
+            else:
+                logger.debug(f"Agent {agent.get_agent_name()} is not available, leaving it out of the pool")
+
+        if not members:
+            logger.warning("No agents available for the agent pool")
+            return None
+
+        pool = AgentPool(logger, members)
+        logger.info(f"🤖 Using agent: {pool.get_agent_name()}")
+        return pool
+
     @classmethod
     def _create_fallback_agent(cls, logger, config: Config, exclude: str) -> BaseAgent:
         """Create fallback agent if primary agent is not available."""
@@ -75,33 +141,35 @@ class AgentFactory:
         # If no fallback is available, return the original agent anyway
         # (it may have a fallback mode)
         logger.warning("No available agents found, using original agent with potential fallback mode")
-        agent_config = config.get_agent_config(exclude)
-        agent_class = cls.AGENT_CLASSES[exclude]
-        return agent_class(logger, agent_config)
+        return cls._build_agent(logger, config, exclude)
         
     @classmethod
     def list_available_agents(cls, logger) -> list:
-        """List all available agents with their status."""
-        available_agents = []
-        
-        for agent_type, agent_class in cls.AGENT_CLASSES.items():
+        """List all available agents with their status, probing them in parallel."""
+
+        def probe(agent_type, agent_class):
             try:
                 # Create temporary config for testing
                 temp_config = {}
                 agent = agent_class(logger, temp_config)
-                status = "✅ Available" if agent.is_available() else "❌ Not Available"
-                available_agents.append({
+                available = agent.is_available()
+                return {
                     'type': agent_type,
                     'name': agent.get_agent_name(),
-                    'status': status,
-                    'available': agent.is_available()
-                })
+                    'status': "✅ Available" if available else "❌ Not Available",
+                    'available': available
+                }
             except Exception as e:
-                available_agents.append({
+                return {
                     'type': agent_type,
                     'name': f"Error: {e}",
                     'status': "❌ Error",
                     'available': False
-                })
-                
-        return available_agents
+                }
+
+        with ThreadPoolExecutor(max_workers=len(cls.AGENT_CLASSES)) as executor:
+            futures = [
+                executor.submit(probe, agent_type, agent_class)
+                for agent_type, agent_class in cls.AGENT_CLASSES.items()
+            ]
+            return [future.result() for future in futures]
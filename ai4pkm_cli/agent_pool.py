@@ -0,0 +1,505 @@
+"""Pool of agents with load balancing and call-time failover."""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Optional, Tuple, Dict, Any, List, AsyncIterator, Iterator, Callable
+
+from .agents import BaseAgent, AgentTimeoutError
+from .rate_limiter import RateLimiter
+
+
+class CircuitBreaker:
+    """Stop routing to an agent after repeated failures.
+
+    After ``failure_threshold`` consecutive failures or timeouts the
+    circuit opens and the agent is skipped for ``reset_timeout`` seconds.
+    Then one trial call is let through: success closes the circuit, and
+    another failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 60):
+        """Initialize a closed circuit."""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_started_at = None
+        self.lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Get 'closed', 'open' or 'half_open'."""
+        with self.lock:
+            if self.opened_at is None:
+                return "closed"
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return "open"
+            return "half_open"
+
+    def is_allowed(self) -> bool:
+        """Check whether a call may be routed here, without claiming the trial call."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "open":
+            return False
+        with self.lock:
+            return not self._trial_pending(time.monotonic())
+
+    def allow(self) -> bool:
+        """Check whether a call may be sent here, claiming the trial call when half open.
+
+        Only call this for the call that is actually dispatched; use
+        ``is_allowed`` to rank agents.
+        """
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "open":
+            return False
+        with self.lock:
+            now = time.monotonic()
+            if self._trial_pending(now):
+                return False
+            self.trial_started_at = now
+            return True
+
+    def _trial_pending(self, now: float) -> bool:
+        """Check for a claimed trial call. Caller must hold the lock."""
+        # A claimed trial that was never reported back expires, so the agent is not skipped forever
+        return self.trial_started_at is not None and now - self.trial_started_at < self.reset_timeout
+
+    def record_success(self):
+        """Close the circuit."""
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_started_at = None
+
+    def record_failure(self):
+        """Count a failure, opening the circuit at the threshold."""
+        with self.lock:
+            self.failures += 1
+            self.trial_started_at = None
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class PooledAgent:
+    """An agent in the pool with its concurrency cap, rolling stats and circuit breaker."""
+
+    STATS_WINDOW = 20  # Recent calls used for latency and error rate
+    DEFAULT_LATENCY = 10.0  # Assumed seconds per call before any call finished
+
+    def __init__(self, agent: BaseAgent, max_concurrent: int, breaker: Optional[CircuitBreaker] = None):
+        """Initialize pooled agent."""
+        self.agent = agent
+        self.max_concurrent = max(1, max_concurrent)
+        self.breaker = breaker or CircuitBreaker()
+        self.in_flight = 0
+        self.calls = deque(maxlen=self.STATS_WINDOW)  # (duration, success)
+        self.lock = threading.Lock()
+        self._semaphore = None
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """Concurrency cap, created on the event loop that first uses it."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        return self._semaphore
+
+    def latency(self) -> float:
+        """Mean duration of recent successful calls."""
+        with self.lock:
+            durations = [duration for duration, success in self.calls if success]
+        return sum(durations) / len(durations) if durations else self.DEFAULT_LATENCY
+
+    def error_rate(self) -> float:
+        """Share of recent calls that failed."""
+        with self.lock:
+            if not self.calls:
+                return 0.0
+            return sum(1 for _, success in self.calls if not success) / len(self.calls)
+
+    def score(self) -> float:
+        """Expected cost of sending one more call here; lower is better."""
+        load = (self.in_flight + 1) / self.max_concurrent
+        return load * self.latency() * (1 + 4 * self.error_rate())
+
+    def record(self, duration: float, success: bool):
+        """Record the outcome of a call."""
+        with self.lock:
+            self.calls.append((duration, success))
+        if success:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get current load and rolling stats."""
+        return {
+            'type': self.agent.agent_type,
+            'name': self.agent.get_agent_name(),
+            'in_flight': self.in_flight,
+            'max_concurrent': self.max_concurrent,
+            'latency': self.latency(),
+            'error_rate': self.error_rate(),
+            'circuit': self.breaker.state,
+        }
+
+
+class PoolResult(tuple):
+    """A (result, session_id) answer from the pool that also holds the member ``agent`` that gave it.
+
+    The member's ``agent_seconds`` (see ``ReplayResult``) is kept as well.
+    """
+
+    def __new__(cls, result: Tuple[str, Optional[str]], agent: BaseAgent):
+        answer = super().__new__(cls, result)
+        answer.agent = agent
+        answer.agent_seconds = getattr(result, 'agent_seconds', None)
+        return answer
+
+
+def answered_by(result, agent: BaseAgent) -> str:
+    """Get the display name of the agent that produced a ``run_prompt`` result.
+
+    For a pool this is the member that answered, so history is recorded
+    per agent rather than for the pool as a whole.
+    """
+    if isinstance(result, PoolResult):
+        return result.agent.get_agent_name()
+    return agent.get_agent_name()
+
+
+class _MemberAnswer:
+    """Holds back a member's session ids until it is chosen to answer, then reports them.
+
+    Runs on the event loop, so a failed or cancelled attempt never reports
+    its session to the caller.
+    """
+
+    def __init__(self, member: PooledAgent, on_session: Optional[Callable[[str], None]],
+                 on_agent: Optional[Callable[[BaseAgent], None]]):
+        self.member = member
+        self.on_session = on_session
+        self.on_agent = on_agent
+        self.session_ids = []
+        self.chosen = False
+
+    def session(self, session_id: str):
+        """Report a session id, or hold it until the member is chosen."""
+        if not self.chosen:
+            self.session_ids.append(session_id)
+        elif self.on_session is not None:
+            self.on_session(session_id)
+
+    def choose(self):
+        """Commit the answer to this member."""
+        self.chosen = True
+        if self.on_agent is not None:
+            self.on_agent(self.member.agent)
+        for session_id in self.session_ids:
+            self.session(session_id)
+
+
+class AgentPool(BaseAgent):
+    """Route prompts across Claude, Gemini and Codex.
+
+    Each prompt goes to the eligible agent with the lowest expected cost,
+    based on its current load against its concurrency cap and its recent
+    latency and error rate. Agents whose circuit breaker is open are
+    skipped. If the chosen agent fails, the next best one is tried. The
+    pool is itself an agent, so the server, the cron scheduler and
+    commands can share one instance.
+
+    ``rate_limiters`` (agent type -> RateLimiter) make calls to a member
+    wait for its limiter; see ``rate_limited``.
+    """
+
+    agent_type = 'pool'
+
+    def __init__(self, logger, members: List[PooledAgent]):
+        """Initialize the pool with its member agents, in preference order."""
+        # Each member's semaphore caps its calls, so the pool itself is not bounded
+        super().__init__(logger, {})
+        self.members = members
+        self.rate_limiters = {}
+
+    def is_available(self) -> bool:
+        """Check if any member agent is available."""
+        return any(member.agent.is_available() for member in self.members)
+
+    def get_agent_name(self) -> str:
+        """Get the display name of this pool."""
+        return f"Agent Pool ({', '.join(member.agent.get_agent_name() for member in self.members)})"
+
+    def get_member(self, agent_type: str) -> Optional[PooledAgent]:
+        """Get the pooled agent of a type, if it is in the pool."""
+        for member in self.members:
+            if member.agent.agent_type == agent_type:
+                return member
+        return None
+
+    def pinned(self, agent_type: str) -> Optional["AgentPool"]:
+        """Get a view of the pool that only uses one agent, sharing its cap and stats."""
+        member = self.get_member(agent_type)
+        if member is None:
+            return None
+        pool = AgentPool(self.logger, [member])
+        pool.response_cache = self.response_cache
+        pool.rate_limiters = self.rate_limiters
+        return pool
+
+    def rate_limited(self, limiters: Dict[str, Optional[RateLimiter]]) -> "AgentPool":
+        """Get a view of the pool whose calls to each agent type wait for its limiter, sharing caps and stats.
+
+        Agent types without a limiter are not limited.
+        """
+        pool = AgentPool(self.logger, self.members)
+        pool.response_cache = self.response_cache
+        pool.rate_limiters = {agent_type: limiter for agent_type, limiter in limiters.items() if limiter}
+        return pool
+
+    def _cache_agent_types(self) -> List[str]:
+        """Any member may answer, so a cached response of any member's type will do."""
+        return [member.agent.agent_type for member in self.members]
+
+    def _answer_agent_type(self, result: Tuple[str, Optional[str]]) -> str:
+        """Cache a response under the member that gave it, not under 'pool'."""
+        if isinstance(result, PoolResult):
+            return result.agent.agent_type
+        return self.agent_type
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Get load and rolling stats for each member."""
+        return [member.stats() for member in self.members]
+
+    def _candidates(self) -> List[PooledAgent]:
+        """Get members in the order they should be tried for the next call.
+
+        Members with an open circuit come last, so they are only used when
+        every other agent has failed as well. A member's rate limit wait
+        counts towards its cost.
+        """
+        # Stable sort keeps the configured preference order on ties
+        ranked = sorted(self.members, key=lambda member: member.score() + self._rate_wait(member))
+        allowed = [member for member in ranked if member.breaker.is_allowed()]
+        return allowed + [member for member in ranked if member not in allowed]
+
+    def _rate_wait(self, member: PooledAgent) -> float:
+        limiter = self.rate_limiters.get(member.agent.agent_type)
+        return limiter.wait_time() if limiter else 0.0
+
+    async def _acquire_rate(self, member: PooledAgent):
+        """Wait for the member's rate limit, if it has one."""
+        limiter = self.rate_limiters.get(member.agent.agent_type)
+        if limiter is not None:
+            await limiter.aacquire()
+
+    async def arun_prompt(self, inline_prompt: Optional[str] = None, prompt_name: Optional[str] = None,
+                          params: Optional[Dict[str, Any]] = None, context: Optional[str] = None,
+                          session_id: Optional[str] = None,
+                          timeout: Optional[float] = None) -> Optional[Tuple[str, Optional[str]]]:
+        """Run a prompt on the best agent, failing over to the others on errors.
+
+        A timeout is not retried on another agent, since that would double
+        the time the caller already allowed; it is recorded and re-raised.
+        """
+        for member in self._candidates():
+            # Claims a half-open circuit's trial; members with open circuits are only reached as a last resort
+            member.breaker.allow()
+            # Calls waiting for a slot count as load, so routing spreads them out
+            member.in_flight += 1
+            started = time.monotonic()
+            try:
+                await self._acquire_rate(member)
+                async with member.semaphore:
+                    started = time.monotonic()
+                    result = await member.agent.arun_prompt(
+                        inline_prompt, prompt_name, params, context, session_id, timeout
+                    )
+            except AgentTimeoutError:
+                member.record(time.monotonic() - started, False)
+                raise
+            except Exception as e:
+                self.logger.warning(f"{member.agent.get_agent_name()} failed, trying next agent: {e}")
+                result = None
+            finally:
+                member.in_flight -= 1
+
+            success = bool(result and result[0])
+            member.record(time.monotonic() - started, success)
+            if success:
+                return PoolResult(result, member.agent)
+            self.logger.warning(f"No response from {member.agent.get_agent_name()}, trying next agent")
+
+        self.logger.error("All agents in the pool failed")
+        return None
+
+    async def _stream_member(self, member: PooledAgent, args: tuple) -> AsyncIterator[str]:
+        """Stream from one member within its cap, recording the outcome.
+
+        Raises ValueError if the agent finished without any output. A
+        cancelled stream (e.g. the losing side of a hedge) is not recorded.
+        """
+        # Claims a half-open circuit's trial; members with open circuits are only reached as a last resort
+        member.breaker.allow()
+        member.in_flight += 1
+        started = time.monotonic()
+        streamed = False
+        try:
+            await self._acquire_rate(member)
+            async with member.semaphore:
+                started = time.monotonic()
+                async for chunk in member.agent.astream_prompt(*args):
+                    streamed = True
+                    yield chunk
+        except Exception:
+            member.record(time.monotonic() - started, False)
+            raise
+        finally:
+            member.in_flight -= 1
+
+        member.record(time.monotonic() - started, streamed)
+        if not streamed:
+            raise ValueError(f"No response from {member.agent.get_agent_name()}")
+
+    async def astream_prompt(self, inline_prompt: Optional[str] = None, prompt_name: Optional[str] = None,
+                             params: Optional[Dict[str, Any]] = None, context: Optional[str] = None,
+                             session_id: Optional[str] = None,
+                             timeout: Optional[float] = None,
+                             on_session: Optional[Callable[[str], None]] = None,
+                             on_agent: Optional[Callable[[BaseAgent], None]] = None) -> AsyncIterator[str]:
+        """Stream a prompt from the best agent, failing over until one produces output.
+
+        Once an agent has streamed its first chunk the response is committed
+        to it, and later errors are raised to the caller. ``on_agent`` is
+        called with the member agent the response is committed to.
+        """
+        for member in self._candidates():
+            answer = _MemberAnswer(member, on_session, on_agent)
+            args = (inline_prompt, prompt_name, params, context, session_id, timeout, answer.session)
+            streamed = False
+            try:
+                async for chunk in self._stream_member(member, args):
+                    if not streamed:
+                        answer.choose()
+                    streamed = True
+                    yield chunk
+                return
+            except AgentTimeoutError:
+                raise
+            except Exception as e:
+                if streamed:
+                    raise
+                self.logger.warning(f"{member.agent.get_agent_name()} failed, trying next agent: {e}")
+
+        self.logger.error("All agents in the pool failed")
+
+    async def astream_prompt_hedged(self, inline_prompt: Optional[str] = None, hedge_after: float = 2.0,
+                                    timeout: Optional[float] = None, context: Optional[str] = None,
+                                    on_session: Optional[Callable[[str], None]] = None,
+                                    on_agent: Optional[Callable[[BaseAgent], None]] = None) -> AsyncIterator[str]:
+        """Stream a prompt, starting it on a second agent if the first is slow.
+
+        If the best agent has not produced a first chunk within
+        ``hedge_after`` seconds (or fails before producing one), the same
+        prompt is started on the next agent. The response comes from
+        whichever agent streams first, and the other call is cancelled.
+        ``on_session`` and ``on_agent`` only hear about the winner.
+        """
+        candidates = self._candidates()
+        if len(candidates) < 2:
+            async for chunk in self.astream_prompt(inline_prompt, None, None, context, None, timeout,
+                                                   on_session, on_agent):
+                yield chunk
+            return
+
+        events = asyncio.Queue()
+        answers = [_MemberAnswer(member, on_session, on_agent) for member in candidates[:2]]
+
+        async def run(index: int, member: PooledAgent):
+            args = (inline_prompt, None, None, context, None, timeout, answers[index].session)
+            try:
+                async for chunk in self._stream_member(member, args):
+                    await events.put((index, "chunk", chunk))
+                await events.put((index, "done", None))
+            except Exception as e:
+                await events.put((index, "error", e))
+
+        tasks = [asyncio.ensure_future(run(0, candidates[0]))]
+        finished = set()
+        winner = None
+        loop = asyncio.get_event_loop()
+        hedge_at = loop.time() + hedge_after
+        try:
+            while True:
+                hedging = winner is None and len(tasks) == 1
+                wait = max(hedge_at - loop.time(), 0) if hedging else None
+                try:
+                    index, kind, value = await asyncio.wait_for(events.get(), wait)
+                except asyncio.TimeoutError:
+                    self.logger.info(
+                        f"No output from {candidates[0].agent.get_agent_name()} after {hedge_after:g}s, "
+                        f"hedging with {candidates[1].agent.get_agent_name()}"
+                    )
+                    tasks.append(asyncio.ensure_future(run(1, candidates[1])))
+                    continue
+
+                if winner is None:
+                    if kind == "chunk":
+                        winner = index
+                        answers[winner].choose()
+                        for other, task in enumerate(tasks):
+                            if other != winner:
+                                task.cancel()
+                    else:
+                        finished.add(index)
+                        self.logger.warning(f"{candidates[index].agent.get_agent_name()} failed: {value}")
+                        if len(tasks) == 1:
+                            # Failed before the hedge delay; start the backup right away
+                            tasks.append(asyncio.ensure_future(run(1, candidates[1])))
+                        elif len(finished) == len(tasks):
+                            if isinstance(value, AgentTimeoutError):
+                                raise value
+                            self.logger.error("All hedged agents failed")
+                            return
+                        continue
+
+                if index != winner:
+                    continue
+                if kind == "chunk":
+                    yield value
+                elif kind == "done":
+                    return
+                else:
+                    raise value
+        finally:
+            for task in tasks:
+                task.cancel()
+            # Let the cancelled calls release their slots and subprocesses before returning
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stream_prompt(self, inline_prompt: Optional[str] = None, prompt_name: Optional[str] = None,
+                      params: Optional[Dict[str, Any]] = None, context: Optional[str] = None,
+                      session_id: Optional[str] = None,
+                      timeout: Optional[float] = None,
+                      on_session: Optional[Callable[[str], None]] = None,
+                      on_agent: Optional[Callable[[BaseAgent], None]] = None) -> Iterator[str]:
+        """Yield chunks of a pooled prompt from a sync caller. See ``astream_prompt``."""
+        return self._iterate_on_loop(
+            self.astream_prompt(inline_prompt, prompt_name, params, context, session_id, timeout,
+                                on_session, on_agent)
+        )
+
+    def stream_prompt_hedged(self, inline_prompt: Optional[str] = None, hedge_after: float = 2.0,
+                             timeout: Optional[float] = None, context: Optional[str] = None,
+                             on_session: Optional[Callable[[str], None]] = None,
+                             on_agent: Optional[Callable[[BaseAgent], None]] = None) -> Iterator[str]:
+        """Yield chunks of a hedged prompt from a sync caller. See ``astream_prompt_hedged``."""
+        return self._iterate_on_loop(
+            self.astream_prompt_hedged(inline_prompt, hedge_after, timeout, context, on_session, on_agent)
+        )
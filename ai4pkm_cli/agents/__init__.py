@@ -1,8 +1,9 @@
 """AI Agents package for AI4PKM CLI."""
 
-from .base_agent import BaseAgent
+from .base_agent import BaseAgent, AgentTimeoutError
 from .claude_agent import ClaudeAgent
 from .gemini_agent import GeminiAgent
 from .codex_agent import CodexAgent
+from .replay_agent import ReplayAgent
 
-__all__ = ['BaseAgent', 'ClaudeAgent', 'GeminiAgent', 'CodexAgent']
+__all__ = ['BaseAgent', 'AgentTimeoutError', 'ClaudeAgent', 'GeminiAgent', 'CodexAgent', 'ReplayAgent']
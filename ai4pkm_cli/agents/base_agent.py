@@ -1,21 +1,96 @@
 """Abstract base class for AI agents."""
 
+import asyncio
+import os
+import queue
+import signal
 from abc import ABC, abstractmethod
-from typing import Optional, Tuple, Dict, Any
+from typing import Optional, Tuple, Dict, Any, List, AsyncIterator, Iterator, Callable
+
+from .event_loop import get_background_loop
+from ..prompt_templates import Template, load_template, render_template
+
+
+class AgentTimeoutError(Exception):
+    """Raised when an agent call exceeds its timeout.
+
+    The output produced before the call was cancelled is kept in
+    ``partial_output`` so callers can still see what was generated.
+    """
+
+    def __init__(self, agent_name: str, timeout: float, partial_output: str = ""):
+        super().__init__(f"{agent_name} timed out after {timeout:g}s")
+        self.agent_name = agent_name
+        self.timeout = timeout
+        self.partial_output = partial_output or ""
 
 
 class BaseAgent(ABC):
-    """Abstract base class for AI agents."""
-    
+    """Abstract base class for AI agents.
+
+    Agents implement the coroutine ``arun_prompt``; ``run_prompt`` is a
+    blocking wrapper that runs it on the shared background event loop, so
+    async callers can fan out many prompts from one thread. Likewise
+    ``stream_prompt`` is a blocking generator over ``astream_prompt``.
+    Calls through these wrappers are capped at the agent config's
+    ``max_concurrent_queries``, if set.
+    """
+
+    agent_type = None  # Config key of this agent, e.g. 'claude_code'
+    supports_sessions = False  # Whether a returned session_id can be resumed
+
     def __init__(self, logger, config: Dict[str, Any]):
         """Initialize agent with logger and configuration."""
         self.logger = logger
         self.config = config
-        
+        self.response_cache = None  # Opt-in ResponseCache, set by AgentFactory
+        self._query_slots = None
+
+    def run_prompt(self, inline_prompt: Optional[str] = None, prompt_name: Optional[str] = None,
+                   params: Optional[Dict[str, Any]] = None, context: Optional[str] = None,
+                   session_id: Optional[str] = None,
+                   timeout: Optional[float] = None, use_cache: bool = True,
+                   cache_files: Optional[List[str]] = None) -> Optional[Tuple[str, Optional[str]]]:
+        """Run a prompt and block until it finishes. See ``arun_prompt``.
+
+        When a response cache is configured, a response to the same prepared
+        prompt (and the same content of ``cache_files``) is returned without
+        calling the agent. Pass ``use_cache=False`` to bypass it. Prompts that
+        continue a session are never cached. Responses are keyed by the type
+        of the agent that gave them.
+        """
+        prompt_content = None
+        if self.response_cache is not None and use_cache and session_id is None:
+            prompt_content = self._prepare_prompt_content(inline_prompt, prompt_name, params, context)
+        if prompt_content is not None:
+            for agent_type in self._cache_agent_types():
+                cached = self.response_cache.get(self.response_cache.make_key(agent_type, prompt_content, cache_files))
+                if cached is not None:
+                    self.logger.debug(f"Response cache hit for {self.get_agent_name()} ({agent_type})")
+                    return cached, None
+
+        loop = get_background_loop()
+        result = loop.run(self._bounded(
+            self.arun_prompt(inline_prompt, prompt_name, params, context, session_id, timeout)
+        ))
+        if prompt_content is not None and result and result[0]:
+            cache_key = self.response_cache.make_key(self._answer_agent_type(result), prompt_content, cache_files)
+            self.response_cache.put(cache_key, result[0])
+        return result
+
+    def _cache_agent_types(self) -> List[str]:
+        """Get the agent types whose cached responses may answer this agent's prompts, in preference order."""
+        return [self.agent_type]
+
+    def _answer_agent_type(self, result: Tuple[str, Optional[str]]) -> str:
+        """Get the agent type a response is cached under."""
+        return self.agent_type
+
     @abstractmethod
-    def run_prompt(self, inline_prompt: Optional[str] = None, prompt_name: Optional[str] = None, 
-                   params: Optional[Dict[str, Any]] = None, context: Optional[str] = None, 
-                   session_id: Optional[str] = None) -> Optional[Tuple[str, Optional[str]]]:
+    async def arun_prompt(self, inline_prompt: Optional[str] = None, prompt_name: Optional[str] = None,
+                          params: Optional[Dict[str, Any]] = None, context: Optional[str] = None,
+                          session_id: Optional[str] = None,
+                          timeout: Optional[float] = None) -> Optional[Tuple[str, Optional[str]]]:
         """Run a prompt and return (result, session_id).
         
         Args:
@@ -24,12 +99,86 @@ class BaseAgent(ABC):
             params: Template parameters for prompt substitution
             context: Additional context to append to prompt
             session_id: Session ID for continued conversations
+            timeout: Seconds before the call is cancelled (agent config 'timeout' if None)
             
         Returns:
             Tuple of (result_text, session_id) or None if failed
+            
+        Raises:
+            AgentTimeoutError: If the call is cancelled after the timeout
         """
         pass
         
+    async def astream_prompt(self, inline_prompt: Optional[str] = None, prompt_name: Optional[str] = None,
+                             params: Optional[Dict[str, Any]] = None, context: Optional[str] = None,
+                             session_id: Optional[str] = None,
+                             timeout: Optional[float] = None,
+                             on_session: Optional[Callable[[str], None]] = None) -> AsyncIterator[str]:
+        """Yield response text chunks as the agent produces them.
+
+        Agents without native streaming yield the whole response once.
+        Arguments are the same as ``arun_prompt``; ``on_session`` is called
+        with the agent's session id once it is known, for agents that have
+        sessions.
+        """
+        result = await self.arun_prompt(inline_prompt, prompt_name, params, context, session_id, timeout)
+        if result and result[0]:
+            if result[1] and on_session is not None:
+                on_session(result[1])
+            yield result[0]
+
+    def stream_prompt(self, inline_prompt: Optional[str] = None, prompt_name: Optional[str] = None,
+                      params: Optional[Dict[str, Any]] = None, context: Optional[str] = None,
+                      session_id: Optional[str] = None,
+                      timeout: Optional[float] = None,
+                      on_session: Optional[Callable[[str], None]] = None) -> Iterator[str]:
+        """Yield response text chunks from a sync caller as soon as they arrive.
+
+        Closing the generator early (e.g. the client disconnected) cancels
+        the agent call. ``on_session`` is called from the event loop thread.
+        """
+        return self._iterate_on_loop(
+            self.astream_prompt(inline_prompt, prompt_name, params, context, session_id, timeout, on_session)
+        )
+
+    def _iterate_on_loop(self, stream: AsyncIterator[str]) -> Iterator[str]:
+        """Consume an async stream on the background loop from a sync caller."""
+        chunks = queue.Queue()
+
+        async def pump():
+            try:
+                async for chunk in stream:
+                    chunks.put(("chunk", chunk))
+            except Exception as e:
+                chunks.put(("error", e))
+            finally:
+                chunks.put(("done", None))
+
+        loop = get_background_loop()
+        future = loop.submit(self._bounded(pump()))
+        try:
+            while True:
+                kind, value = chunks.get()
+                if kind == "chunk":
+                    yield value
+                elif kind == "error":
+                    raise value
+                else:
+                    return
+        finally:
+            future.cancel()
+
+    async def _bounded(self, coro):
+        """Run a coroutine once one of this agent's query slots is free."""
+        limit = self.config.get('max_concurrent_queries')
+        if not limit:
+            return await coro
+        if self._query_slots is None:
+            # Created on the loop thread so it binds to the background loop on older Pythons
+            self._query_slots = asyncio.Semaphore(limit)
+        async with self._query_slots:
+            return await coro
+
     @abstractmethod
     def is_available(self) -> bool:
         """Check if this agent is available and properly configured."""
@@ -40,32 +189,145 @@ class BaseAgent(ABC):
         """Get the display name of this agent."""
         pass
         
-    def _load_prompt_content(self, prompt_name: str) -> Optional[str]:
-        """Load prompt content from file."""
-        import os
-        
+    def _resolve_timeout(self, timeout: Optional[float], default: Optional[float] = None) -> Optional[float]:
+        """Get the effective timeout from the call, the agent config or a default."""
+        if timeout is not None:
+            return timeout
+        return self.config.get('timeout', default)
+
+    async def _arun_subprocess(self, cmd: List[str], timeout: Optional[float],
+                               cwd: Optional[str] = None) -> Tuple[int, str, str]:
+        """Run a CLI agent command and return (returncode, stdout, stderr).
+
+        CLI agents spawn helper processes of their own, so the command runs
+        in a new session and the whole group is killed on timeout, not just
+        the parent. Output read before the timeout is kept.
+        """
+        process = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+            cwd=cwd, start_new_session=True,
+        )
+        stdout_parts, stderr_parts = [], []
+
+        async def read_stream(stream, parts):
+            while True:
+                chunk = await stream.read(4096)
+                if not chunk:
+                    break
+                parts.append(chunk)
+
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(
+                    read_stream(process.stdout, stdout_parts),
+                    read_stream(process.stderr, stderr_parts),
+                    process.wait(),
+                ),
+                timeout,
+            )
+        except asyncio.TimeoutError:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            await process.wait()
+            partial_output = b"".join(stdout_parts).decode("utf-8", errors="replace").strip()
+            raise AgentTimeoutError(self.get_agent_name(), timeout, partial_output)
+
+        stdout = b"".join(stdout_parts).decode("utf-8", errors="replace")
+        stderr = b"".join(stderr_parts).decode("utf-8", errors="replace")
+        return process.returncode, stdout, stderr
+
+    async def _astream_subprocess(self, cmd: List[str], timeout: Optional[float],
+                                  cwd: Optional[str] = None) -> AsyncIterator[str]:
+        """Run a CLI agent command and yield its stdout line by line.
+
+        The process group is killed on timeout or when the consumer stops
+        reading early.
+        """
+        process = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+            cwd=cwd, start_new_session=True, limit=1024 * 1024,
+        )
+        stderr_task = asyncio.ensure_future(process.stderr.read())
+
+        async def read_lines():
+            async for line in process.stdout:
+                yield line.decode("utf-8", errors="replace")
+
+        try:
+            async for line in self._aiter_with_timeout(read_lines(), timeout):
+                yield line
+            await process.wait()
+            if process.returncode != 0:
+                stderr = (await stderr_task).decode("utf-8", errors="replace")
+                self.logger.error(f"{self.get_agent_name()} error (exit code {process.returncode}): {stderr}")
+        finally:
+            if process.returncode is None:
+                try:
+                    os.killpg(process.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                await process.wait()
+            stderr_task.cancel()
+
+    async def _aiter_with_timeout(self, chunks: AsyncIterator[str], timeout: Optional[float]) -> AsyncIterator[str]:
+        """Re-yield chunks, raising AgentTimeoutError once ``timeout`` seconds have passed.
+
+        The source is consumed in a single task of its own, since SDK
+        iterators may not tolerate being resumed from different tasks.
+        """
+        items = asyncio.Queue()
+
+        async def pump():
+            try:
+                async for chunk in chunks:
+                    await items.put(("chunk", chunk))
+                await items.put(("done", None))
+            except Exception as e:
+                await items.put(("error", e))
+
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + timeout if timeout else None
+        producer = asyncio.ensure_future(pump())
+        received = []
+        try:
+            while True:
+                remaining = None if deadline is None else max(deadline - loop.time(), 0)
+                kind, value = await asyncio.wait_for(items.get(), remaining)
+                if kind == "chunk":
+                    received.append(value)
+                    yield value
+                elif kind == "error":
+                    raise value
+                else:
+                    return
+        except asyncio.TimeoutError:
+            raise AgentTimeoutError(self.get_agent_name(), timeout, "".join(received).strip())
+        finally:
+            producer.cancel()
+
+    def _load_prompt_template(self, prompt_name: str) -> Optional[Template]:
+        """Load a compiled prompt template, re-reading the file only when it changed."""
         prompt_file = f"_Settings_/Prompts/{prompt_name}.md"
         if not os.path.exists(prompt_file):
             self.logger.error(f"Prompt file not found: {prompt_file}")
             return None
-            
+
         try:
-            with open(prompt_file, 'r') as f:
-                return f.read()
+            return load_template(prompt_file)
         except Exception as e:
             self.logger.error(f"Error reading prompt file {prompt_file}: {e}")
             return None
-            
+
+    def _load_prompt_content(self, prompt_name: str) -> Optional[str]:
+        """Load prompt content from file."""
+        template = self._load_prompt_template(prompt_name)
+        return template.source if template else None
+
     def _replace_template_params(self, content: str, params: Dict[str, Any]) -> str:
         """Replace template parameters in content."""
-        if not params:
-            return content
-            
-        for key, value in params.items():
-            placeholder = f"{{{key}}}"
-            content = content.replace(placeholder, str(value))
-            
-        return content
+        return render_template(content, params)
         
     def _prepare_prompt_content(self, inline_prompt: Optional[str] = None, 
                                prompt_name: Optional[str] = None,
@@ -73,19 +335,16 @@ class BaseAgent(ABC):
                                context: Optional[str] = None) -> Optional[str]:
         """Prepare final prompt content with parameters and context."""
         if inline_prompt:
-            prompt_content = inline_prompt
+            prompt_content = self._replace_template_params(inline_prompt, params)
         elif prompt_name:
-            prompt_content = self._load_prompt_content(prompt_name)
-            if prompt_content is None:
+            template = self._load_prompt_template(prompt_name)
+            if template is None:
                 return None
+            prompt_content = template.render(params)
         else:
             self.logger.error("Either inline_prompt or prompt_name must be provided")
             return None
-            
-        # Replace template parameters
-        if params:
-            prompt_content = self._replace_template_params(prompt_content, params)
-            
+
         # Add context if provided
         if context:
             prompt_content = f"{prompt_content}\n\nContext:\n{context}"
@@ -2,8 +2,8 @@
 
 import os
 import asyncio
-from typing import Optional, Tuple, Dict, Any
-from .base_agent import BaseAgent
+from typing import Optional, Tuple, Dict, Any, AsyncIterator, Callable
+from .base_agent import BaseAgent, AgentTimeoutError
 
 try:
     from claude_code_sdk import query, ClaudeCodeOptions
@@ -14,7 +14,10 @@ except ImportError:
 
 class ClaudeAgent(BaseAgent):
     """Claude Code SDK agent implementation."""
-    
+
+    agent_type = 'claude_code'
+    supports_sessions = True
+
     def __init__(self, logger, config: Dict[str, Any]):
         """Initialize Claude agent."""
         super().__init__(logger, config)
@@ -43,9 +46,10 @@ class ClaudeAgent(BaseAgent):
         """Get the display name of this agent."""
         return "Claude Code"
         
-    def run_prompt(self, inline_prompt: Optional[str] = None, prompt_name: Optional[str] = None, 
-                   params: Optional[Dict[str, Any]] = None, context: Optional[str] = None, 
-                   session_id: Optional[str] = None) -> Optional[Tuple[str, Optional[str]]]:
+    async def arun_prompt(self, inline_prompt: Optional[str] = None, prompt_name: Optional[str] = None,
+                          params: Optional[Dict[str, Any]] = None, context: Optional[str] = None,
+                          session_id: Optional[str] = None,
+                          timeout: Optional[float] = None) -> Optional[Tuple[str, Optional[str]]]:
         """Run a prompt using Claude Code SDK with template parameter replacement."""
         prompt_content = self._prepare_prompt_content(inline_prompt, prompt_name, params, context)
         if prompt_content is None:
@@ -53,54 +57,109 @@ class ClaudeAgent(BaseAgent):
             
         try:
             # Use claude-code-sdk to run the prompt
-            result, session_id = self._execute_claude_prompt(prompt_content, prompt_name or inline_prompt, session_id)
+            result, session_id = await self._execute_claude_prompt(prompt_content, prompt_name or inline_prompt, session_id, timeout)
             if result:
                 return result, session_id
             else:
                 self.logger.error(f"No response received from Claude")
                 return None
                 
+        except AgentTimeoutError:
+            raise
         except Exception as e:
             self.logger.error(f"Error running prompt: {e}")
             return None
             
-    def _execute_claude_prompt(self, prompt_content: str, prompt_name: str, session_id: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
-        """Execute the prompt using Claude Code SDK."""
+    async def astream_prompt(self, inline_prompt: Optional[str] = None, prompt_name: Optional[str] = None,
+                             params: Optional[Dict[str, Any]] = None, context: Optional[str] = None,
+                             session_id: Optional[str] = None,
+                             timeout: Optional[float] = None,
+                             on_session: Optional[Callable[[str], None]] = None) -> AsyncIterator[str]:
+        """Yield text blocks as the Claude Code SDK emits them."""
+        prompt_content = self._prepare_prompt_content(inline_prompt, prompt_name, params, context)
+        if prompt_content is None:
+            return
+
+        if self.claude_client is None:
+            self.logger.warning("Claude Code SDK not available, using fallback")
+            yield self._fallback_execution(prompt_content, prompt_name or inline_prompt)
+            return
+
+        async def text_blocks():
+            separator = ""
+            reported_session = None
+            async for message in self.claude_client(prompt=prompt_content, options=self._build_options(session_id)):
+                message_session = self._extract_session_id(message)
+                if on_session is not None and message_session and message_session != reported_session:
+                    reported_session = message_session
+                    on_session(message_session)
+                extracted_text = self._extract_text(message)
+                if extracted_text:
+                    # Blocks are newline separated, as in run_prompt's result
+                    yield separator + extracted_text
+                    separator = "\n"
+
+        async for text in self._aiter_with_timeout(text_blocks(), self._resolve_timeout(timeout)):
+            yield text
+
+    def _build_options(self, session_id: Optional[str] = None):
+        """Build SDK options for a query, resuming a session when given."""
+        return ClaudeCodeOptions(
+            cwd=os.getcwd(),
+            permission_mode=self.config.get('permission_mode', 'bypassPermissions'),
+            resume=session_id,
+        )
+
+    @staticmethod
+    def _extract_session_id(message) -> Optional[str]:
+        """Get the session id from the init system message or the final result."""
+        if isinstance(getattr(message, 'session_id', None), str):
+            return message.session_id
+        if isinstance(getattr(message, 'data', None), dict):
+            return message.data.get('session_id')
+        return None
+
+    @staticmethod
+    def _extract_text(message) -> str:
+        """Extract only the text content from an SDK message."""
+        extracted_text = ""
+        if hasattr(message, 'content') and message.content:
+            if isinstance(message.content, list):
+                for block in message.content:
+                    if hasattr(block, 'text'):
+                        extracted_text += block.text
+            elif hasattr(message.content, 'text'):
+                extracted_text = message.content.text
+            elif isinstance(message.content, str):
+                extracted_text = message.content
+        return extracted_text
+
+    async def _execute_claude_prompt(self, prompt_content: str, prompt_name: str, session_id: Optional[str] = None,
+                                     timeout: Optional[float] = None) -> Tuple[Optional[str], Optional[str]]:
+        """Execute the prompt using Claude Code SDK, cancelling the query on timeout."""
         try:
             # Check if Claude client is available
             if self.claude_client is None:
                 self.logger.warning("Claude Code SDK not available, using fallback")
                 return self._fallback_execution(prompt_content, prompt_name), None
             
-            permission_mode = self.config.get('permission_mode', 'bypassPermissions')
-            options = ClaudeCodeOptions(
-                cwd=os.getcwd(),
-                permission_mode=permission_mode,
-                resume=session_id,
-            )
+            options = self._build_options(session_id)
+
+            # Collected outside the query so a timeout keeps the partial output
+            response_parts = []
+            timeout = self._resolve_timeout(timeout)
 
             # Send the prompt to Claude using async query function
             try:
                 async def run_query():
-                    response_parts = []
                     final_session_id = None
                     message_count = 0
                     
                     async for message in self.claude_client(prompt=prompt_content, options=options):
                         message_count += 1
                         
-                        # Extract only the text content from the message
-                        extracted_text = ""
-                        if hasattr(message, 'content') and message.content:
-                            if isinstance(message.content, list):
-                                for block in message.content:
-                                    if hasattr(block, 'text'):
-                                        extracted_text += block.text
-                            elif hasattr(message.content, 'text'):
-                                extracted_text = message.content.text
-                            elif isinstance(message.content, str):
-                                extracted_text = message.content
-                        elif hasattr(message, 'data') and isinstance(message.data, dict):
+                        extracted_text = self._extract_text(message)
+                        if not extracted_text and hasattr(message, 'data') and isinstance(message.data, dict):
                             final_session_id = message.data.get('session_id')
                         
                         # Append extracted text to response and log it
@@ -110,10 +169,13 @@ class ClaudeAgent(BaseAgent):
                     
                     return '\n'.join(response_parts), final_session_id
 
-                # Run the async query
-                processed_content, final_session_id = asyncio.run(run_query())
+                # wait_for cancels the query on timeout
+                processed_content, final_session_id = await asyncio.wait_for(run_query(), timeout)
                 return processed_content, final_session_id
                 
+            except asyncio.TimeoutError:
+                self.logger.error(f"Claude query timed out after {timeout:g}s")
+                raise AgentTimeoutError(self.get_agent_name(), timeout, '\n'.join(response_parts))
             except AttributeError as e:
                 self.logger.error(f"Claude SDK API mismatch: {e}")
                 return self._fallback_execution(prompt_content, prompt_name), None
@@ -121,6 +183,8 @@ class ClaudeAgent(BaseAgent):
                 self.logger.error(f"Claude API call failed: {e}")
                 return self._fallback_execution(prompt_content, prompt_name), None
             
+        except AgentTimeoutError:
+            raise
         except Exception as e:
             self.logger.error(f"Claude execution error: {e}")
             return None, None
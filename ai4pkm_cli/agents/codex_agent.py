@@ -1,13 +1,16 @@
 """Codex CLI agent implementation."""
 
 import subprocess
-from typing import Optional, Tuple, Dict, Any
-from .base_agent import BaseAgent
+from typing import Optional, Tuple, Dict, Any, AsyncIterator, List, Callable
+from .base_agent import BaseAgent, AgentTimeoutError
+from .probe_cache import get_probe_cache
 
 
 class CodexAgent(BaseAgent):
     """Codex CLI agent implementation."""
-    
+
+    agent_type = 'codex_cli'
+
     def __init__(self, logger, config: Dict[str, Any]):
         """Initialize Codex agent."""
         super().__init__(logger, config)
@@ -15,7 +18,11 @@ class CodexAgent(BaseAgent):
         # Use CLI default model when no model specified
         
     def is_available(self) -> bool:
-        """Check if Codex CLI is available."""
+        """Check if Codex CLI is available, using the shared probe cache."""
+        return get_probe_cache().is_available(self.command, self._probe_version)
+
+    def _probe_version(self) -> bool:
+        """Run `codex --version` to check that the CLI works."""
         try:
             result = subprocess.run([self.command, '--version'], 
                                   capture_output=True, text=True, timeout=10)
@@ -27,9 +34,10 @@ class CodexAgent(BaseAgent):
         """Get the display name of this agent."""
         return "Codex CLI"
         
-    def run_prompt(self, inline_prompt: Optional[str] = None, prompt_name: Optional[str] = None, 
-                   params: Optional[Dict[str, Any]] = None, context: Optional[str] = None, 
-                   session_id: Optional[str] = None) -> Optional[Tuple[str, Optional[str]]]:
+    async def arun_prompt(self, inline_prompt: Optional[str] = None, prompt_name: Optional[str] = None,
+                          params: Optional[Dict[str, Any]] = None, context: Optional[str] = None,
+                          session_id: Optional[str] = None,
+                          timeout: Optional[float] = None) -> Optional[Tuple[str, Optional[str]]]:
         """Run a prompt using Codex CLI with full_auto and search enabled by default."""
         prompt_content = self._prepare_prompt_content(inline_prompt, prompt_name, params, context)
         if prompt_content is None:
@@ -37,7 +45,7 @@ class CodexAgent(BaseAgent):
             
         try:
             # Execute the prompt using Codex CLI with full_auto and search by default
-            result = self._execute_codex_prompt(prompt_content)
+            result = await self._execute_codex_prompt(prompt_content, timeout=timeout)
             if result:
                 # Log the result
                 self.logger.info(result)
@@ -46,47 +54,70 @@ class CodexAgent(BaseAgent):
                 self.logger.error("No response received from Codex CLI")
                 return None
                 
+        except AgentTimeoutError:
+            raise
         except Exception as e:
             self.logger.error(f"Error running Codex prompt: {e}")
             return None
             
-    def _execute_codex_prompt(self, prompt_content: str) -> Optional[str]:
+    async def astream_prompt(self, inline_prompt: Optional[str] = None, prompt_name: Optional[str] = None,
+                             params: Optional[Dict[str, Any]] = None, context: Optional[str] = None,
+                             session_id: Optional[str] = None,
+                             timeout: Optional[float] = None,
+                             on_session: Optional[Callable[[str], None]] = None) -> AsyncIterator[str]:
+        """Yield Codex CLI output line by line as it is printed."""
+        prompt_content = self._prepare_prompt_content(inline_prompt, prompt_name, params, context)
+        if prompt_content is None:
+            return
+
+        cmd = self._build_codex_command(prompt_content)
+        timeout = self._resolve_timeout(timeout, default=300)
+        async for line in self._astream_subprocess(cmd, timeout):
+            yield line
+
+    def _build_codex_command(self, prompt_content: str) -> List[str]:
+        """Build the Codex CLI command line with full_auto and search enabled by default."""
+        # Build the command - flags need to come before 'exec'
+        cmd = [self.command]
+
+        # Add --search by default for Codex (global flag)
+        cmd.append('--search')
+        self.logger.debug("Added --search flag to Codex command (default)")
+
+        # Add exec subcommand and additional flags
+        cmd.append('exec')
+
+        # Always add full-auto flag (exec-specific flag)
+        cmd.append('--full-auto')
+        self.logger.debug("Added --full-auto flag to Codex command (default)")
+
+        # Add the prompt content
+        cmd.append(f'"{prompt_content}"')
+
+        # Add any additional CLI options from config
+        if 'additional_args' in self.config:
+            cmd.extend(self.config['additional_args'])
+
+        # Show full command
+        self.logger.debug(f"Executing Codex command: {' '.join(cmd)}")
+        return cmd
+
+    async def _execute_codex_prompt(self, prompt_content: str, timeout: Optional[float] = None) -> Optional[str]:
         """Execute the prompt using Codex CLI with full_auto and search enabled by default."""
         try:
-            # Build the command - flags need to come before 'exec'
-            cmd = [self.command]
-            
-            # Add --search by default for Codex (global flag)
-            cmd.append('--search')
-            self.logger.debug("Added --search flag to Codex command (default)")
-            
-            # Add exec subcommand and additional flags
-            cmd.append('exec')
+            cmd = self._build_codex_command(prompt_content)
+            timeout = self._resolve_timeout(timeout, default=300)
+            returncode, stdout, stderr = await self._arun_subprocess(cmd, timeout)
             
-            # Always add full-auto flag (exec-specific flag)
-            cmd.append('--full-auto')
-            self.logger.debug("Added --full-auto flag to Codex command (default)")
-            
-            # Add the prompt content
-            cmd.append(f'"{prompt_content}"')
-            
-            # Add any additional CLI options from config
-            if 'additional_args' in self.config:
-                cmd.extend(self.config['additional_args'])
-            
-            # Execute the command - show full command
-            self.logger.debug(f"Executing Codex command: {' '.join(cmd)}")
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
-            
-            if result.returncode == 0:
-                return result.stdout.strip()
+            if returncode == 0:
+                return stdout.strip()
             else:
-                self.logger.error(f"Codex CLI error (exit code {result.returncode}): {result.stderr}")
+                self.logger.error(f"Codex CLI error (exit code {returncode}): {stderr}")
                 return None
                 
-        except subprocess.TimeoutExpired:
-            self.logger.error("Codex CLI command timed out")
-            return None
+        except AgentTimeoutError as e:
+            self.logger.error(f"Codex CLI command timed out after {e.timeout:g}s")
+            raise
         except Exception as e:
             self.logger.error(f"Codex CLI execution error: {e}")
             return None
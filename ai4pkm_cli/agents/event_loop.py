@@ -0,0 +1,105 @@
+"""Long-lived background asyncio loop shared by agents."""
+
+import asyncio
+import concurrent.futures
+import threading
+from typing import Optional
+
+
+class BackgroundLoop:
+    """Run coroutines on one event loop owned by a daemon thread.
+
+    Sync callers (Flask request threads, cron workers, commands) submit
+    coroutines and get ``concurrent.futures.Future`` objects back, so
+    several queries can be in flight at once on a single loop instead of
+    creating and tearing down a loop per prompt with ``asyncio.run``. When
+    ``max_concurrency`` is set, at most that many submitted coroutines run
+    at the same time and the rest wait their turn on the loop; the shared
+    loop is unbounded, and each agent caps its own calls instead.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None):
+        """Initialize the loop; the thread starts on first use."""
+        self.max_concurrency = max_concurrency
+        self._loop = None
+        self._thread = None
+        self._semaphore = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        """Start the loop thread if it is not running yet."""
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                started = threading.Event()
+
+                def run_loop():
+                    asyncio.set_event_loop(loop)
+                    loop.call_soon(started.set)
+                    loop.run_forever()
+
+                self._thread = threading.Thread(target=run_loop, name="agent-event-loop", daemon=True)
+                self._thread.start()
+                started.wait()
+                self._loop = loop
+                self._semaphore = None
+            return self._loop
+
+    async def _bounded(self, coro):
+        """Run a coroutine once a concurrency slot is free."""
+        if not self.max_concurrency:
+            return await coro
+        if self._semaphore is None:
+            # Created on the loop thread so it binds to this loop on older Pythons
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            return await coro
+
+    def submit(self, coro) -> concurrent.futures.Future:
+        """Schedule a coroutine on the background loop and return its future."""
+        loop = self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(self._bounded(coro), loop)
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """Run a coroutine on the background loop and block until it finishes.
+
+        Raises ``asyncio.TimeoutError`` after ``timeout`` seconds, cancelling
+        the coroutine on the loop.
+        """
+        if self._thread is not None and threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("BackgroundLoop.run() cannot be called from the loop thread; await the coroutine instead")
+
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise asyncio.TimeoutError()
+
+    def stop(self):
+        """Stop the loop thread. A later submit starts a new one."""
+        with self._lock:
+            loop, self._loop = self._loop, None
+            thread, self._thread = self._thread, None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=5)
+            loop.close()
+
+
+_background_loop = None
+_background_loop_lock = threading.Lock()
+
+
+def get_background_loop() -> BackgroundLoop:
+    """Get the process-wide background loop, creating it on first use.
+
+    The loop does not bound concurrency itself, since agents, pools and
+    callers with different limits share it.
+    """
+    global _background_loop
+    with _background_loop_lock:
+        if _background_loop is None:
+            _background_loop = BackgroundLoop()
+        return _background_loop
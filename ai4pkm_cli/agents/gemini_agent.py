@@ -2,13 +2,16 @@
 
 import subprocess
 import os
-from typing import Optional, Tuple, Dict, Any
-from .base_agent import BaseAgent
+from typing import Optional, Tuple, Dict, Any, AsyncIterator, List, Callable
+from .base_agent import BaseAgent, AgentTimeoutError
+from .probe_cache import get_probe_cache
 
 
 class GeminiAgent(BaseAgent):
     """Gemini CLI agent implementation."""
-    
+
+    agent_type = 'gemini_cli'
+
     def __init__(self, logger, config: Dict[str, Any]):
         """Initialize Gemini agent."""
         super().__init__(logger, config)
@@ -16,7 +19,11 @@ class GeminiAgent(BaseAgent):
         # Use CLI default model when no model specified
         
     def is_available(self) -> bool:
-        """Check if Gemini CLI is available."""
+        """Check if Gemini CLI is available, using the shared probe cache."""
+        return get_probe_cache().is_available(self.command, self._probe_version)
+
+    def _probe_version(self) -> bool:
+        """Run `gemini --version` to check that the CLI works."""
         try:
             result = subprocess.run([self.command, '--version'], 
                                   capture_output=True, text=True, timeout=10)
@@ -28,9 +35,10 @@ class GeminiAgent(BaseAgent):
         """Get the display name of this agent."""
         return "Gemini CLI"
         
-    def run_prompt(self, inline_prompt: Optional[str] = None, prompt_name: Optional[str] = None, 
-                   params: Optional[Dict[str, Any]] = None, context: Optional[str] = None, 
-                   session_id: Optional[str] = None) -> Optional[Tuple[str, Optional[str]]]:
+    async def arun_prompt(self, inline_prompt: Optional[str] = None, prompt_name: Optional[str] = None,
+                          params: Optional[Dict[str, Any]] = None, context: Optional[str] = None,
+                          session_id: Optional[str] = None,
+                          timeout: Optional[float] = None) -> Optional[Tuple[str, Optional[str]]]:
         """Run a prompt using Gemini CLI with auto_edit approval mode by default."""
         prompt_content = self._prepare_prompt_content(inline_prompt, prompt_name, params, context)
         if prompt_content is None:
@@ -38,7 +46,7 @@ class GeminiAgent(BaseAgent):
             
         try:
             # Execute the prompt using Gemini CLI with auto_edit by default
-            result = self._execute_gemini_prompt(prompt_content, approval_mode='auto_edit')
+            result = await self._execute_gemini_prompt(prompt_content, approval_mode='auto_edit', timeout=timeout)
             if result:
                 # Log the result
                 self.logger.info(result)
@@ -47,42 +55,70 @@ class GeminiAgent(BaseAgent):
                 self.logger.error("No response received from Gemini CLI")
                 return None
                 
+        except AgentTimeoutError:
+            raise
         except Exception as e:
             self.logger.error(f"Error running Gemini prompt: {e}")
             return None
             
-    def _execute_gemini_prompt(self, prompt_content: str, approval_mode: Optional[str] = None) -> Optional[str]:
+    async def astream_prompt(self, inline_prompt: Optional[str] = None, prompt_name: Optional[str] = None,
+                             params: Optional[Dict[str, Any]] = None, context: Optional[str] = None,
+                             session_id: Optional[str] = None,
+                             timeout: Optional[float] = None,
+                             on_session: Optional[Callable[[str], None]] = None) -> AsyncIterator[str]:
+        """Yield Gemini CLI output line by line as it is printed."""
+        prompt_content = self._prepare_prompt_content(inline_prompt, prompt_name, params, context)
+        if prompt_content is None:
+            return
+
+        cmd = self._build_gemini_command(prompt_content, approval_mode='auto_edit')
+        timeout = self._resolve_timeout(timeout, default=300)
+        async for line in self._astream_subprocess(cmd, timeout, cwd=self._working_dir()):
+            yield line
+
+    def _build_gemini_command(self, prompt_content: str, approval_mode: Optional[str] = None) -> List[str]:
+        """Build the Gemini CLI command line for a prompt."""
+        # Build the command using -p/--prompt for non-interactive mode with quoted prompt
+        cmd = [
+            self.command,
+            '--prompt', f'"{prompt_content}"'
+        ]
+        print(prompt_content)
+
+        # Add approval mode if specified
+        if approval_mode == 'auto_edit':
+            cmd.extend(['--approval-mode', 'auto_edit'])
+            self.logger.debug("Added --approval-mode auto_edit to Gemini command")
+
+        # Add any additional CLI options from config
+        if 'additional_args' in self.config:
+            cmd.extend(self.config['additional_args'])
+
+        # Show full command
+        self.logger.debug(f"Executing Gemini command: {' '.join(cmd)}")
+        return cmd
+
+    def _working_dir(self) -> str:
+        """Get the directory the Gemini CLI runs in."""
+        return os.path.join(os.getcwd(), "Events/Bellevue_Festival_2025")
+
+    async def _execute_gemini_prompt(self, prompt_content: str, approval_mode: Optional[str] = None,
+                                     timeout: Optional[float] = None) -> Optional[str]:
         """Execute the prompt using Gemini CLI."""
         try:
-            # Build the command using -p/--prompt for non-interactive mode with quoted prompt
-            cmd = [
-                self.command,
-                '--prompt', f'"{prompt_content}"'
-            ]
-            print(prompt_content)
-            
-            # Add approval mode if specified
-            if approval_mode == 'auto_edit':
-                cmd.extend(['--approval-mode', 'auto_edit'])
-                self.logger.debug("Added --approval-mode auto_edit to Gemini command")
-            
-            # Add any additional CLI options from config
-            if 'additional_args' in self.config:
-                cmd.extend(self.config['additional_args'])
-            
-            # Execute the command - show full command
-            self.logger.debug(f"Executing Gemini command: {' '.join(cmd)}")
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=300, cwd=os.path.join(os.getcwd(), "Events/Bellevue_Festival_2025"))
+            cmd = self._build_gemini_command(prompt_content, approval_mode)
+            timeout = self._resolve_timeout(timeout, default=300)
+            returncode, stdout, stderr = await self._arun_subprocess(cmd, timeout, cwd=self._working_dir())
 
-            if result.returncode == 0:
-                return result.stdout.strip()
+            if returncode == 0:
+                return stdout.strip()
             else:
-                self.logger.error(f"Gemini CLI error (exit code {result.returncode}): {result.stderr}")
+                self.logger.error(f"Gemini CLI error (exit code {returncode}): {stderr}")
                 return None
                     
-        except subprocess.TimeoutExpired:
-            self.logger.error("Gemini CLI command timed out")
-            return None
+        except AgentTimeoutError as e:
+            self.logger.error(f"Gemini CLI command timed out after {e.timeout:g}s")
+            raise
         except Exception as e:
             self.logger.error(f"Gemini CLI execution error: {e}")
             return None
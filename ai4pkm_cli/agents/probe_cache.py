@@ -0,0 +1,92 @@
+"""Cache for CLI agent availability probes."""
+
+import json
+import os
+import shutil
+import threading
+import time
+from typing import Callable, Dict, Any
+
+
+class ProbeCache:
+    """Cache of ``<command> --version`` probe results.
+
+    Results are shared across the process and persisted in
+    ``_Settings_/Cache/agent_probes.json`` for ``ttl`` seconds, so CLI
+    starts and agent overrides do not each launch a subprocess. Entries are
+    keyed by the command's resolved path and the binary's mtime, so an
+    upgrade or reinstall is probed again right away.
+    """
+
+    TTL_SECONDS = 600
+
+    def __init__(self, cache_file=None, ttl: float = TTL_SECONDS):
+        """Initialize probe cache."""
+        if cache_file is None:
+            cache_file = os.path.join(os.getcwd(), "_Settings_", "Cache", "agent_probes.json")
+
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = self._load_entries()
+
+    def _load_entries(self) -> Dict[str, Dict[str, Any]]:
+        """Load persisted probe results, starting empty when missing or unreadable."""
+        try:
+            with open(self.cache_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_entries(self):
+        """Atomically write probe results to file. Caller must hold the lock."""
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            tmp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump(self.entries, f, indent=2)
+            os.replace(tmp_file, self.cache_file)
+        except OSError:
+            # The cache is an optimization; failing to persist it is harmless
+            pass
+
+    def is_available(self, command: str, probe: Callable[[], bool]) -> bool:
+        """Get whether a CLI command works, running ``probe`` only on a cache miss."""
+        path = shutil.which(command)
+        if path is None:
+            return False
+
+        try:
+            key = f"{path}:{os.stat(path).st_mtime_ns}"
+        except OSError:
+            return False
+
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and now - entry['checked_at'] < self.ttl:
+                return entry['available']
+
+        available = probe()
+        with self.lock:
+            # Drop expired entries, including those for replaced binaries
+            self.entries = {
+                cached_key: cached for cached_key, cached in self.entries.items()
+                if now - cached['checked_at'] < self.ttl
+            }
+            self.entries[key] = {'available': available, 'checked_at': now}
+            self._save_entries()
+        return available
+
+
+_probe_cache = None
+_probe_cache_lock = threading.Lock()
+
+
+def get_probe_cache() -> ProbeCache:
+    """Get the process-wide probe cache, creating it on first use."""
+    global _probe_cache
+    with _probe_cache_lock:
+        if _probe_cache is None:
+            _probe_cache = ProbeCache()
+        return _probe_cache
@@ -0,0 +1,228 @@
+"""Replay agent that answers from a recorded corpus or synthetic responses."""
+
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import uuid
+from typing import Optional, Tuple, Dict, Any, AsyncIterator, Callable
+from .base_agent import BaseAgent
+
+SYNTHETIC_WORDS = (
+    "note knowledge vault summary insight topic journal link idea project "
+    "task review draft source reference context question answer"
+).split()
+
+
+class ReplayResult(tuple):
+    """A (result, session_id) answer that also holds the ``agent_seconds`` it simulated."""
+
+    def __new__(cls, result: Tuple[str, Optional[str]], agent_seconds: float):
+        answer = super().__new__(cls, result)
+        answer.agent_seconds = agent_seconds
+        return answer
+
+
+class ReplayAgent(BaseAgent):
+    """Stand-in agent for offline benchmarking.
+
+    Responses come from a JSONL corpus keyed by the hash of the prepared
+    prompt. Prompts missing from the corpus get a synthetic response, unless
+    ``strict`` is set. Either way the response is streamed in chunks with a
+    sampled first-chunk latency, a fixed token rate and a failure rate, so
+    the framework can be exercised end to end without network access.
+
+    With ``record_from`` set, prompts are sent to that real agent and its
+    responses are appended to the corpus.
+
+    Replayed answers from ``run_prompt`` are ``ReplayResult`` tuples whose
+    ``agent_seconds`` is the simulated agent time, so job history can tell
+    the framework's own overhead from time spent "in the model".
+    """
+
+    agent_type = 'replay'
+    supports_sessions = True
+
+    CHUNK_TOKENS = 5  # Words per streamed chunk
+
+    def __init__(self, logger, config: Dict[str, Any]):
+        """Initialize replay agent."""
+        super().__init__(logger, config)
+        self.corpus_file = config.get('corpus', '_Settings_/Replay/corpus.jsonl')
+        self.strict = config.get('strict', False)
+        self.latency = config.get('latency', {'distribution': 'lognormal', 'median': 1.0, 'sigma': 0.5})
+        self.tokens_per_second = config.get('tokens_per_second', 50)
+        self.response_tokens = config.get('response_tokens', 200)
+        self.failure_rate = config.get('failure_rate', 0.0)
+        self.random = random.Random(config.get('seed'))
+        self.source = None  # Real agent to record from, set by AgentFactory
+        self.lock = threading.Lock()
+        self._corpus = None
+        # Total simulated agent time, to tell framework overhead from model time
+        self.simulated_seconds = 0.0
+        self.calls = 0
+
+    def is_available(self) -> bool:
+        """The replay agent needs no backend, only its corpus in strict mode."""
+        if self.source is not None:
+            return self.source.is_available()
+        return not self.strict or os.path.exists(self.corpus_file)
+
+    def get_agent_name(self) -> str:
+        """Get the display name of this agent."""
+        if self.source is not None:
+            return f"Replay (recording {self.source.get_agent_name()})"
+        return "Replay"
+
+    @staticmethod
+    def make_key(prompt_content: str) -> str:
+        """Get the corpus key of a prepared prompt."""
+        return hashlib.sha256(prompt_content.encode('utf-8')).hexdigest()
+
+    def _load_corpus(self) -> Dict[str, str]:
+        """Load the corpus on first use; a missing file is an empty corpus."""
+        with self.lock:
+            if self._corpus is None:
+                self._corpus = {}
+                try:
+                    with open(self.corpus_file, 'r', encoding='utf-8') as f:
+                        for line in f:
+                            line = line.strip()
+                            if not line:
+                                continue
+                            try:
+                                entry = json.loads(line)
+                            except ValueError:
+                                continue
+                            key = entry.get('key') or self.make_key(entry.get('prompt', ''))
+                            self._corpus[key] = entry.get('response', '')
+                except OSError:
+                    pass
+                self.logger.debug(f"Loaded {len(self._corpus)} replay responses from {self.corpus_file}")
+            return self._corpus
+
+    def _record(self, prompt_content: str, response: str):
+        """Append a response to the corpus file."""
+        key = self.make_key(prompt_content)
+        corpus = self._load_corpus()
+        with self.lock:
+            corpus[key] = response
+            try:
+                corpus_dir = os.path.dirname(self.corpus_file)
+                if corpus_dir:
+                    os.makedirs(corpus_dir, exist_ok=True)
+                with open(self.corpus_file, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({'key': key, 'prompt': prompt_content, 'response': response}) + "\n")
+            except OSError as e:
+                self.logger.error(f"Failed to record replay response: {e}")
+
+    def _synthetic_response(self, prompt_content: str) -> str:
+        """Build a deterministic filler response for a prompt."""
+        seeded = random.Random(self.make_key(prompt_content))
+        return " ".join(seeded.choice(SYNTHETIC_WORDS) for _ in range(self.response_tokens))
+
+    def _sample_latency(self) -> float:
+        """Sample the delay before the first chunk, in seconds."""
+        distribution = self.latency.get('distribution', 'constant')
+        with self.lock:
+            if distribution == 'lognormal':
+                return self.random.lognormvariate(
+                    math.log(self.latency.get('median', 1.0)), self.latency.get('sigma', 0.5)
+                )
+            if distribution == 'uniform':
+                return self.random.uniform(self.latency.get('min', 0.0), self.latency.get('max', 2.0))
+            if distribution == 'exponential':
+                return self.random.expovariate(1.0 / self.latency.get('mean', 1.0))
+        return self.latency.get('seconds', 0.0)
+
+    def _should_fail(self) -> bool:
+        with self.lock:
+            return self.random.random() < self.failure_rate
+
+    async def _replay(self, prompt_content: str, timing: Optional[Dict[str, float]] = None) -> AsyncIterator[str]:
+        """Yield a response chunk by chunk with simulated timing, adding it to ``timing['seconds']``."""
+        timing = timing if timing is not None else {'seconds': 0.0}
+        response = self._load_corpus().get(self.make_key(prompt_content))
+        if response is None:
+            if self.strict:
+                self.logger.error("Prompt not found in replay corpus")
+                return
+            response = self._synthetic_response(prompt_content)
+
+        delay = self._sample_latency()
+        self.calls += 1
+        self.simulated_seconds += delay
+        timing['seconds'] += delay
+        await asyncio.sleep(delay)
+        if self._should_fail():
+            self.logger.error("Replay agent simulated a failure")
+            return
+
+        tokens = re.findall(r"\s*\S+\s*", response) or [response]
+        for start in range(0, len(tokens), self.CHUNK_TOKENS):
+            chunk = tokens[start:start + self.CHUNK_TOKENS]
+            if start and self.tokens_per_second:
+                pause = len(chunk) / self.tokens_per_second
+                self.simulated_seconds += pause
+                timing['seconds'] += pause
+                await asyncio.sleep(pause)
+            yield "".join(chunk)
+
+    async def arun_prompt(self, inline_prompt: Optional[str] = None, prompt_name: Optional[str] = None,
+                          params: Optional[Dict[str, Any]] = None, context: Optional[str] = None,
+                          session_id: Optional[str] = None,
+                          timeout: Optional[float] = None) -> Optional[Tuple[str, Optional[str]]]:
+        """Replay the response to a prompt, or record it from the source agent."""
+        prompt_content = self._prepare_prompt_content(inline_prompt, prompt_name, params, context)
+        if prompt_content is None:
+            return None
+
+        if self.source is not None:
+            result = await self.source.arun_prompt(inline_prompt, prompt_name, params, context, session_id, timeout)
+            if result and result[0]:
+                self._record(prompt_content, result[0])
+            return result
+
+        chunks = []
+        timing = {'seconds': 0.0}
+        async for chunk in self._aiter_with_timeout(self._replay(prompt_content, timing),
+                                                    self._resolve_timeout(timeout)):
+            chunks.append(chunk)
+        if not chunks:
+            self.logger.error("No response received from Replay")
+            return None
+        # Hand out a session id so session reuse is exercised as well
+        return ReplayResult(("".join(chunks), session_id or uuid.uuid4().hex), timing['seconds'])
+
+    async def astream_prompt(self, inline_prompt: Optional[str] = None, prompt_name: Optional[str] = None,
+                             params: Optional[Dict[str, Any]] = None, context: Optional[str] = None,
+                             session_id: Optional[str] = None,
+                             timeout: Optional[float] = None,
+                             on_session: Optional[Callable[[str], None]] = None) -> AsyncIterator[str]:
+        """Stream the replayed response, or the source agent's while recording it."""
+        prompt_content = self._prepare_prompt_content(inline_prompt, prompt_name, params, context)
+        if prompt_content is None:
+            return
+
+        if self.source is not None:
+            received = []
+            async for chunk in self.source.astream_prompt(inline_prompt, prompt_name, params, context,
+                                                          session_id, timeout, on_session):
+                received.append(chunk)
+                yield chunk
+            if received:
+                self._record(prompt_content, "".join(received))
+            return
+
+        if on_session is not None:
+            on_session(session_id or uuid.uuid4().hex)
+        async for chunk in self._aiter_with_timeout(self._replay(prompt_content), self._resolve_timeout(timeout)):
+            yield chunk
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the number of replayed calls and the agent time they simulated."""
+        return {'calls': self.calls, 'simulated_seconds': self.simulated_seconds}
@@ -0,0 +1,133 @@
+"""Content-addressed cache of agent responses."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Optional, List
+
+
+class ResponseCache:
+    """On-disk cache of prompt responses for deterministic workloads.
+
+    Entries are keyed by agent type, the hash of the final prepared prompt
+    and, optionally, the hashes of vault files the prompt refers to, so an
+    edited file invalidates the entry. Entries older than ``max_age`` are
+    ignored, and the least recently used ones are evicted once the cache
+    grows past ``max_bytes``.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes: int = 50 * 1024 * 1024,
+                 max_age: float = 7 * 24 * 3600):
+        """Initialize response cache."""
+        if cache_dir is None:
+            cache_dir = os.path.join(os.getcwd(), "_Settings_", "Cache", "responses")
+
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.lock = threading.Lock()
+
+    def make_key(self, agent_type: str, prompt_content: str, files: Optional[List[str]] = None) -> str:
+        """Build the cache key for a prompt and the files it depends on."""
+        digest = hashlib.sha256()
+        digest.update(f"{agent_type}\0".encode("utf-8"))
+        digest.update(hashlib.sha256(prompt_content.encode("utf-8")).digest())
+        for path in sorted(self._expand_files(files or [])):
+            digest.update(f"\0{path}\0".encode("utf-8"))
+            digest.update(self._hash_file(path))
+        return digest.hexdigest()
+
+    @staticmethod
+    def _expand_files(paths: List[str]) -> List[str]:
+        """Expand directories to the files below them."""
+        files = []
+        for path in paths:
+            if os.path.isdir(path):
+                for root, _, names in os.walk(path):
+                    files.extend(os.path.join(root, name) for name in names)
+            else:
+                files.append(path)
+        return files
+
+    @staticmethod
+    def _hash_file(path: str) -> bytes:
+        """Hash a file's content; a missing file hashes to a fixed marker."""
+        digest = hashlib.sha256()
+        try:
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(block)
+        except OSError:
+            return b"missing"
+        return digest.digest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached response, or None on a miss or an expired entry."""
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - entry.get('created_at', 0) > self.max_age:
+            self._remove(path)
+            return None
+
+        try:
+            # Touch the entry so eviction drops the least recently used first
+            os.utime(path)
+        except OSError:
+            pass
+        return entry.get('response')
+
+    def put(self, key: str, response: str):
+        """Store a response and evict old entries past the size limit."""
+        with self.lock:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                path = self._entry_path(key)
+                tmp_file = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump({'created_at': time.time(), 'response': response}, f)
+                os.replace(tmp_file, path)
+                self._evict()
+            except OSError:
+                # The cache is an optimization; failing to write it is harmless
+                pass
+
+    def _evict(self):
+        """Remove expired entries, then least recently used ones past max_bytes."""
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.max_age:
+                self._remove(path)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -4,6 +4,8 @@ import os
 import subprocess
 from datetime import datetime
 from claude_code_sdk import query, ClaudeCodeOptions
+from .agents.event_loop import get_background_loop
+from .prompt_templates import load_template, render_template
 ClaudeCodeClient = query
 
 
@@ -33,7 +35,7 @@ class ClaudeRunner:
     def run_prompt(self, inline_prompt=None, prompt_name=None, params=None, context=None, session_id=None):
         """Run a prompt using Claude Code SDK with template parameter replacement."""
         if inline_prompt:
-            prompt_content = inline_prompt
+            prompt_content = render_template(inline_prompt, params)
         else:
             prompt_file = f"_Settings_/Prompts/{prompt_name}.md"
             
@@ -41,17 +43,10 @@ class ClaudeRunner:
                 self.logger.error(f"Prompt file not found: {prompt_file}")
                 return None
             
-            # Read the prompt content
-            with open(prompt_file, 'r') as f:
-                prompt_content = f.read()
+            # Load the compiled prompt (re-read only when the file changed) and fill in params
+            prompt_content = load_template(prompt_file).render(params)
             
         try:
-            # Replace template parameters if provided
-            if params:
-                for key, value in params.items():
-                    placeholder = f"{{{key}}}"
-                    prompt_content = prompt_content.replace(placeholder, str(value))
-            
             # Add context if provided
             if context:
                 prompt_content = f"{prompt_content}\n\nContext:\n{context}"
@@ -84,8 +79,6 @@ class ClaudeRunner:
 
             # Send the prompt to Claude using async query function
             try:
-                import asyncio
-                
                 async def run_query():
                     response_parts = []
                     final_session_id = None
@@ -119,8 +112,8 @@ class ClaudeRunner:
                     
                     return ''.join(response_parts), final_session_id
 
-                # Run the async query
-                processed_content, final_session_id = asyncio.run(run_query())
+                # Run the async query on the shared background loop
+                processed_content, final_session_id = get_background_loop().run(run_query())
                 return processed_content, final_session_id
                 
             except AttributeError as e:
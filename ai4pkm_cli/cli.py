@@ -6,13 +6,19 @@ import glob
 from datetime import datetime
 from rich.console import Console
 from rich.panel import Panel
+from rich.table import Table
 from rich.text import Text
 from .cron_manager import CronManager
 from .logger import Logger
 from .config import Config
 from .agent_factory import AgentFactory
+from .agent_pool import answered_by
+from .agents import AgentTimeoutError
 from .commands.command_runner import CommandRunner
+from .job_history import JobHistory
+from .log_query import query_logs
 from .server import Server
+from .utils import parse_since
 
 
 class PKMApp:
@@ -21,21 +27,22 @@ class PKMApp:
     def __init__(self, suppress_agent_logging=False):
         """Initialize the PKM application."""
         self.console = Console()
+        self.config = Config()
         self.logger = Logger(
-            console_output=True
+            console_output=True, **self.config.get_logging_config()
         )  # Enable console output for main logger
-        self.config = Config()
         # Temporarily suppress agent logging if requested
         if suppress_agent_logging:
             original_info = self.logger.info
             self.logger.info = (
                 lambda msg: None if "🤖 Using agent:" in msg else original_info(msg)
             )
-            self.agent = AgentFactory.create_agent(self.logger, self.config)
+            self.agent = AgentFactory.create_agent(self.logger, self.config, pooled=True)
             self.logger.info = original_info  # Restore logging
         else:
-            self.agent = AgentFactory.create_agent(self.logger, self.config)
+            self.agent = AgentFactory.create_agent(self.logger, self.config, pooled=True)
         self.command_runner = CommandRunner(self.logger, self.config)
+        self.history = JobHistory()
         self.running = False
         self.server = None
 
@@ -106,6 +113,7 @@ class PKMApp:
                 "c": "claude_code",
                 "g": "gemini_cli",
                 "o": "codex_cli",
+                "r": "replay",
                 "claude": "claude_code",
                 "gemini": "gemini_cli",
                 "codex": "codex_cli",
@@ -116,23 +124,22 @@ class PKMApp:
                 agent_override = agent_shortcuts[agent_override]
 
             # Validate agent type
-            if agent_override not in ["claude_code", "gemini_cli", "codex_cli"]:
+            if agent_override not in ["claude_code", "gemini_cli", "codex_cli", "replay"]:
                 self.console.print(
                     f"[red]Error:[/red] Invalid agent type '{agent_override}'"
                 )
                 self.console.print(
-                    "[yellow]Available agents:[/yellow] claude_code, gemini_cli, codex_cli"
+                    "[yellow]Available agents:[/yellow] claude_code, gemini_cli, codex_cli, replay"
                 )
                 self.console.print(
-                    "[yellow]Shortcuts:[/yellow] c/claude, g/gemini, o/codex"
+                    "[yellow]Shortcuts:[/yellow] c/claude, g/gemini, o/codex, r/replay"
                 )
                 return
 
             # Create temporary agent for this execution
             try:
-                # Create a temporary config without saving to disk
-                temp_config = Config()
-                temp_config.config["default-agent"] = agent_override  # Modify in memory only
+                # Override the agent in memory only, without saving to disk
+                temp_config = self.config.override("default-agent", agent_override)
                 execution_agent = AgentFactory.create_agent(self.logger, temp_config)
                 self.logger.info(
                     f"🤖 Using {execution_agent.get_agent_name()} for this prompt execution"
@@ -151,11 +158,24 @@ class PKMApp:
         self.logger.info(f"Executing prompt: {prompt}")
 
         # Execute the prompt directly as arbitrary text
-        result = execution_agent.run_prompt(inline_prompt=prompt)
-        if result and result[0]:  # Check if result is not None and has content
-            self.logger.info(result[0])
-        else:
-            self.logger.error("No response received from agent")
+        try:
+            with self.history.track(
+                prompt[:100], "prompt", agent=execution_agent.get_agent_name(), prompt_chars=len(prompt)
+            ) as run:
+                # Prompts read the live vault, so never answer them from the response cache
+                result = execution_agent.run_prompt(inline_prompt=prompt, use_cache=False)
+                if result and result[0]:  # Check if result is not None and has content
+                    run.success = True
+                    run.response_chars = len(result[0])
+                    run.agent = answered_by(result, execution_agent)
+                    run.agent_seconds = getattr(result, 'agent_seconds', None)
+                    self.logger.info(result[0])
+                else:
+                    self.logger.error("No response received from agent")
+        except AgentTimeoutError as e:
+            self.logger.error(f"Prompt cancelled: {e}")
+            if e.partial_output:
+                self.logger.info(f"Partial output before timeout:\n{e.partial_output}")
 
     def execute_command(self, command, arguments, agent_override=None):
         """Execute a one-time command."""
@@ -164,12 +184,17 @@ class PKMApp:
         self.logger.info(f"Executing command: {command}")
 
         # Execute the command
-        result = self.command_runner.run_command(command, arguments, execution_agent)
+        with self.history.track(
+            command, "command", agent=execution_agent.get_agent_name()
+        ) as run:
+            result = self.command_runner.run_command(command, arguments, execution_agent)
+            run.success = bool(result)
 
         if result:
             self.logger.info("Command completed successfully")
         else:
             self.logger.error("Command failed")
+        return bool(result)
 
     def test_cron_job(self):
         """Test a specific cron job interactively."""
@@ -240,10 +265,22 @@ class PKMApp:
         start_time = time.time()
 
         try:
-            if inline_prompt:
-                result = self.agent.run_prompt(inline_prompt=inline_prompt)
-            else:
-                result = self.command_runner.run_command(command, arguments, self.agent)
+            with self.history.track(
+                selected_job.get("id") or inline_prompt or command,
+                "test",
+                agent=self.agent.get_agent_name(),
+                prompt_chars=len(inline_prompt) if inline_prompt else None,
+            ) as run:
+                if inline_prompt:
+                    result = self.agent.run_prompt(inline_prompt=inline_prompt, use_cache=False)
+                    run.success = bool(result and result[0])
+                    run.response_chars = len(result[0]) if run.success else None
+                    if run.success:
+                        run.agent = answered_by(result, self.agent)
+                        run.agent_seconds = getattr(result, 'agent_seconds', None)
+                else:
+                    result = self.command_runner.run_command(command, arguments, self.agent)
+                    run.success = bool(result)
             end_time = time.time()
             execution_time = end_time - start_time
 
@@ -290,16 +327,37 @@ class PKMApp:
     def run_continuous(self):
         """Run continuously with cron jobs, log display, and web API server."""
         self.running = True
-        self.cron_manager = CronManager(self.logger, self.agent)
+        self.cron_manager = CronManager(self.logger, self.agent, on_agent_reloaded=self._use_agent)
 
-        # Start web API server for custom chat endpoint
-        self.server = Server(self.logger, self.config)
-        self.server.start_server()
+        # Start web API server for custom chat endpoint, sharing the agent (or agent pool) with cron,
+        # unless it runs as a separate `ai4pkm --serve` process
+        if self.config.get_web_api_config()['mode'] == 'embedded':
+            self.server = Server(self.logger, self.config, self.agent)
+            self.server.start_server()
         
         # Display welcome message
         self._display_welcome()
 
-        self.cron_manager.start()
+        try:
+            self.cron_manager.start()
+        finally:
+            if self.server:
+                self.server.stop_server()
+
+    def _use_agent(self, agent):
+        """Share an agent recreated by a cron config reload with the embedded web server."""
+        self.agent = agent
+        if self.server:
+            self.server.set_agent(agent)
+
+    def serve(self):
+        """Run only the web API server, in the foreground."""
+        self.server = Server(self.logger, self.config, self.agent)
+        self.console.print(
+            f"[green]🌐 Web Server: Serving on {self.config.get_web_api_config()['host']}:"
+            f"{self.config.get_web_api_port()} (Ctrl+C to stop)[/green]"
+        )
+        self.server.serve_forever()
 
     def _display_welcome(self):
         """Display welcome message and status."""
@@ -328,7 +386,8 @@ class PKMApp:
                 inline_prompt = job.get("inline_prompt")
                 command = job.get("command")
                 title = f'"{inline_prompt}"' if inline_prompt else f"\\[{command}]"
-                self.console.print(f"  • {title} - {job['cron']}")
+                schedule = job.get("cron") or f"after {job.get('depends_on', job.get('after'))}"
+                self.console.print(f"  • {title} - {schedule}")
         else:
             self.console.print(
                 "\n[yellow]No cron jobs configured. Edit ai4pkm_cli.json to add cron jobs.[/yellow]"
@@ -338,6 +397,71 @@ class PKMApp:
         self.console.print("[bold]Live Logs:[/bold]")
         self.console.print("=" * 60)
 
+    def show_stats(self, since="7d"):
+        """Show p50/p95 execution latency per job and per agent."""
+        try:
+            since_time = parse_since(since)
+        except ValueError as e:
+            self.console.print(f"[red]Error:[/red] {e}")
+            return
+
+        self.console.print(
+            f"\n[bold blue]Execution Stats since {since_time.strftime('%Y-%m-%d %H:%M')}:[/bold blue]"
+        )
+
+        for group_by, title in (("job_id", "Job"), ("agent", "Agent")):
+            rows = self.history.stats(since_time, group_by=group_by)
+            if not rows:
+                self.console.print(f"\n[dim]No executions recorded in this window.[/dim]")
+                return
+
+            table = Table(title=f"By {title}", title_justify="left")
+            table.add_column(title, style="cyan", overflow="fold")
+            table.add_column("Runs", justify="right")
+            table.add_column("Failed", justify="right")
+            table.add_column("p50", justify="right")
+            table.add_column("p95", justify="right")
+            table.add_column("Max", justify="right")
+            table.add_column("Overhead p50", justify="right")
+            for row in rows:
+                failed_style = "red" if row["failures"] else "dim"
+                table.add_row(
+                    row["key"],
+                    str(row["runs"]),
+                    f"[{failed_style}]{row['failures']}[/{failed_style}]",
+                    f"{row['p50']:.1f}s",
+                    f"{row['p95']:.1f}s",
+                    f"{row['max']:.1f}s",
+                    f"{row['overhead_p50']:.2f}s" if row["overhead_p50"] is not None else "[dim]-[/dim]",
+                )
+            self.console.print(table)
+
+    def show_logs(self, since="7d", level=None, job=None, limit=200):
+        """Show recent structured log entries matching the filters."""
+        try:
+            since_time = parse_since(since)
+            records = query_logs(self.logger.logs_dir, since=since_time, level=level, job=job, limit=limit)
+        except ValueError as e:
+            self.console.print(f"[red]Error:[/red] {e}")
+            return
+
+        if not records:
+            self.console.print("[dim]No log entries match these filters.[/dim]")
+            return
+
+        level_styles = {"ERROR": "red", "WARNING": "yellow", "INFO": "green", "DEBUG": "blue"}
+        for record in records:
+            style = level_styles.get(record["level"], "white")
+            timestamp = record["ts"].replace("T", " ")[:19]
+            # Messages and job ids are plain text; brackets in them (e.g. "job [dir]") are not markup
+            line = Text.assemble((timestamp, "dim"), " ", (record["level"], style))
+            if record.get("job"):
+                line.append(" ")
+                line.append(record["job"], style="magenta")
+            line.append(" ")
+            line.append(record["message"])
+            self.console.print(line, highlight=False)
+
     def list_agents(self):
         """List available AI agents and their status."""
         self.console.print("\n[bold blue]Available AI Agents:[/bold blue]")
@@ -386,6 +510,7 @@ class PKMApp:
                 "c": "claude_code",
                 "g": "gemini_cli",
                 "o": "codex_cli",
+                "r": "replay",
                 "claude": "claude_code",
                 "gemini": "gemini_cli",
                 "codex": "codex_cli",
@@ -396,15 +521,15 @@ class PKMApp:
                 agent_type = agent_shortcuts[agent_type]
 
             # Validate agent type
-            if agent_type not in ["claude_code", "gemini_cli", "codex_cli"]:
+            if agent_type not in ["claude_code", "gemini_cli", "codex_cli", "replay"]:
                 self.console.print(
                     f"[red]Error:[/red] Invalid agent type '{agent_type}'"
                 )
                 self.console.print(
-                    "[yellow]Available agents:[/yellow] claude_code, gemini_cli, codex_cli"
+                    "[yellow]Available agents:[/yellow] claude_code, gemini_cli, codex_cli, replay"
                 )
                 self.console.print(
-                    "[yellow]Shortcuts:[/yellow] c/claude, g/gemini, o/codex"
+                    "[yellow]Shortcuts:[/yellow] c/claude, g/gemini, o/codex, r/replay"
                 )
                 return
 
@@ -502,6 +627,12 @@ class PKMApp:
         self.console.print(
             f"  [cyan]ai4pkm --list-agents[/cyan]          List available agents"
         )
+        self.console.print(
+            f"  [cyan]ai4pkm --stats --since 7d[/cyan]     Show job latency stats"
+        )
+        self.console.print(
+            f"  [cyan]ai4pkm --logs --level WARNING[/cyan]  Show recent warnings"
+        )
         self.console.print(
             f"  [cyan]ai4pkm --show-config[/cyan]          Show config (edit ai4pkm_cli.json for settings)"
         )
@@ -36,7 +36,7 @@ class CommandRunner:
         elif command == "process_event_data":
             from .process_event_data import ProcessEventData
 
-            processor = ProcessEventData(self.logger, agent)
+            processor = ProcessEventData(self.logger, agent, self.config)
             event_name = arguments.get("event_name")
             if not event_name:
                 self.logger.error("Missing 'event_name' argument for process_event_data")
@@ -5,6 +5,7 @@ from datetime import datetime
 from rich.console import Console
 from rich.prompt import Prompt
 # Agent will be passed in directly, no need to import
+from ..prompt_templates import load_template
 from ..utils import interactive_select
 
 
@@ -76,17 +77,17 @@ class GenerateReport:
                 self.logger.error(f"Template file '{template_name}' not found in event or global template directories.")
                 return
                 
-            with open(template_path, 'r', encoding='utf-8') as f:
-                template_content = f.read()
+            template = load_template(template_path)
 
             # 4. Generate the report by sending the template content directly as the prompt
             report_base_name = f"{event_name} Report" if event_name else f"{template_name}"
             self.logger.info(f"Generating report from template '{template_name}'...")
             
             # Prepare the final prompt by injecting data_sources directly into the template content
-            final_prompt = template_content.format(data_sources=data_sources)
+            final_prompt = template.render({"data_sources": data_sources})
             
-            result = self.agent.run_prompt(inline_prompt=final_prompt)
+            # Reuse the previous report while the template and its data are unchanged
+            result = self.agent.run_prompt(inline_prompt=final_prompt, cache_files=data_sources)
             report_content = result[0] if result and result[0] else None
             
             if report_content:
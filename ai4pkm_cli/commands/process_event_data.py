@@ -1,15 +1,171 @@
+import json
 import os
+import queue
+import re
 import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
 from rich.console import Console
+from ..agent_pool import AgentPool
+from ..rate_limiter import get_rate_limiter
+
+TEXT_CATEGORIES = ['conversation', 'transcription', 'feedback', 'vendor_list', 'notes']
+IMAGE_CATEGORIES = ['dance_scene', 'dj_booth', 'food_vendor', 'game_booth', 'receipt', 'crowd']
+
+TEXT_CATEGORY_DESCRIPTIONS = """The possible categories are:
+- 'conversation': A back-and-forth dialogue or discussion between two or more people.
+- 'transcription': A chronological log of spoken words, likely from a meeting or monologue.
+- 'feedback': A user's opinion, survey response, or feedback about an event.
+- 'vendor_list': A list of businesses, suppliers, or vendors.
+- 'notes': General notes, ideas, or unstructured text that doesn't fit other categories."""
+
+
+class InboxWriter:
+    """Single thread that moves classified files out of the inbox.
+
+    Classification workers hand their results to ``submit``; this thread is
+    the only one touching the processed folders, so destination names are
+    made unique without races. Each classification is appended to a JSONL
+    journal before the file is moved, so an interrupted run can resume
+    without classifying files again. The journal sits next to the inbox in
+    the event folder, outside the processed folders that reports read.
+    """
+
+    JOURNAL_NAME = "_inbox_progress.jsonl"
+
+    def __init__(self, logger, inbox_path, processed_path):
+        """Initialize the writer and start its thread."""
+        self.logger = logger
+        self.inbox_path = inbox_path
+        self.processed_path = processed_path
+        self.journal_path = os.path.join(os.path.dirname(inbox_path), self.JOURNAL_NAME)
+        self.moved = 0
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name="event-inbox-writer", daemon=True)
+        self.thread.start()
+
+    def pending_classifications(self):
+        """Get journaled classifications of inbox files that were not moved yet.
+
+        Returns a dict of filename -> (category, is_image). An entry only
+        counts if the inbox file still has the size it had when classified.
+        """
+        entries = {}
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    entries[entry.get('file')] = entry
+        except OSError:
+            return {}
+
+        pending = {}
+        for filename, entry in entries.items():
+            file_path = os.path.join(self.inbox_path, filename or "")
+            if entry.get('destination') or not os.path.isfile(file_path):
+                continue
+            if os.path.getsize(file_path) == entry.get('size'):
+                pending[filename] = (entry['category'], entry.get('image', False))
+        return pending
+
+    def submit(self, filename, category, is_image):
+        """Queue a classified file to be moved."""
+        self.queue.put((filename, category, is_image))
+
+    def close(self):
+        """Move the files still queued and stop the thread."""
+        self.queue.put(None)
+        self.thread.join()
+        return self.moved
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            try:
+                self._commit(*item)
+            except Exception as e:
+                self.logger.error(f"    Failed to move {item[0]}: {e}")
+
+    def _commit(self, filename, category, is_image):
+        """Journal a classification, then move the file under a unique name."""
+        source_path = os.path.join(self.inbox_path, filename)
+        entry = {
+            'file': filename,
+            'size': os.path.getsize(source_path),
+            'category': category,
+            'image': is_image,
+            'time': datetime.now().isoformat(),
+        }
+        self._journal(entry)
+
+        # Move the file to the categorized folder
+        if is_image:
+            destination_folder = os.path.join(self.processed_path, "images", category)
+        else:
+            destination_folder = os.path.join(self.processed_path, category)
+
+        destination_path = self._unique_destination(destination_folder, filename)
+        shutil.move(source_path, destination_path)
+        self._journal(dict(entry, destination=destination_path))
+        self.moved += 1
+        self.logger.info(f"    Moved file to: {destination_path}")
+
+    def _journal(self, entry):
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    @staticmethod
+    def _unique_destination(folder, filename):
+        """Get a path in folder for filename that does not overwrite an existing file."""
+        destination_path = os.path.join(folder, filename)
+        stem, extension = os.path.splitext(filename)
+        counter = 1
+        while os.path.exists(destination_path):
+            destination_path = os.path.join(folder, f"{stem}-{counter}{extension}")
+            counter += 1
+        return destination_path
+
 
 class ProcessEventData:
     """Handles intelligent processing of raw event data."""
 
-    def __init__(self, logger, agent):
+    def __init__(self, logger, agent, config=None):
         """Initialize the data processor."""
         self.logger = logger
         self.agent = agent
         self.console = Console()
+        self.config = config
+
+        # Batch settings; batch_size 1 classifies each text file on its own
+        if self.config:
+            event_config = self.config.get_event_processing_config()
+        else:
+            event_config = {'batch_size': 1, 'sample_head_chars': 1500, 'sample_tail_chars': 500,
+                            'parallelism': 4, 'rate_limits': {}}
+        self.batch_size = max(1, event_config['batch_size'])
+        self.sample_head_chars = event_config['sample_head_chars']
+        self.sample_tail_chars = event_config['sample_tail_chars']
+        self.parallelism = max(1, event_config['parallelism'])
+        rate_limits = event_config['rate_limits']
+        if isinstance(agent, AgentPool):
+            # A pool picks its member per call, so each member waits for its own type's limit
+            self.agent = agent.rate_limited({
+                member.agent.agent_type: get_rate_limiter(member.agent.agent_type,
+                                                          rate_limits.get(member.agent.agent_type))
+                for member in agent.members
+            })
+            self.rate_limiter = None
+        else:
+            agent_type = getattr(agent, 'agent_type', None)
+            self.rate_limiter = get_rate_limiter(agent_type, rate_limits.get(agent_type))
 
     def process_files(self, event_name):
         """
@@ -17,7 +173,7 @@ class ProcessEventData:
         and moves them to the appropriate processed data folders.
         """
         self.console.print(f"\n[bold blue]Processing data for event: {event_name}[/bold blue]")
-        
+
         base_path = "Events"
         event_path = os.path.join(base_path, event_name)
         inbox_path = os.path.join(event_path, "_inbox")
@@ -32,50 +188,105 @@ class ProcessEventData:
 
         self.logger.info(f"Scanning inbox: {inbox_path}")
 
-        files_to_process = [f for f in os.listdir(inbox_path) if os.path.isfile(os.path.join(inbox_path, f))]
+        files_to_process = sorted(f for f in os.listdir(inbox_path) if os.path.isfile(os.path.join(inbox_path, f)))
 
         if not files_to_process:
             self.console.print("[yellow]Inbox is empty. Nothing to process.[/yellow]")
             return
 
-        for filename in files_to_process:
-            file_path = os.path.join(inbox_path, filename)
-            self.console.print(f"  - Processing file: {filename}")
-            
-            file_type = self._get_file_type(filename)
-            
-            category = "other"
-            is_image = False
-
-            if file_type in [".txt", ".md", ".csv"]:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                if content.strip():
-                    category = self._classify_text_content(content)
-                    self.logger.info(f"    AI text classification: '{category}'")
+        writer = InboxWriter(self.logger, inbox_path, processed_path)
+        try:
+            resumed = writer.pending_classifications()
+            if resumed:
+                self.logger.info(f"Resuming {len(resumed)} files classified by an interrupted run")
+            for filename, (category, is_image) in resumed.items():
+                writer.submit(filename, category, is_image)
+
+            tasks = []  # Classification calls, each returning [(filename, category, is_image)]
+            text_contents = {}  # filename -> content of text files to classify
+            for filename in files_to_process:
+                if filename in resumed:
+                    continue
+                file_path = os.path.join(inbox_path, filename)
+                file_type = self._get_file_type(filename)
+
+                if file_type in [".txt", ".md", ".csv"]:
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        content = f.read()
+
+                    if content.strip():
+                        text_contents[filename] = content
+                    else:
+                        self.logger.info(f"    {filename} is empty, classifying as 'other'.")
+                        writer.submit(filename, "other", False)
+
+                elif file_type in [".jpg", ".jpeg", ".png", ".heic"]:
+                    tasks.append(lambda filename=filename, file_path=file_path: [
+                        (filename, self._classify_image_file(filename, file_path), True)
+                    ])
+
                 else:
-                    self.logger.info("    File is empty, classifying as 'other'.")
+                    self.logger.info(f"    File type '{file_type}' of {filename} not supported for AI classification yet. Classifying as 'other'.")
+                    writer.submit(filename, "other", False)
+
+            filenames = list(text_contents)
+            for start in range(0, len(filenames), self.batch_size):
+                chunk = {name: text_contents[name] for name in filenames[start:start + self.batch_size]}
+                tasks.append(lambda chunk=chunk: [
+                    (filename, category, False) for filename, category in self._classify_text_files(chunk).items()
+                ])
+
+            self._run_classifications(tasks, writer)
+        finally:
+            # Files classified before an error or interruption are still moved
+            moved = writer.close()
+
+        self.console.print(f"\n[bold green]Finished processing inbox ({moved} files moved).[/bold green]")
+
+    def _run_classifications(self, tasks, writer):
+        """Run classification tasks on a worker pool, handing results to the writer as they finish."""
+        executor = ThreadPoolExecutor(max_workers=self.parallelism, thread_name_prefix="event-classify")
+        futures = [executor.submit(task) for task in tasks]
+        try:
+            for future in as_completed(futures):
+                try:
+                    results = future.result()
+                except Exception as e:
+                    self.logger.error(f"    Classification failed: {e}")
+                    continue
+                for filename, category, is_image in results:
+                    writer.submit(filename, category, is_image)
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
 
-            elif file_type in [".jpg", ".jpeg", ".png", ".heic"]:
-                is_image = True
-                category = self._classify_image_content(file_path)
-                self.logger.info(f"    AI image classification: '{category}'")
+    def _run_prompt(self, **kwargs):
+        """Run a prompt on the agent within its configured rate limit."""
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        return self.agent.run_prompt(**kwargs)
 
-            else:
-                self.logger.info(f"    File type '{file_type}' not supported for AI classification yet. Classifying as 'other'.")
+    def _classify_text_files(self, text_contents):
+        """Classify text files, as one batch when there are several.
 
-            # Move the file to the categorized folder
-            if is_image:
-                destination_folder = os.path.join(processed_path, "images", category)
-            else:
-                destination_folder = os.path.join(processed_path, category)
-            
-            destination_path = os.path.join(destination_folder, filename)
-            shutil.move(file_path, destination_path)
-            self.logger.info(f"    Moved file to: {destination_path}")
+        Files missing from a batch reply, or given an unknown category, are
+        classified again one by one.
+        """
+        categories = {}
+        filenames = list(text_contents)
+        if len(filenames) > 1:
+            self.console.print(f"  - Classifying {len(filenames)} text files in one batch")
+            categories.update(self._classify_text_batch(text_contents))
 
-        self.console.print("\n[bold green]Finished processing inbox.[/bold green]")
+        for filename in filenames:
+            if filename in categories:
+                self.logger.info(f"    AI text classification of {filename}: '{categories[filename]}'")
+                continue
+            self.console.print(f"  - Processing file: {filename}")
+            categories[filename] = self._classify_text_content(text_contents[filename])
+            self.logger.info(f"    AI text classification: '{categories[filename]}'")
+        return categories
 
     def _create_directories(self, processed_path):
         """Create all necessary output directories."""
@@ -85,7 +296,7 @@ class ProcessEventData:
         os.makedirs(os.path.join(processed_path, "feedback"), exist_ok=True)
         os.makedirs(os.path.join(processed_path, "vendor_list"), exist_ok=True)
         os.makedirs(os.path.join(processed_path, "notes"), exist_ok=True)
-        
+
         # Image categories
         os.makedirs(os.path.join(processed_path, "images", "dance_scene"), exist_ok=True)
         os.makedirs(os.path.join(processed_path, "images", "dj_booth"), exist_ok=True)
@@ -93,7 +304,7 @@ class ProcessEventData:
         os.makedirs(os.path.join(processed_path, "images", "game_booth"), exist_ok=True)
         os.makedirs(os.path.join(processed_path, "images", "receipt"), exist_ok=True)
         os.makedirs(os.path.join(processed_path, "images", "crowd"), exist_ok=True)
-        
+
         # Default/Other
         os.makedirs(os.path.join(processed_path, "other"), exist_ok=True)
         os.makedirs(os.path.join(processed_path, "images", "other"), exist_ok=True)
@@ -102,12 +313,7 @@ class ProcessEventData:
         """Uses AI to classify the content of a text file."""
         prompt = f"""
 You are a file content classifier. Your task is to determine the type of content in the following text.
-The possible categories are:
-- 'conversation': A back-and-forth dialogue or discussion between two or more people.
-- 'transcription': A chronological log of spoken words, likely from a meeting or monologue.
-- 'feedback': A user's opinion, survey response, or feedback about an event.
-- 'vendor_list': A list of businesses, suppliers, or vendors.
-- 'notes': General notes, ideas, or unstructured text that doesn't fit other categories.
+{TEXT_CATEGORY_DESCRIPTIONS}
 
 Based on the content below, respond with only one of the category names listed above.
 
@@ -117,16 +323,90 @@ CONTENT:
 ---
 """
         try:
-            result = self.agent.run_prompt(inline_prompt=prompt)
+            result = self._run_prompt(inline_prompt=prompt)
             category = result[0].strip().lower().replace("'", "") if result and result[0] else "other"
-            
-            if category not in ['conversation', 'transcription', 'feedback', 'vendor_list', 'notes']:
+
+            if category not in TEXT_CATEGORIES:
                 return "other"
             return category
         except Exception as e:
             self.logger.error(f"    AI text classification failed: {e}")
             return "other"
 
+    def _classify_text_batch(self, text_contents):
+        """Uses AI to classify several text files in one call.
+
+        Each file is sent as a head/tail sample. Returns the categories of
+        the files the reply classified; files it left out are not included.
+        """
+        ids = {str(number): filename for number, filename in enumerate(text_contents, 1)}
+        sections = "\n".join(
+            f"=== FILE {file_id}: {filename} ===\n{self._sample_content(text_contents[filename])}\n"
+            for file_id, filename in ids.items()
+        )
+        prompt = f"""
+You are a file content classifier. Your task is to determine the type of content of each of the {len(ids)} text files below.
+Long files are shortened to their beginning and end.
+{TEXT_CATEGORY_DESCRIPTIONS}
+
+Respond with only a JSON object that maps each file number to one of the category names listed above, for example:
+{{"1": "notes", "2": "feedback"}}
+
+{sections}"""
+        try:
+            result = self._run_prompt(inline_prompt=prompt)
+        except Exception as e:
+            self.logger.error(f"    AI batch classification failed: {e}")
+            return {}
+
+        mapping = self._parse_batch_reply(result[0] if result and result[0] else "")
+        categories = {}
+        for file_id, filename in ids.items():
+            category = str(mapping.get(file_id, "")).strip().lower().replace("'", "")
+            if category in TEXT_CATEGORIES:
+                categories[filename] = category
+        if len(categories) < len(ids):
+            self.logger.warning(
+                f"    Batch reply classified {len(categories)} of {len(ids)} files; retrying the rest individually"
+            )
+        return categories
+
+    @staticmethod
+    def _parse_batch_reply(reply):
+        """Extract the file number to category mapping from an agent reply.
+
+        Accepts the JSON object wrapped in prose or code fences, and falls
+        back to picking out "number": "category" pairs when it is not valid
+        JSON (e.g. cut off or with trailing commas).
+        """
+        start, end = reply.find("{"), reply.rfind("}")
+        if start != -1 and end > start:
+            try:
+                mapping = json.loads(reply[start:end + 1])
+                if isinstance(mapping, dict):
+                    return {str(key).strip(): value for key, value in mapping.items()}
+            except ValueError:
+                pass
+        return {
+            file_id: category
+            for file_id, category in re.findall(r'"?(\d+)"?\s*:\s*"([A-Za-z_\']+)"', reply)
+        }
+
+    def _sample_content(self, content):
+        """Shorten content to its head and tail for batch classification."""
+        if len(content) <= self.sample_head_chars + self.sample_tail_chars:
+            return content
+        omitted = len(content) - self.sample_head_chars - self.sample_tail_chars
+        tail = content[-self.sample_tail_chars:] if self.sample_tail_chars else ""
+        return f"{content[:self.sample_head_chars]}\n[... {omitted} characters omitted ...]\n{tail}"
+
+    def _classify_image_file(self, filename, file_path):
+        """Classify one image file, logging the result."""
+        self.console.print(f"  - Processing file: {filename}")
+        category = self._classify_image_content(file_path)
+        self.logger.info(f"    AI image classification of {filename}: '{category}'")
+        return category
+
     def _classify_image_content(self, file_path):
         """Uses AI to classify the content of an image file."""
         prompt = f"""
@@ -144,11 +424,11 @@ Respond with only one of the category names listed above.
 Image to analyze: {file_path}
 """
         try:
-            result = self.agent.run_prompt(inline_prompt=prompt)
+            # The prompt only names the image, so key cached answers on its content
+            result = self._run_prompt(inline_prompt=prompt, cache_files=[file_path])
             category = result[0].strip().lower().replace("'", "") if result and result[0] else "other"
 
-            valid_categories = ['dance_scene', 'dj_booth', 'food_vendor', 'game_booth', 'receipt', 'crowd']
-            if category not in valid_categories:
+            if category not in IMAGE_CATEGORIES:
                 return "other"
             return category
         except Exception as e:
@@ -158,4 +438,4 @@ Image to analyze: {file_path}
     def _get_file_type(self, filename):
         """Determines the file type based on its extension."""
         _, extension = os.path.splitext(filename)
-        return extension.lower()
\ No newline at end of file
+        return extension.lower()
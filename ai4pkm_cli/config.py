@@ -2,23 +2,47 @@
 
 import json
 import os
+import threading
 from typing import Dict, Any
 
 
 class Config:
-    """Handles configuration for AI4PKM CLI."""
+    """Handles configuration for AI4PKM CLI.
+
+    Parsed config files are shared by every instance in the process and
+    validated against the file's mtime and size, so creating a Config is
+    cheap after the first parse. Each instance holds an immutable snapshot:
+    ``set`` copies on write, ``override`` layers per-call values on top
+    without touching disk, and ``refresh`` picks up changes to the file.
+    """
+
+    _cache = {}  # config_file -> ((mtime_ns, size), parsed config)
+    _cache_lock = threading.Lock()
     
     DEFAULT_CONFIG = {
-        "default-agent": "claude_code",  # Options: claude_code, gemini_cli, codex_cli
+        "default-agent": "claude_code",  # Options: claude_code, gemini_cli, codex_cli, replay
         "agents-config": {
             "claude_code": {
-                "permission_mode": "bypassPermissions"
+                "permission_mode": "bypassPermissions",
+                "max_concurrent_queries": 4  # Prompts this agent runs at once (in a pool, agent_pool.max_concurrent applies)
             },
             "gemini_cli": {
-                "command": "gemini"  # CLI command name
+                "command": "gemini",  # CLI command name
+                "timeout": 300  # Seconds before the CLI process group is killed
             },
             "codex_cli": {
-                "command": "codex"  # CLI command name
+                "command": "codex",  # CLI command name
+                "timeout": 300
+            },
+            "replay": {  # Offline stand-in agent for benchmarking
+                "corpus": "_Settings_/Replay/corpus.jsonl",  # Recorded responses (JSONL)
+                "record_from": None,  # Agent to record responses from, e.g. claude_code
+                "strict": False,  # Fail prompts missing from the corpus instead of synthesizing
+                "latency": {"distribution": "lognormal", "median": 1.0, "sigma": 0.5},  # Before the first chunk
+                "tokens_per_second": 50,
+                "response_tokens": 200,  # Length of synthetic responses
+                "failure_rate": 0.0,
+                "seed": None
             }
         },
         "photo_processing": {
@@ -31,37 +55,145 @@ class Config:
             "destination_folder": "Ingest/Notes/",
             "days": 7
         },
+        "event_processing": {
+            "batch_size": 1,  # Text files classified per agent call; above 1 enables batch mode
+            "sample_head_chars": 1500,  # In batch mode, each file is cut to its head and tail
+            "sample_tail_chars": 500,
+            "parallelism": 4,  # Classification calls in flight at once
+            "rate_limits": {}  # Max calls per minute by agent type, e.g. {"claude_code": 30}
+        },
         "web_api": {
             "port": 8000,
+            "hedge_after_seconds": 2.0,  # Voice calls: start a second agent if the first is silent this long (0 disables)
+            "mode": "embedded",  # embedded: serve from the cron process; external: run `ai4pkm --serve` separately
+            "host": "127.0.0.1",
+            "server": None,  # waitress or werkzeug; waitress when installed by default
+            "threads": 24,  # Requests handled at once, including those waiting for admission
+            "request_timeout_seconds": 120,  # Agent time allowed per chat request
+            "idle_timeout_seconds": 120,  # Close idle keep-alive connections (waitress)
+            "shutdown_timeout_seconds": 30,  # Time for requests in flight to finish on shutdown
+            "admission": {  # Queue in front of agent calls from /chat/completions
+                "enabled": True,
+                "max_concurrent": 4,  # Agent calls running at once
+                "max_queue": 16,  # Requests waiting; more are rejected with 429
+                "max_queue_per_client": 4,
+                "max_wait_seconds": 10  # Longest wait before a 429
+            },
+            "sessions": {  # Agent sessions resumed across turns of a Vapi call
+                "enabled": True,
+                "agent": "claude_code",  # Agent whose sessions are resumed
+                "max_entries": 256,  # Calls tracked; the least recently used is evicted
+                "ttl_seconds": 1800,  # Forget calls idle for this long
+                "history_turns": 6,  # Recent turns sent as context when no session is resumed
+                "history_chars": 4000
+            }
+        },
+        "logging": {
+            "max_bytes": 10485760,  # Rotate the daily log once it exceeds this size
+            "backup_count": 5,  # Rotated files kept per day
+            "compress": True,  # Gzip rotated files
+            "retention_days": 30  # Delete daily logs older than this
+        },
+        "response_cache": {
+            "enabled": False,  # Reuse responses to identical prompts (see BaseAgent.run_prompt)
+            "max_mb": 50,  # Evict least recently used responses past this size
+            "max_age_days": 7  # Ignore responses older than this
+        },
+        "agent_pool": {
+            "enabled": False,  # Route prompts across all available agents
+            "agents": ["claude_code", "gemini_cli", "codex_cli"],
+            "max_concurrent": {  # Prompts each agent may run at once
+                "claude_code": 4,
+                "gemini_cli": 2,
+                "codex_cli": 2
+            },
+            "breaker_failures": 3,  # Consecutive failures before an agent is skipped
+            "breaker_reset_seconds": 60  # How long it is skipped before a trial call
+        },
+        "scheduler": {
+            "max_workers": 4,  # Cron jobs that may run at the same time
+            "catch_up": "run_once"  # Missed runs policy: run_once, run_all, skip
         },
         "cron_jobs": []
     }
     
-    def __init__(self, config_file=None):
+    def __init__(self, config_file=None, overrides=None):
         """Initialize configuration."""
         if config_file is None:
             # Use current working directory for config file
             self.config_file = os.path.join(os.getcwd(), "ai4pkm_cli.json")
         else:
             self.config_file = config_file
-            
-        self.config = self._load_config()
-        
-    def _load_config(self) -> Dict[str, Any]:
-        """Load configuration from file or create default."""
-        if os.path.exists(self.config_file):
+
+        self._overrides = dict(overrides or {})
+        self._stamp, self._base = self._load_config()
+        self.config = self._apply_overrides(self._base)
+
+    def _file_stamp(self):
+        """Get the (mtime, size) pair used to validate the cached parse."""
+        try:
+            stat = os.stat(self.config_file)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load_config(self):
+        """Load configuration from the shared cache, the file, or create default."""
+        stamp = self._file_stamp()
+        with self._cache_lock:
+            cached = self._cache.get(self.config_file)
+        if stamp is not None and cached and cached[0] == stamp:
+            return cached
+
+        if stamp is not None:
             try:
                 with open(self.config_file, 'r') as f:
                     config = json.load(f)
                 # Merge with defaults to ensure all keys exist
-                return {**self.DEFAULT_CONFIG, **config}
+                config = {**self.DEFAULT_CONFIG, **config}
             except Exception as e:
                 print(f"⚠️  Error loading config, using defaults: {e}")
-                return self.DEFAULT_CONFIG
+                config = self.DEFAULT_CONFIG
         else:
             # Create config file with defaults
             self._save_config(self.DEFAULT_CONFIG)
-            return self.DEFAULT_CONFIG
+            stamp = self._file_stamp()
+            config = self.DEFAULT_CONFIG
+
+        with self._cache_lock:
+            self._cache[self.config_file] = (stamp, config)
+        return stamp, config
+
+    def _apply_overrides(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """Layer in-memory overrides on top of a file snapshot."""
+        for key, value in self._overrides.items():
+            config = self._with_value(config, key, value)
+        return config
+
+    @staticmethod
+    def _with_value(config: Dict[str, Any], key: str, value: Any) -> Dict[str, Any]:
+        """Get a copy of config with a dotted key set, copying only the dicts on its path."""
+        keys = key.split('.')
+        root = dict(config)
+        node = root
+        for k in keys[:-1]:
+            child = node.get(k)
+            node[k] = dict(child) if isinstance(child, dict) else {}
+            node = node[k]
+        node[keys[-1]] = value
+        return root
+
+    def refresh(self) -> bool:
+        """Reload the snapshot if the file changed on disk. Returns True when it did."""
+        if self._file_stamp() == self._stamp:
+            return False
+        self._stamp, self._base = self._load_config()
+        self.config = self._apply_overrides(self._base)
+        return True
+
+    def override(self, key: str, value: Any) -> "Config":
+        """Get a Config with a value replaced in memory only, e.g. the agent for one job."""
+        return Config(self.config_file, {**self._overrides, key: value})
             
     def _save_config(self, config: Dict[str, Any]):
         """Save configuration to file."""
@@ -87,14 +219,12 @@ class Config:
         
     def set(self, key: str, value: Any):
         """Set configuration value and save."""
-        keys = key.split('.')
-        config = self.config
-        for k in keys[:-1]:
-            if k not in config:
-                config[k] = {}
-            config = config[k]
-        config[keys[-1]] = value
-        self._save_config(self.config)
+        self._base = self._with_value(self._base, key, value)
+        self._save_config(self._base)
+        self._stamp = self._file_stamp()
+        with self._cache_lock:
+            self._cache[self.config_file] = (self._stamp, self._base)
+        self.config = self._apply_overrides(self._base)
         
     def get_agent(self) -> str:
         """Get current default agent selection."""
@@ -102,8 +232,8 @@ class Config:
         
     def set_agent(self, agent: str):
         """Set current default agent and save."""
-        if agent not in ['claude_code', 'gemini_cli', 'codex_cli']:
-            raise ValueError(f"Invalid agent: {agent}. Must be one of: claude_code, gemini_cli, codex_cli")
+        if agent not in ['claude_code', 'gemini_cli', 'codex_cli', 'replay']:
+            raise ValueError(f"Invalid agent: {agent}. Must be one of: claude_code, gemini_cli, codex_cli, replay")
         self.set('default-agent', agent)
         
     def get_cron_jobs(self) -> list:
@@ -156,6 +286,60 @@ class Config:
         """Get number of days to look back for notes."""
         return self.get('notes_processing.days', 7)
     
+    def get_event_processing_config(self) -> Dict[str, Any]:
+        """Get event inbox classification settings."""
+        defaults = self.DEFAULT_CONFIG['event_processing']
+        event_config = self.get('event_processing', {})
+        return {key: event_config.get(key, value) for key, value in defaults.items()}
+
     def get_web_api_port(self) -> int:
         """Get web API port."""
         return self.get('web_api.port', 8000)
+
+    def get_web_api_config(self) -> Dict[str, Any]:
+        """Get web API serving settings."""
+        defaults = self.DEFAULT_CONFIG['web_api']
+        web_api_config = self.get('web_api', {})
+        return {key: web_api_config.get(key, value) for key, value in defaults.items()}
+
+    def get_web_api_admission_config(self) -> Dict[str, Any]:
+        """Get admission control settings for chat requests."""
+        defaults = self.DEFAULT_CONFIG['web_api']['admission']
+        admission_config = self.get('web_api.admission', {})
+        return {key: admission_config.get(key, value) for key, value in defaults.items()}
+
+    def get_web_api_sessions_config(self) -> Dict[str, Any]:
+        """Get settings for resuming agent sessions across turns of a call."""
+        defaults = self.DEFAULT_CONFIG['web_api']['sessions']
+        sessions_config = self.get('web_api.sessions', {})
+        return {key: sessions_config.get(key, value) for key, value in defaults.items()}
+
+    def get_web_api_hedge_after(self) -> float:
+        """Get the delay before a voice request is hedged on a second agent."""
+        return self.get('web_api.hedge_after_seconds', 2.0)
+
+    def get_logging_config(self) -> Dict[str, Any]:
+        """Get log rotation and retention settings."""
+        defaults = self.DEFAULT_CONFIG['logging']
+        logging_config = self.get('logging', {})
+        return {key: logging_config.get(key, value) for key, value in defaults.items()}
+
+    def get_response_cache_config(self) -> Dict[str, Any]:
+        """Get response cache settings."""
+        defaults = self.DEFAULT_CONFIG['response_cache']
+        cache_config = self.get('response_cache', {})
+        return {key: cache_config.get(key, value) for key, value in defaults.items()}
+
+    def get_agent_pool_config(self) -> Dict[str, Any]:
+        """Get agent pool settings."""
+        defaults = self.DEFAULT_CONFIG['agent_pool']
+        pool_config = self.get('agent_pool', {})
+        return {key: pool_config.get(key, value) for key, value in defaults.items()}
+
+    def get_scheduler_max_workers(self) -> int:
+        """Get the number of cron jobs that may run concurrently."""
+        return self.get('scheduler.max_workers', 4)
+
+    def get_scheduler_catch_up(self) -> str:
+        """Get the default catch-up policy for missed cron runs."""
+        return self.get('scheduler.catch_up', 'run_once')
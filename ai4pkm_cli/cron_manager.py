@@ -1,27 +1,82 @@
 """Cron job management system."""
 
+import heapq
 import json
 import os
-import time
-from datetime import datetime
+import signal
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from croniter import croniter
 from .config import Config
+from .cron_state import CronState
+from .job_history import JobHistory
 from .agent_factory import AgentFactory
+from .agent_pool import AgentPool, answered_by
+from .agents import AgentTimeoutError
 from .commands.command_runner import CommandRunner
 
 
+class DagRun:
+    """Tracks one run of a set of jobs ordered by their dependencies."""
+
+    def __init__(self, nodes, dependencies):
+        """Initialize a run over job indexes and their dependency edges."""
+        self.nodes = set(nodes)
+        self.pending = {node: set(dependencies.get(node, ())) & self.nodes for node in self.nodes}
+        self.started = set()
+        self.results = {}
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+        if not self.nodes:
+            self.done.set()
+
+
 class CronManager:
     """Manages cron jobs defined in configuration file."""
 
-    def __init__(self, logger, default_agent):
-        """Initialize cron manager."""
+    MAX_SLEEP_SECONDS = 60
+    MAX_CATCH_UP_RUNS = 24  # Upper bound for the run_all catch-up policy
+    CATCH_UP_POLICIES = ("run_once", "run_all", "skip")
+    SESSION_MAX_AGE_HOURS = 24  # Defaults for jobs with reuse_session
+    SESSION_MAX_TURNS = 20
+    SESSION_MAX_CHARS = 400000  # Roughly 100k tokens of prompts and responses
+
+    def __init__(self, logger, default_agent, on_agent_reloaded=None):
+        """Initialize cron manager.
+
+        ``on_agent_reloaded`` is called with the new default agent after a
+        config reload, so others sharing the agent (e.g. the web server)
+        switch to it as well.
+        """
         self.logger = logger
         self.default_agent = default_agent
+        self.on_agent_reloaded = on_agent_reloaded
         self.config = Config()
+        self.state = CronState()
+        self.history = JobHistory()
         self.jobs = []
         self.running = False
         self.thread = None
         self.agent_cache = {}  # Cache agents to avoid recreating them
+        self._schedule = []  # Min-heap of (next_fire, sequence, job_index)
+        self._iterators = {}  # job_index -> croniter
+        self._sequence = 0
+        self._wakeup = threading.Event()
+        self._state_lock = threading.Lock()
+        self._running_counts = {}  # job_index -> instances currently running
+        self._pending_runs = set()  # job_indexes queued behind a running instance
+        self._running_futures = {}  # job_index -> future of the latest running instance
+        self._dependencies = {}  # job_index -> upstream job indexes
+        self._dependents = {}  # job_index -> downstream job indexes
+        self._reload_pending = False
+        self._sessions_in_use = set()  # job ids whose session a running instance holds
+        self.max_workers = self.config.get_scheduler_max_workers()
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="cron-job"
+        )
         self._load_jobs()
 
     def _load_jobs(self):
@@ -32,6 +87,73 @@ class CronManager:
         except Exception as e:
             self.logger.error(f"Failed to load cron jobs from config: {e}")
             self.jobs = []
+        self._load_dependencies()
+
+    def _load_dependencies(self):
+        """Resolve each job's depends_on (or after) edges to job indexes.
+
+        Unknown job ids are dropped, and jobs that take part in a cycle lose
+        their dependencies so the rest of the graph can still run.
+        """
+        index_by_id = {self._job_id(job): job_index for job_index, job in enumerate(self.jobs)}
+        self._dependencies = {}
+
+        for job_index, job in enumerate(self.jobs):
+            upstream = job.get("depends_on", job.get("after", []))
+            if isinstance(upstream, str):
+                upstream = [upstream]
+
+            resolved = []
+            for upstream_id in upstream:
+                if upstream_id in index_by_id and index_by_id[upstream_id] != job_index:
+                    resolved.append(index_by_id[upstream_id])
+                else:
+                    self.logger.error(
+                        f"Job {self._job_title(job)} depends on unknown job '{upstream_id}', ignoring"
+                    )
+            if resolved:
+                self._dependencies[job_index] = resolved
+
+        for job_index in self._find_cycle_members():
+            self.logger.error(
+                f"Job {self._job_title(self.jobs[job_index])} is part of a dependency cycle, ignoring its dependencies"
+            )
+            del self._dependencies[job_index]
+
+        self._dependents = {}
+        for job_index, upstream in self._dependencies.items():
+            for upstream_index in upstream:
+                self._dependents.setdefault(upstream_index, []).append(job_index)
+
+    def _find_cycle_members(self):
+        """Get the indexes of jobs whose dependencies form a cycle."""
+        visiting, visited, members = set(), set(), set()
+
+        def visit(job_index, path):
+            if job_index in visiting:
+                members.update(path[path.index(job_index):])
+                return
+            if job_index in visited:
+                return
+            visiting.add(job_index)
+            for upstream_index in self._dependencies.get(job_index, ()):
+                visit(upstream_index, path + [upstream_index])
+            visiting.discard(job_index)
+            visited.add(job_index)
+
+        for job_index in list(self._dependencies):
+            visit(job_index, [job_index])
+        return members
+
+    def _ancestors(self, job_index):
+        """Get all transitive upstream job indexes of a job."""
+        ancestors, stack = set(), list(self._dependencies.get(job_index, ()))
+        while stack:
+            upstream_index = stack.pop()
+            if upstream_index not in ancestors:
+                ancestors.add(upstream_index)
+                stack.extend(self._dependencies.get(upstream_index, ()))
+        return ancestors
 
     def get_jobs(self):
         """Get list of loaded cron jobs."""
@@ -49,17 +171,25 @@ class CronManager:
             return self.default_agent
 
         # Check cache first
-        if job_agent_type in self.agent_cache:
-            return self.agent_cache[job_agent_type]
+        with self._state_lock:
+            if job_agent_type in self.agent_cache:
+                return self.agent_cache[job_agent_type]
+
+        # A shared pool already holds the agent, along with its concurrency cap
+        if isinstance(self.default_agent, AgentPool):
+            pinned = self.default_agent.pinned(job_agent_type)
+            if pinned is not None:
+                with self._state_lock:
+                    return self.agent_cache.setdefault(job_agent_type, pinned)
 
         # Create new agent if not in cache
         try:
-            # Create temporary config for this agent type
-            temp_config = Config()
-            temp_config.config["default-agent"] = job_agent_type  # Modify in memory only
+            # Override the agent for this job in memory only
+            temp_config = self.config.override("default-agent", job_agent_type)
 
             agent = AgentFactory.create_agent(self.logger, temp_config)
-            self.agent_cache[job_agent_type] = agent
+            with self._state_lock:
+                agent = self.agent_cache.setdefault(job_agent_type, agent)
 
             self.logger.debug(
                 f"Created agent {job_agent_type} ({agent.get_agent_name()}) for job: {job.get('inline_prompt', 'Unknown')}"
@@ -78,16 +208,11 @@ class CronManager:
             job = self.jobs[job_id]
             inline_prompt = job.get("inline_prompt")
             command = job.get("command")
-            arguments = job.get("arguments")
-            agent = self._get_agent_for_job(job)
             if inline_prompt:
-                self.logger.info(
-                    f"Executing inline prompt job {job_id}: {inline_prompt} using {agent.get_agent_name()}"
-                )
-                return self._run_job_with_agent(inline_prompt, agent)
+                self.logger.info(f"Executing inline prompt job {job_id}: {inline_prompt}")
             elif command:
                 self.logger.info(f"Executing command job {job_id}: {command}")
-                return self._run_job_with_command(command, arguments, agent)
+            return self._execute_job(job)
         else:
             self.logger.error(
                 f"Invalid job ID: {job_id}. Available jobs: 0-{len(self.jobs) - 1}"
@@ -95,20 +220,23 @@ class CronManager:
             return False
 
     def execute_jobs_batch(self, job_ids=None):
-        """Execute multiple jobs in sequence or all jobs if job_ids is None."""
+        """Execute multiple jobs, or all jobs if job_ids is None.
+
+        Jobs run in parallel on the worker pool, except that a job waits for
+        any of its dependencies that are part of the same batch.
+        """
         if job_ids is None:
             job_ids = list(range(len(self.jobs)))
 
-        results = []
         self.logger.info(f"Starting batch execution of {len(job_ids)} jobs")
 
         for job_id in job_ids:
-            if 0 <= job_id < len(self.jobs):
-                result = self.execute_job_by_id(job_id)
-                results.append(result)
-            else:
+            if not 0 <= job_id < len(self.jobs):
                 self.logger.error(f"Skipping invalid job ID: {job_id}")
-                results.append(False)
+
+        dag_run = self._start_dag_run([job_id for job_id in job_ids if 0 <= job_id < len(self.jobs)])
+        dag_run.done.wait()
+        results = [dag_run.results.get(job_id, False) for job_id in job_ids]
 
         successful = sum(1 for r in results if r)
         self.logger.info(
@@ -117,93 +245,521 @@ class CronManager:
         return results
 
     def start(self):
-        """Start the cron job scheduler."""
+        """Start the cron job scheduler.
+
+        Each enabled job's next fire time is kept in a min-heap, and the
+        scheduler sleeps until exactly the earliest deadline. Fire times are
+        advanced from the job's own cron iterator, so a long-running job can
+        delay other jobs but never makes the scheduler skip them.
+        """
         if self.running:
             return
 
         self.running = True
+        self._wakeup.clear()
         self.logger.info("Starting cron job scheduler")
+        self._build_schedule()
 
         while self.running:
             try:
-                self._check_and_run_jobs()
-                time.sleep(60)  # Check every minute
+                if self._reload_config_if_changed():
+                    continue
+
+                if not self._schedule:
+                    self._wakeup.wait(self.MAX_SLEEP_SECONDS)
+                    self._wakeup.clear()
+                    continue
+
+                next_fire, _, job_index = self._schedule[0]
+                delay = (next_fire - datetime.now()).total_seconds()
+                if delay > 0:
+                    # Cap the sleep so wall-clock jumps (suspend, DST) are noticed
+                    self._wakeup.wait(min(delay, self.MAX_SLEEP_SECONDS))
+                    self._wakeup.clear()
+                    continue
+
+                heapq.heappop(self._schedule)
+                self.logger.debug(
+                    f"Firing job {job_index} scheduled for {next_fire.strftime('%Y-%m-%d %H:%M:%S')}"
+                )
+                runs = self._runs_for_fire(job_index, next_fire)
+                if runs and job_index in self._dependencies:
+                    # Run the upstream jobs first, then this job as soon as they finish
+                    self._start_dag_run(self._ancestors(job_index) | {job_index})
+                elif runs:
+                    self._dispatch_job(job_index, runs)
+                self._push_next_fire(job_index)
             except Exception as e:
                 self.logger.error(f"Error in cron scheduler: {e}")
-                time.sleep(60)
+                self._wakeup.wait(self.MAX_SLEEP_SECONDS)
+                self._wakeup.clear()
 
     def stop(self):
         """Stop the cron job scheduler."""
         self.running = False
+        self._wakeup.set()
+        self.executor.shutdown(wait=False)
         self.logger.info("Stopping cron job scheduler")
 
-    def _check_and_run_jobs(self):
-        """Check if any jobs should run and execute them."""
+    def _reload_config_if_changed(self):
+        """Reload jobs and agents when the config file changed on disk.
+
+        The reload waits until no job is running, since running jobs are
+        tracked by their index in the job list. Returns True once applied.
+        """
+        if not self._reload_pending:
+            if not self.config.refresh():
+                return False
+            self._reload_pending = True
+            self.logger.info("Config file changed, reloading cron jobs")
+
+        with self._state_lock:
+            if any(self._running_counts.values()) or self._pending_runs:
+                return False
+            self.agent_cache.clear()
+
+        self._reload_pending = False
+        try:
+            self.default_agent = AgentFactory.create_agent(self.logger, self.config, pooled=True)
+        except Exception as e:
+            self.logger.warning(f"Failed to recreate default agent after reload, keeping current: {e}")
+        else:
+            if self.on_agent_reloaded is not None:
+                self.on_agent_reloaded(self.default_agent)
+        self._load_jobs()
+        self._build_schedule()
+        return True
+
+    def _build_schedule(self):
+        """Build the next-fire heap for all enabled, valid jobs.
+
+        A job whose persisted next-due time has already passed is seeded at
+        that time, so the windows missed while the daemon was down are handled
+        by its catch-up policy on the first pass.
+        """
         now = datetime.now()
+        self._schedule = []
+        self._iterators = {}
 
-        for job in self.jobs:
-            try:
-                inline_prompt = job.get("inline_prompt")
-                command = job.get("command")
-                arguments = job.get("arguments")
-                cron_expr = job.get("cron")
-                enabled = job.get("enabled", True)
-
-                if (not inline_prompt and not command) or (
-                    not inline_prompt and not cron_expr
-                ):
+        for job_index, job in enumerate(self.jobs):
+            inline_prompt = job.get("inline_prompt")
+            command = job.get("command")
+            cron_expr = job.get("cron")
+
+            if not inline_prompt and not command:
+                self.logger.error(f"Invalid job configuration: {job}")
+                continue
+
+            if not cron_expr:
+                if job_index not in self._dependencies:
                     self.logger.error(f"Invalid job configuration: {job}")
-                    continue
+                # Jobs without a schedule are triggered by their dependencies
+                continue
 
-                # Check if job should run now
-                cron = croniter(cron_expr, now)
-                prev_run = cron.get_prev(datetime)
+            if not job.get("enabled", True):
+                self.logger.info(f"Skipping disabled job: {self._job_title(job)}")
+                continue
 
-                # If the previous run time is within the last minute, run the job
-                time_diff = (now - prev_run).total_seconds()
-                if 0 <= time_diff < 60:
-                    if not enabled:
-                        self.logger.info(f"Skipping disabled job: {job}")
-                        continue
+            start_time = now
+            next_due = self.state.get_next_due(self._job_id(job))
+            if next_due and next_due < now:
+                start_time = next_due - timedelta(seconds=1)
 
-                    agent = self._get_agent_for_job(job)
+            try:
+                self._iterators[job_index] = croniter(cron_expr, start_time)
+            except Exception as e:
+                self.logger.error(f"Invalid cron expression '{cron_expr}' for job {self._job_title(job)}: {e}")
+                continue
+
+            if start_time < now:
+                # Keep the overdue fire time so the scheduler loop catches it up
+                self._sequence += 1
+                missed_fire = self._iterators[job_index].get_next(datetime)
+                heapq.heappush(self._schedule, (missed_fire, self._sequence, job_index))
+            else:
+                self._push_next_fire(job_index)
+
+    def _push_next_fire(self, job_index):
+        """Push a job's next fire time after now and persist it as next-due."""
+        iterator = self._iterators[job_index]
+        now = datetime.now()
+        next_fire = iterator.get_next(datetime)
+        while next_fire <= now:
+            next_fire = iterator.get_next(datetime)
+
+        self._sequence += 1
+        heapq.heappush(self._schedule, (next_fire, self._sequence, job_index))
+        self.state.set_next_due(self._job_id(self.jobs[job_index]), next_fire)
+
+    def _runs_for_fire(self, job_index, fire_time):
+        """Decide how many runs a due fire time should trigger.
+
+        A fire time reached within MAX_SLEEP_SECONDS is on time and runs once.
+        An older one means the scheduler was stopped or the machine slept;
+        every window from ``fire_time`` up to now is then treated as missed
+        and the job's ``catch_up`` policy applies: ``run_once`` runs a single
+        catch-up, ``run_all`` runs once per missed window (bounded by
+        MAX_CATCH_UP_RUNS), and ``skip`` drops them.
+        """
+        job = self.jobs[job_index]
+        iterator = self._iterators[job_index]
+        now = datetime.now()
+
+        missed = 1
+        while iterator.get_next(datetime) <= now:
+            missed += 1
+        iterator.get_prev(datetime)
+
+        if (now - fire_time).total_seconds() <= self.MAX_SLEEP_SECONDS and missed == 1:
+            return 1
+
+        policy = job.get("catch_up", self.config.get_scheduler_catch_up())
+        if policy not in self.CATCH_UP_POLICIES:
+            self.logger.warning(
+                f"Unknown catch_up policy '{policy}' for job {self._job_title(job)}, using run_once"
+            )
+            policy = "run_once"
+
+        runs = {"run_once": 1, "run_all": min(missed, self.MAX_CATCH_UP_RUNS), "skip": 0}[policy]
+        self.logger.info(
+            f"Job {self._job_title(job)} missed {missed} run(s) since "
+            f"{fire_time.strftime('%Y-%m-%d %H:%M')}; catch-up policy '{policy}' runs {runs}"
+        )
+        return runs
+
+    def get_next_fire_times(self):
+        """Get (job, next fire datetime) pairs ordered by fire time."""
+        return [(self.jobs[job_index], next_fire) for next_fire, _, job_index in sorted(self._schedule)]
+
+    def _dispatch_job(self, job_index, runs=1):
+        """Submit a due job to the worker pool, honoring its overlap settings.
+
+        ``runs`` greater than one executes the job that many times back to
+        back in a single worker, as used by the run_all catch-up policy.
+
+        A job may run at most ``max_instances`` copies at once (default 1).
+        When that limit is reached the run is dropped if ``skip_if_running``
+        is true (the default); otherwise a single run is queued and started
+        as soon as a running instance finishes.
+        """
+        job = self.jobs[job_index]
+        max_instances = job.get("max_instances", 1)
+        skip_if_running = job.get("skip_if_running", True)
+
+        with self._state_lock:
+            running = self._running_counts.get(job_index, 0)
+            if running >= max_instances:
+                if skip_if_running:
+                    self.logger.info(
+                        f"Skipping job {self._job_title(job)}: {running} instance(s) still running"
+                    )
+                else:
+                    self._pending_runs.add(job_index)
+                    self.logger.info(
+                        f"Queued job {self._job_title(job)} behind {running} running instance(s)"
+                    )
+                return None
+            self._running_counts[job_index] = running + 1
+
+        if runs > 1:
+            future = self.executor.submit(self._execute_job_runs, job, runs)
+        else:
+            future = self.executor.submit(self._execute_job, job)
+        with self._state_lock:
+            self._running_futures[job_index] = future
+        future.add_done_callback(lambda done: self._on_job_done(job_index, done))
+        return future
+
+    def _on_job_done(self, job_index, future):
+        """Release a job instance and start its queued run and ready dependents."""
+        with self._state_lock:
+            self._running_counts[job_index] -= 1
+            if self._running_futures.get(job_index) is future:
+                del self._running_futures[job_index]
+            run_pending = job_index in self._pending_runs and self.running
+            self._pending_runs.discard(job_index)
+
+        if run_pending:
+            self._dispatch_job(job_index)
+
+        if self.running and not future.cancelled() and future.exception() is None and future.result():
+            self._trigger_dependents(job_index)
+
+    def _trigger_dependents(self, job_index):
+        """Start unscheduled dependents whose upstream jobs have all succeeded since their last run."""
+        for dependent_index in self._dependents.get(job_index, ()):
+            dependent = self.jobs[dependent_index]
+            if dependent.get("cron") or not dependent.get("enabled", True):
+                continue
+
+            last_run = self.state.get(self._job_id(dependent)).get("last_run", "")
+            upstream_done = all(
+                self.state.get(self._job_id(self.jobs[upstream_index])).get("last_success", "") > last_run
+                for upstream_index in self._dependencies[dependent_index]
+            )
+            if upstream_done:
+                self.logger.info(
+                    f"Upstream jobs of {self._job_title(dependent)} completed, starting it"
+                )
+                self._dispatch_job(dependent_index)
+
+    def _start_dag_run(self, job_indexes):
+        """Run jobs in dependency order, starting each one as soon as its upstream jobs finish.
+
+        Independent branches run in parallel on the worker pool. Disabled jobs
+        are treated as already satisfied, and a failed job cancels everything
+        downstream of it in this run.
+        """
+        dag_run = DagRun(job_indexes, self._dependencies)
+        self.logger.info(
+            f"Starting dependency run of {len(dag_run.nodes)} job(s): "
+            f"{', '.join(self._job_title(self.jobs[i]) for i in sorted(dag_run.nodes))}"
+        )
+        self._advance_dag_run(dag_run)
+        return dag_run
+
+    def _advance_dag_run(self, dag_run):
+        """Start every job in a run whose dependencies are satisfied."""
+        with dag_run.lock:
+            ready = [
+                node for node, pending in dag_run.pending.items()
+                if not pending and node not in dag_run.started
+            ]
+            dag_run.started.update(ready)
+
+        for node in ready:
+            job = self.jobs[node]
+            if not job.get("enabled", True):
+                self._finish_dag_node(dag_run, node, True)
+                continue
+
+            future = self._dispatch_job(node)
+            if future is None:
+                # Already running: wait for that instance instead of starting another
+                with self._state_lock:
+                    future = self._running_futures.get(node)
+            if future is None:
+                self._finish_dag_node(dag_run, node, False)
+            else:
+                future.add_done_callback(
+                    lambda done, node=node: self._finish_dag_node(
+                        dag_run, node, not done.cancelled() and done.exception() is None and bool(done.result())
+                    )
+                )
+
+    def _finish_dag_node(self, dag_run, node, success):
+        """Record a finished job in a run and start or cancel its dependents."""
+        cancelled = []
+        with dag_run.lock:
+            dag_run.results[node] = success
+            for downstream, pending in dag_run.pending.items():
+                if node in pending:
+                    pending.discard(node)
+                    if not success and downstream not in dag_run.started:
+                        cancelled.append(downstream)
+
+        for downstream in cancelled:
+            self.logger.warning(
+                f"Skipping {self._job_title(self.jobs[downstream])}: upstream job "
+                f"{self._job_title(self.jobs[node])} failed"
+            )
+            with dag_run.lock:
+                dag_run.started.add(downstream)
+            self._finish_dag_node(dag_run, downstream, False)
+
+        self._advance_dag_run(dag_run)
+        with dag_run.lock:
+            if len(dag_run.results) == len(dag_run.nodes):
+                dag_run.done.set()
+
+    def _execute_job_runs(self, job, runs):
+        """Run a job several times in sequence and return whether all runs succeeded."""
+        results = [self._execute_job(job) for _ in range(runs)]
+        return all(results)
+
+    def _execute_job(self, job):
+        """Run a job with its configured agent and return whether it succeeded."""
+        with self.logger.context(component="cron", job=self._job_id(job)):
+            started_at = datetime.now()
+            success = False
+            inline_prompt = job.get("inline_prompt")
+            timeout = job.get("timeout_seconds")
+            try:
+                agent = self._get_agent_for_job(job)
+                with self.history.track(
+                    self._job_id(job),
+                    "cron",
+                    agent=agent.get_agent_name(),
+                    prompt_chars=len(inline_prompt) if inline_prompt else None,
+                ) as run:
                     if inline_prompt:
-                        self._run_job_with_agent(inline_prompt, agent)
+                        success = self._run_job_with_agent(inline_prompt, agent, run, timeout=timeout, job=job)
                     else:
-                        self._run_job_with_command(command, arguments, agent)
-
+                        success = self._run_job_with_command(
+                            job.get("command"),
+                            job.get("arguments"),
+                            agent,
+                            executor=job.get("executor", "thread"),
+                            agent_type=job.get("agent"),
+                            timeout=timeout,
+                        )
+                    run.success = success
             except Exception as e:
-                self.logger.error(f"Error checking job {job}: {e}")
+                self.logger.error(f"Error running job {job}: {e}")
 
-    def _run_job_with_agent(self, inline_prompt, agent):
-        """Run a single inline prompt for a cron job with specified agent."""
+            try:
+                self.state.record_run(self._job_id(job), started_at, success)
+            except Exception as e:
+                self.logger.warning(f"Failed to persist cron state: {e}")
+            return success
+
+    def _job_id(self, job):
+        """Get a stable identifier for a job, used as its key in persisted state."""
+        if job.get("id"):
+            return job["id"]
+        if job.get("inline_prompt"):
+            return job["inline_prompt"]
+        arguments = job.get("arguments")
+        if arguments:
+            return f"{job.get('command')} {json.dumps(arguments, sort_keys=True)}"
+        return job.get("command")
+
+    def _job_title(self, job):
+        """Get a short display title for a job."""
+        inline_prompt = job.get("inline_prompt")
+        return f'"{inline_prompt}"' if inline_prompt else f"[{job.get('command')}]"
+
+    def _run_job_with_agent(self, inline_prompt, agent, run=None, timeout=None, job=None):
+        """Run a single inline prompt for a cron job with specified agent.
+
+        When a history ``run`` is given, the response size is recorded on it.
+        A timeout counts as a failed run; the partial output is logged.
+        For a ``job`` with ``reuse_session``, the agent session of its last
+        run is resumed and the returned session is saved for the next one.
+        """
         self.logger.info(
             f"Running cron job inline prompt: {inline_prompt} using {agent.get_agent_name()}"
         )
 
-        session_id = None
+        job_id = self._acquire_session(job) if job is not None else None
+        if job_id:
+            session_agent = self._session_agent(agent)
+            if session_agent is None:
+                self.logger.warning(f"{agent.get_agent_name()} cannot resume sessions, running {job_id} cold")
+                with self._state_lock:
+                    self._sessions_in_use.discard(job_id)
+                job_id = None
+            else:
+                agent = session_agent
+        session_id = self._resume_session(job, job_id) if job_id else None
+        success = False
 
         try:
             # Run the prompt using the specified agent
             result = agent.run_prompt(
-                inline_prompt=inline_prompt, session_id=session_id
+                inline_prompt=inline_prompt, session_id=session_id, timeout=timeout, use_cache=False
             )
             if result and result[0]:
+                if run is not None:
+                    run.response_chars = len(result[0])
+                    run.agent = answered_by(result, agent)
+                    run.agent_seconds = getattr(result, 'agent_seconds', None)
+                if job_id and result[1]:
+                    self.state.record_session_turn(
+                        job_id, result[1], len(inline_prompt) + len(result[0]), new_session=session_id is None
+                    )
                 self.logger.info(f"Prompt completed successfully")
-                return True
+                success = True
             else:
                 self.logger.error(f"Prompt failed")
-                return False
+        except AgentTimeoutError as e:
+            self.logger.error(f"Prompt cancelled: {e}")
+            if e.partial_output:
+                self.logger.info(f"Partial output before timeout:\n{e.partial_output}")
+            if run is not None:
+                run.error = str(e)
+                run.response_chars = len(e.partial_output)
         except Exception as e:
             self.logger.error(f"Error running prompt: {e}")
-            return False
-
-    def _run_job_with_command(self, command, arguments, agent):
-        """Run a single command for a cron job."""
+        finally:
+            if job_id:
+                if session_id and not success:
+                    # A session that failed to resume is not retried on the next run
+                    self.state.clear_session(job_id)
+                with self._state_lock:
+                    self._sessions_in_use.discard(job_id)
+        return success
+
+    def _session_agent(self, agent):
+        """Get the agent a session job runs on, or None when it cannot resume sessions.
+
+        A session only exists on the agent that created it, so a pool is
+        pinned to its first member that supports sessions.
+        """
+        if isinstance(agent, AgentPool):
+            for member in agent.members:
+                if member.agent.supports_sessions:
+                    return agent.pinned(member.agent.agent_type)
+            return None
+        return agent if agent.supports_sessions else None
+
+    def _acquire_session(self, job):
+        """Claim a job's session for this run, returning the job id or None.
+
+        Returns None when the job does not reuse sessions or another running
+        instance already holds its session; that run then starts cold.
+        """
+        if not job.get("reuse_session"):
+            return None
+        job_id = self._job_id(job)
+        with self._state_lock:
+            if job_id in self._sessions_in_use:
+                return None
+            self._sessions_in_use.add(job_id)
+        return job_id
+
+    def _resume_session(self, job, job_id):
+        """Get the session to resume for a job, rolling over old or oversized ones."""
+        stored = self.state.get(job_id)
+        session_id = stored.get("session_id")
+        if not session_id:
+            return None
+
+        max_age = timedelta(hours=job.get("session_max_age_hours", self.SESSION_MAX_AGE_HOURS))
+        reason = None
+        if not stored.get("session_started") or (
+            datetime.now() - datetime.fromisoformat(stored["session_started"]) > max_age
+        ):
+            reason = "session expired"
+        elif stored.get("session_turns", 0) >= job.get("session_max_turns", self.SESSION_MAX_TURNS):
+            reason = "turn limit reached"
+        elif stored.get("session_chars", 0) >= job.get("session_max_chars", self.SESSION_MAX_CHARS):
+            reason = "context size limit reached"
+
+        if reason:
+            self.logger.info(f"Starting a fresh session for {job_id}: {reason}")
+            self.state.clear_session(job_id)
+            return None
+
+        self.logger.info(f"Resuming session {session_id} for {job_id}")
+        return session_id
+
+    def _run_job_with_command(self, command, arguments, agent, executor="thread", agent_type=None,
+                              timeout=None):
+        """Run a single command for a cron job.
+
+        With ``executor="process"`` the command runs in a separate
+        ``ai4pkm -cmd`` process so CPU-heavy work does not share the GIL
+        with the scheduler. A command with a timeout always runs in a child
+        process, since a worker thread cannot be cancelled.
+        """
         self.logger.info(f"Running cron job command: {command}")
         try:
             # Run the command
-            result = CommandRunner(self.logger).run_command(command, arguments, agent)
+            if executor == "process" or timeout:
+                result = self._run_command_in_process(command, arguments, agent_type, timeout)
+            else:
+                result = CommandRunner(self.logger).run_command(command, arguments, agent)
             if result:
                 self.logger.info(f"Command completed successfully")
                 return True
@@ -213,3 +769,30 @@ class CronManager:
         except Exception as e:
             self.logger.error(f"Error running command: {e}")
             return False
+
+    def _run_command_in_process(self, command, arguments, agent_type=None, timeout=None):
+        """Run a command in a child ai4pkm process and return whether it succeeded.
+
+        On timeout the child's whole process group is killed, which also stops
+        any helper processes (osascript, exiftool, agent CLIs) it started.
+        """
+        cmd = [
+            sys.executable, "-m", "ai4pkm_cli.main",
+            "--command", command,
+            "--arguments", json.dumps(arguments or {}),
+        ]
+        if agent_type:
+            cmd.extend(["--agent", agent_type])
+
+        self.logger.debug(f"Starting command process: {' '.join(cmd)}")
+        process = subprocess.Popen(cmd, start_new_session=True)
+        try:
+            return process.wait(timeout=timeout) == 0
+        except subprocess.TimeoutExpired:
+            self.logger.error(f"Command {command} timed out after {timeout:g}s, killing it")
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            process.wait()
+            return False
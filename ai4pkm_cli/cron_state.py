@@ -0,0 +1,94 @@
+"""Persistent cron scheduler state."""
+
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+
+class CronState:
+    """JSON ledger of last-run and next-due timestamps for each cron job.
+
+    The ledger lets the scheduler notice windows that were missed while the
+    daemon was stopped or the machine was asleep. It also keeps the agent
+    session a job resumes on its next run.
+    """
+
+    def __init__(self, state_file=None):
+        """Initialize cron state."""
+        if state_file is None:
+            state_file = os.path.join(os.getcwd(), "_Settings_", "Logs", "cron_state.json")
+
+        self.state_file = state_file
+        self.lock = threading.Lock()
+        self.jobs = self._load_state()
+
+    def _load_state(self) -> Dict[str, Dict[str, Any]]:
+        """Load state from file, starting empty when missing or unreadable."""
+        if not os.path.exists(self.state_file):
+            return {}
+
+        try:
+            with open(self.state_file, 'r') as f:
+                return json.load(f).get('jobs', {})
+        except Exception as e:
+            print(f"⚠️  Error loading cron state, starting fresh: {e}")
+            return {}
+
+    def _save_state(self):
+        """Atomically write state to file. Caller must hold the lock."""
+        os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+        tmp_file = f"{self.state_file}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump({'jobs': self.jobs}, f, indent=2)
+        os.replace(tmp_file, self.state_file)
+
+    def get(self, job_id: str) -> Dict[str, Any]:
+        """Get a copy of the stored state for a job."""
+        with self.lock:
+            return dict(self.jobs.get(job_id, {}))
+
+    def get_next_due(self, job_id: str) -> Optional[datetime]:
+        """Get the persisted next-due time for a job, if any."""
+        value = self.get(job_id).get('next_due')
+        return datetime.fromisoformat(value) if value else None
+
+    def update(self, job_id: str, **fields):
+        """Update fields for a job and persist the ledger."""
+        values = {
+            key: value.isoformat() if isinstance(value, datetime) else value
+            for key, value in fields.items()
+        }
+        with self.lock:
+            self.jobs.setdefault(job_id, {}).update(values)
+            self._save_state()
+
+    def set_next_due(self, job_id: str, next_due: datetime):
+        """Persist the next time a job is due."""
+        self.update(job_id, next_due=next_due)
+
+    def record_run(self, job_id: str, started_at: datetime, success: bool):
+        """Persist the outcome of a job run."""
+        fields = {
+            'last_run': started_at,
+            'last_status': 'success' if success else 'failed',
+        }
+        if success:
+            fields['last_success'] = started_at
+        self.update(job_id, **fields)
+
+    def record_session_turn(self, job_id: str, session_id: str, chars: int, new_session: bool):
+        """Persist the session a job used, counting its turns and context size."""
+        stored = self.get(job_id)
+        if new_session or not stored.get('session_started'):
+            self.update(job_id, session_id=session_id, session_started=datetime.now(),
+                        session_turns=1, session_chars=chars)
+        else:
+            self.update(job_id, session_id=session_id,
+                        session_turns=stored.get('session_turns', 0) + 1,
+                        session_chars=stored.get('session_chars', 0) + chars)
+
+    def clear_session(self, job_id: str):
+        """Forget a job's session so its next run starts fresh."""
+        self.update(job_id, session_id=None, session_started=None, session_turns=0, session_chars=0)
@@ -0,0 +1,141 @@
+"""Production WSGI serving for the web API."""
+
+import threading
+import time
+from typing import Optional
+
+from werkzeug.serving import make_server
+
+try:
+    from waitress.server import create_server as create_waitress_server
+except ImportError:
+    create_waitress_server = None
+
+
+class RequestTracker:
+    """WSGI middleware that caps and counts requests in flight.
+
+    At most ``max_concurrent`` requests run the app at once; the rest wait
+    for a slot. A request stays in flight until its response (including a
+    streamed one) has been fully sent, so shutdown can drain it.
+    """
+
+    def __init__(self, app, max_concurrent: int):
+        """Wrap a WSGI app."""
+        self.app = app
+        self.slots = threading.BoundedSemaphore(max_concurrent)
+        self.in_flight = 0
+        self.idle = threading.Condition()
+
+    def __call__(self, environ, start_response):
+        self.slots.acquire()
+        with self.idle:
+            self.in_flight += 1
+        try:
+            body = self.app(environ, start_response)
+        except BaseException:
+            self._finish()
+            raise
+        return self._track(body)
+
+    def _track(self, body):
+        try:
+            for chunk in body:
+                yield chunk
+        finally:
+            try:
+                if hasattr(body, 'close'):
+                    body.close()
+            finally:
+                self._finish()
+
+    def _finish(self):
+        with self.idle:
+            self.in_flight -= 1
+            self.idle.notify_all()
+        self.slots.release()
+
+    def wait_idle(self, timeout: float) -> bool:
+        """Wait until no request is in flight; return False on timeout."""
+        deadline = time.monotonic() + timeout
+        with self.idle:
+            while self.in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self.idle.wait(remaining)
+        return True
+
+
+class HTTPServer:
+    """WSGI server running under waitress when installed, else Werkzeug's threaded server.
+
+    ``threads`` bounds the requests handled at once under either backend.
+    ``channel_timeout`` (waitress only) closes idle keep-alive connections.
+    ``serve`` blocks until ``shutdown`` is called from another thread.
+    Shutdown stops accepting connections, then gives requests in flight up
+    to ``timeout`` seconds to finish.
+    """
+
+    def __init__(self, app, host: str, port: int, threads: int = 8, channel_timeout: int = 120,
+                 connection_limit: int = 100, backend: Optional[str] = None):
+        """Create the server and bind its socket."""
+        self.tracker = RequestTracker(app, threads)
+        if backend is None:
+            backend = 'waitress' if create_waitress_server is not None else 'werkzeug'
+        if backend == 'waitress' and create_waitress_server is None:
+            raise ValueError("waitress is not installed. Install with: pip install 'ai4pkm-cli[serve]'")
+        self.backend = backend
+
+        if backend == 'waitress':
+            self.server = create_waitress_server(
+                self.tracker, host=host, port=port, threads=threads,
+                channel_timeout=channel_timeout, connection_limit=connection_limit,
+            )
+        else:
+            self.server = make_server(host, port, self.tracker, threaded=True)
+        self._stopped = threading.Event()
+
+    @property
+    def port(self) -> int:
+        """Port the server listens on (useful when bound to port 0)."""
+        if self.backend == 'waitress':
+            return self.server.effective_port
+        return self.server.server_port
+
+    def serve(self):
+        """Serve requests until shutdown."""
+        try:
+            if self.backend == 'waitress':
+                self.server.run()
+            else:
+                self.server.serve_forever()
+        except (OSError, ValueError):
+            # Closing the sockets from shutdown can end waitress' loop this way
+            if not self._stopped.is_set():
+                raise
+
+    def shutdown(self, timeout: float = 30) -> bool:
+        """Stop accepting requests and drain the ones in flight.
+
+        Returns False if requests were still running after ``timeout``.
+        """
+        self._stopped.set()
+        if self.backend == 'waitress':
+            # Stop accepting, drain, let responses flush, then close every channel to end the loop
+            self.server.accepting = False
+            drained = self.tracker.wait_idle(timeout)
+            deadline = time.monotonic() + 2
+            while time.monotonic() < deadline and any(
+                channel.total_outbufs_len for channel in list(self.server.active_channels.values())
+            ):
+                time.sleep(0.05)
+            while self.server._map:
+                for channel in list(self.server._map.values()):
+                    channel.handle_close()
+            self.server.task_dispatcher.shutdown(timeout=1)
+        else:
+            self.server.shutdown()
+            drained = self.tracker.wait_idle(timeout)
+            self.server.server_close()
+        return drained
@@ -0,0 +1,159 @@
+"""Execution history store for cron jobs and one-shot runs."""
+
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional, List, Dict, Any
+
+
+class JobRun:
+    """Mutable record of a single execution, filled in while it runs."""
+
+    def __init__(self, job_id: str, kind: str, agent: Optional[str], prompt_chars: Optional[int]):
+        self.job_id = job_id
+        self.kind = kind
+        self.agent = agent
+        self.prompt_chars = prompt_chars
+        self.response_chars = None
+        self.agent_seconds = None  # Time spent in the agent itself, when the agent reports it
+        self.success = False
+        self.error = None
+        self.started_at = time.time()
+
+
+class JobHistory:
+    """SQLite-backed history of executions with latency statistics."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS executions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            agent TEXT,
+            started_at REAL NOT NULL,
+            duration REAL NOT NULL,
+            success INTEGER NOT NULL,
+            prompt_chars INTEGER,
+            response_chars INTEGER,
+            error TEXT,
+            agent_seconds REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_executions_started ON executions (started_at);
+        CREATE INDEX IF NOT EXISTS idx_executions_job ON executions (job_id, started_at);
+        CREATE INDEX IF NOT EXISTS idx_executions_agent ON executions (agent, started_at);
+    """
+
+    GROUP_COLUMNS = ("job_id", "agent")
+
+    def __init__(self, db_file=None):
+        """Initialize history store, creating the database if needed."""
+        if db_file is None:
+            db_file = os.path.join(os.getcwd(), "_Settings_", "Logs", "history.db")
+
+        self.db_file = db_file
+        os.makedirs(os.path.dirname(self.db_file), exist_ok=True)
+        with self._connect() as conn:
+            # WAL lets the cron daemon and one-shot runs write concurrently
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self.SCHEMA)
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(executions)")]
+            if "agent_seconds" not in columns:
+                # Databases created before agent time was recorded
+                conn.execute("ALTER TABLE executions ADD COLUMN agent_seconds REAL")
+
+    @contextmanager
+    def _connect(self):
+        """Open a short-lived connection; connections are not shared across threads."""
+        conn = sqlite3.connect(self.db_file, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def record(self, job_id: str, kind: str, agent: Optional[str], started_at: float,
+               duration: float, success: bool, prompt_chars: Optional[int] = None,
+               response_chars: Optional[int] = None, error: Optional[str] = None,
+               agent_seconds: Optional[float] = None):
+        """Record a finished execution."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO executions (job_id, kind, agent, started_at, duration, success,"
+                " prompt_chars, response_chars, error, agent_seconds) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, agent, started_at, duration, int(bool(success)),
+                 prompt_chars, response_chars, error, agent_seconds),
+            )
+
+    @contextmanager
+    def track(self, job_id: str, kind: str, agent: Optional[str] = None,
+              prompt_chars: Optional[int] = None):
+        """Time the enclosed block and record it as one execution.
+
+        The yielded JobRun should have ``success`` (and ``response_chars``
+        and ``agent_seconds`` when known) set by the caller; an exception
+        marks the run failed.
+        """
+        run = JobRun(job_id, kind, agent, prompt_chars)
+        try:
+            yield run
+        except Exception as e:
+            run.success = False
+            run.error = str(e)
+            raise
+        finally:
+            try:
+                self.record(
+                    run.job_id, run.kind, run.agent, run.started_at,
+                    time.time() - run.started_at, run.success,
+                    run.prompt_chars, run.response_chars, run.error, run.agent_seconds,
+                )
+            except sqlite3.Error:
+                # History is best effort and must never fail the run itself
+                pass
+
+    def stats(self, since: datetime, group_by: str = "job_id") -> List[Dict[str, Any]]:
+        """Get run counts and p50/p95 latency per job or per agent since a time.
+
+        ``overhead_p50`` is the median run time outside the agent, for runs
+        whose agent reports its own time (the replay agent), else None.
+        """
+        if group_by not in self.GROUP_COLUMNS:
+            raise ValueError(f"Invalid group_by: {group_by}. Must be one of: {', '.join(self.GROUP_COLUMNS)}")
+
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {group_by}, duration, success, agent_seconds FROM executions"
+                f" WHERE started_at >= ? ORDER BY {group_by}, duration",
+                (since.timestamp(),),
+            ).fetchall()
+
+        groups = {}
+        for key, duration, success, agent_seconds in rows:
+            group = groups.setdefault(key or "-", {"durations": [], "failures": 0, "overheads": []})
+            group["durations"].append(duration)
+            if agent_seconds is not None:
+                group["overheads"].append(max(duration - agent_seconds, 0.0))
+            if not success:
+                group["failures"] += 1
+
+        results = []
+        for key, group in groups.items():
+            durations = group["durations"]  # Already sorted by the query
+            results.append({
+                "key": key,
+                "runs": len(durations),
+                "failures": group["failures"],
+                "p50": self._percentile(durations, 50),
+                "p95": self._percentile(durations, 95),
+                "max": durations[-1],
+                "overhead_p50": self._percentile(sorted(group["overheads"]), 50) if group["overheads"] else None,
+            })
+        return sorted(results, key=lambda r: r["p95"], reverse=True)
+
+    @staticmethod
+    def _percentile(sorted_values: List[float], percentile: float) -> float:
+        """Nearest-rank percentile of already sorted values."""
+        rank = max(1, -(-len(sorted_values) * percentile // 100))
+        return sorted_values[int(rank) - 1]
@@ -0,0 +1,103 @@
+"""Query structured JSONL logs written by the Logger."""
+
+import bisect
+import glob
+import gzip
+import json
+import os
+import re
+from datetime import datetime
+from typing import Optional, List, Dict, Any
+
+LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+
+# Index entries are sparse and records are written in batches, so seek a
+# little before the requested time to avoid skipping records near the edge.
+SEEK_SLACK_SECONDS = 5
+
+# Current JSONL logs and their rotated segments, e.g. ai4pkm_2025-01-31.jsonl.2.gz
+_LOG_FILE = re.compile(r"^(ai4pkm.*?)\.jsonl(?:\.(\d+))?(\.gz)?$")
+_DATED_FILE = re.compile(r"ai4pkm_(\d{4}-\d{2}-\d{2})")
+
+
+def query_logs(logs_dir: str, since: Optional[datetime] = None, level: Optional[str] = None,
+               job: Optional[str] = None, component: Optional[str] = None,
+               limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Get log records matching the filters, oldest first.
+
+    ``level`` is a minimum level, so ``WARNING`` also returns errors. When
+    ``limit`` is given only the most recent matching records are returned.
+    """
+    min_level = None
+    if level:
+        level = level.upper()
+        if level not in LEVELS:
+            raise ValueError(f"Invalid level: {level}. Must be one of: {', '.join(LEVELS)}")
+        min_level = LEVELS.index(level)
+
+    results = []
+    for path in _log_files(logs_dir, since):
+        offset = _seek_offset(path, since) if since else 0
+        for record in _read_records(path, offset):
+            if since and datetime.fromisoformat(record["ts"]) < since:
+                continue
+            if min_level is not None and LEVELS.index(record.get("level", "INFO")) < min_level:
+                continue
+            if job and record.get("job") != job:
+                continue
+            if component and record.get("component") != component:
+                continue
+            results.append(record)
+
+    if limit:
+        results = results[-limit:]
+    return results
+
+
+def _log_files(logs_dir: str, since: Optional[datetime]) -> List[str]:
+    """Get JSONL logs and rotated segments that may hold records after ``since``, oldest first."""
+    files = []
+    for path in glob.glob(os.path.join(logs_dir, "ai4pkm*.jsonl*")):
+        name = os.path.basename(path)
+        match = _LOG_FILE.match(name)
+        if not match:
+            continue  # Offset indexes
+        dated = _DATED_FILE.match(name)
+        if since and dated and dated.group(1) < since.strftime("%Y-%m-%d"):
+            continue
+        # Higher backup numbers are older; the current file comes last
+        files.append(((match.group(1), -int(match.group(2) or 0)), path))
+    return [path for _, path in sorted(files)]
+
+
+def _seek_offset(path: str, since: datetime) -> int:
+    """Find a byte offset at or before the first record newer than ``since``."""
+    index_file = f"{path[:-len('.gz')] if path.endswith('.gz') else path}.idx"
+    if not os.path.exists(index_file):
+        return 0
+
+    timestamps = []
+    offsets = []
+    with open(index_file, "r") as f:
+        for line in f:
+            try:
+                timestamp, offset = line.split()
+                timestamps.append(float(timestamp))
+                offsets.append(int(offset))
+            except ValueError:
+                continue  # Partially written line
+
+    # Offsets grow with the file; timestamps are ordered up to the slack
+    position = bisect.bisect_left(timestamps, since.timestamp() - SEEK_SLACK_SECONDS) - 1
+    return offsets[position] if position >= 0 else 0
+
+
+def _read_records(path: str, offset: int):
+    """Yield records from a JSONL file or gzipped segment starting at a byte offset."""
+    with (gzip.open(path, "rb") if path.endswith(".gz") else open(path, "rb")) as f:
+        f.seek(offset)
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue  # Partially written line
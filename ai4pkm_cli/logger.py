@@ -1,19 +1,58 @@
 """Logging system with file output and real-time tail display."""
 
+import atexit
+import glob
+import gzip
+import json
 import os
+import queue
+import shutil
 import time
 import logging
-from datetime import datetime
-from threading import Lock
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 from rich.console import Console
 from rich.text import Text
 
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to unlocked appends
+    fcntl = None
+
 
 class Logger:
-    """Logger that writes to logs.txt and supports real-time tail display."""
+    """Logger that writes to logs.txt and supports real-time tail display.
+
+    Callers only enqueue entries; a background writer thread keeps the log
+    file open, appends entries in batches at most every ``flush_interval``
+    seconds and renders console output.
+
+    Several ai4pkm processes can share one log directory: the file is only
+    ever appended to, each batch is written under an exclusive lock, and a
+    file rotated by another process is reopened. The default dated log
+    switches to a new file at midnight, is rotated once it exceeds
+    ``max_bytes`` (keeping ``backup_count`` optionally gzipped backups), and
+    logs older than ``retention_days`` are removed on startup.
+
+    Every entry is also written as a JSON record (timestamp, level,
+    component, job id and message) to a ``.jsonl`` file next to the text
+    log. A sparse ``.jsonl.idx`` file maps timestamps to byte offsets so
+    queries can seek straight to a point in time; see ``log_query``. The
+    JSONL log and its index are rotated together with the text log, once
+    either log exceeds ``max_bytes``.
+    """
+
+    FLUSH_INTERVAL = 0.5  # Seconds an entry may wait before it is written
+    MAX_BATCH = 500  # Entries taken from the queue at once
+    INDEX_INTERVAL = 60  # Seconds between entries in the JSONL offset index
+    _STOP = object()  # Queue sentinel that stops the writer thread
     
-    def __init__(self, log_file=None, console_output=True):
+    def __init__(self, log_file=None, console_output=True, flush_interval=FLUSH_INTERVAL,
+                 max_bytes=10 * 1024 * 1024, backup_count=5, compress=True, retention_days=30):
         """Initialize logger."""
+        # Dated logs roll over to a new file every day
+        self.dated = log_file is None
         if log_file is None:
             # Use current working directory as project root
             project_root = os.getcwd()
@@ -24,25 +63,278 @@ class Logger:
             # Ensure logs directory exists
             os.makedirs(logs_dir, exist_ok=True)
             
-            # Create date-based log filename with ai4pkm prefix
-            date_str = datetime.now().strftime("%Y-%m-%d")
-            log_file = os.path.join(logs_dir, f"ai4pkm_{date_str}.log")
+            log_file = self._dated_log_file(logs_dir)
         
         self.log_file = log_file
-        self.lock = Lock()
+        self.logs_dir = os.path.dirname(os.path.abspath(log_file))
         self.console_output = console_output
         self.console = Console() if console_output else None
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.compress = compress
+        self.retention_days = retention_days
+        self.lock_file = os.path.join(self.logs_dir, ".ai4pkm_log.lock")
         
         # Print log file path for user reference
         # print(f"📝 Log file: {os.path.abspath(self.log_file)}")
         
+        self._file = None
+        self._jsonl_file = None
+        self._index_file = None
+        self._last_indexed = 0.0
+        self._context = threading.local()
+        self._queue = queue.Queue()
+        self._closed = False
         self._ensure_log_file()
+        if self.dated and self.retention_days:
+            self._remove_expired_logs()
+
+        self._writer = threading.Thread(target=self._writer_loop, name="log-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    @staticmethod
+    def _dated_log_file(logs_dir):
+        """Get the log path for today in a logs directory."""
+        # Create date-based log filename with ai4pkm prefix
+        date_str = datetime.now().strftime("%Y-%m-%d")
+        return os.path.join(logs_dir, f"ai4pkm_{date_str}.log")
         
     def _ensure_log_file(self):
-        """Ensure log file exists and clear it for fresh start."""
-        with open(self.log_file, 'w') as f:
-            f.write(f"PKM CLI Log - Started at {datetime.now().isoformat()}\n")
-            f.write("=" * 60 + "\n")
+        """Open the log file for appending and mark where this process started.
+
+        The file is never truncated, so a one-off run does not wipe the log
+        of a daemon that is writing to the same file.
+        """
+        self._file = open(self.log_file, 'a')
+        self._open_jsonl()
+        self._write_entries([
+            f"PKM CLI Log - Started at {datetime.now().isoformat()} (pid {os.getpid()})\n",
+            "=" * 60 + "\n",
+        ])
+
+    @property
+    def jsonl_file(self):
+        """Path of the structured JSONL log for the current log file."""
+        return f"{os.path.splitext(self.log_file)[0]}.jsonl"
+
+    def _open_jsonl(self):
+        """Open the structured JSONL log and its offset index for the current log file."""
+        self._jsonl_file = open(self.jsonl_file, 'ab')
+        self._index_file = open(f"{self.jsonl_file}.idx", 'a')
+        self._last_indexed = 0.0
+
+    @contextmanager
+    def context(self, component=None, job=None):
+        """Tag entries logged by the current thread inside the block with a component and job id."""
+        previous = (getattr(self._context, 'component', None), getattr(self._context, 'job', None))
+        self._context.component = component or previous[0]
+        self._context.job = job or previous[1]
+        try:
+            yield self
+        finally:
+            self._context.component, self._context.job = previous
+
+    @contextmanager
+    def _file_lock(self):
+        """Hold an exclusive lock shared by every process logging to this directory."""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_file, 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _write_entries(self, entries, records=()):
+        """Append entries to the log file and records to the JSONL log, rolling and rotating as needed."""
+        if self.dated:
+            current_file = self._dated_log_file(self.logs_dir)
+            if current_file != self.log_file:
+                self._file.close()
+                self._jsonl_file.close()
+                self._index_file.close()
+                self.log_file = current_file
+                self._file = open(self.log_file, 'a')
+                self._open_jsonl()
+
+        data = "".join(entries)
+        with self._file_lock():
+            self._reopen_if_rotated()
+            if self.max_bytes and (
+                (self._file.tell() > 0 and self._file.tell() + len(data) > self.max_bytes)
+                or self._jsonl_file.tell() > self.max_bytes
+            ):
+                self._rotate()
+            self._file.write(data)
+            self._file.flush()
+            if records:
+                self._write_records(records)
+
+    def _write_records(self, records):
+        """Append JSON records and index their offsets. Caller must hold the file lock."""
+        self._jsonl_file.seek(0, os.SEEK_END)
+        offset = self._jsonl_file.tell()
+        lines = []
+        index_lines = []
+        for epoch, record in records:
+            line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+            if epoch - self._last_indexed >= self.INDEX_INTERVAL:
+                index_lines.append(f"{epoch:.3f} {offset}\n")
+                self._last_indexed = epoch
+            lines.append(line)
+            offset += len(line)
+
+        self._jsonl_file.write(b"".join(lines))
+        self._jsonl_file.flush()
+        if index_lines:
+            self._index_file.write("".join(index_lines))
+            self._index_file.flush()
+
+    @staticmethod
+    def _is_replaced(path, handle):
+        """Check whether the file at a path is no longer the one a handle has open."""
+        try:
+            return os.stat(path).st_ino != os.fstat(handle.fileno()).st_ino
+        except FileNotFoundError:
+            return True
+
+    def _reopen_if_rotated(self):
+        """Reopen the log files if another process rotated them away."""
+        if self._is_replaced(self.log_file, self._file):
+            self._file.close()
+            self._file = open(self.log_file, 'a')
+        else:
+            self._file.seek(0, os.SEEK_END)
+        if self._is_replaced(self.jsonl_file, self._jsonl_file):
+            self._jsonl_file.close()
+            self._index_file.close()
+            self._open_jsonl()
+        else:
+            self._jsonl_file.seek(0, os.SEEK_END)
+
+    def _rotate(self):
+        """Rotate the text log, the JSONL log and its index, and start fresh files.
+
+        Caller must hold the file lock. Backups of all three share their
+        numbers, e.g. ``.log.1.gz``, ``.jsonl.1.gz`` and ``.jsonl.1.idx``;
+        indexes stay uncompressed.
+        """
+        self._file.close()
+        self._jsonl_file.close()
+        self._index_file.close()
+
+        self._rotate_file(self.log_file, self.compress)
+        self._rotate_file(self.jsonl_file, self.compress)
+        self._rotate_file(f"{self.jsonl_file}.idx", False, index_of=self.jsonl_file)
+
+        self._file = open(self.log_file, 'a')
+        self._open_jsonl()
+
+    def _rotate_file(self, path, compress, index_of=None):
+        """Shift a file's numbered backups and move it to backup 1.
+
+        The index of a JSONL log is named after its segment, e.g.
+        ``.jsonl.1.idx`` for ``.jsonl.1.gz``.
+        """
+        suffix = ".gz" if compress else ""
+
+        def backup_path(index):
+            if index_of is not None:
+                return f"{index_of}.{index}.idx"
+            return f"{path}.{index}{suffix}"
+
+        if not os.path.exists(path):
+            return
+        if self.backup_count <= 0:
+            os.remove(path)
+            return
+
+        for index in range(self.backup_count - 1, 0, -1):
+            source = backup_path(index)
+            if os.path.exists(source):
+                os.replace(source, backup_path(index + 1))
+
+        backup = f"{path}.1" if index_of is None else backup_path(1)
+        os.replace(path, backup)
+        if compress:
+            with open(backup, 'rb') as source, gzip.open(f"{backup}.gz", 'wb') as target:
+                shutil.copyfileobj(source, target)
+            os.remove(backup)
+
+    def _remove_expired_logs(self):
+        """Delete dated logs and their backups older than the retention period."""
+        cutoff = (datetime.now() - timedelta(days=self.retention_days)).strftime("%Y-%m-%d")
+        for path in glob.glob(os.path.join(self.logs_dir, "ai4pkm_*")):
+            date_str = os.path.basename(path)[len("ai4pkm_"):len("ai4pkm_") + 10]
+            if date_str < cutoff:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def _writer_loop(self):
+        """Write queued entries to the file and console until closed."""
+        pending = []
+        pending_records = []
+        last_write = time.monotonic()
+        while True:
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                batch = []
+            while batch and len(batch) < self.MAX_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            entries = [entry for entry in batch if isinstance(entry, tuple)]
+            markers = [entry for entry in batch if not isinstance(entry, tuple)]
+
+            for log_entry, record in entries:
+                pending.append(log_entry)
+                pending_records.append(record)
+                if self.console_output and self.console:
+                    self._display_log_line(self.console, log_entry.rstrip())
+
+            # Write when idle, when the interval elapsed, or when someone waits
+            now = time.monotonic()
+            if pending and (markers or not batch or now - last_write >= self.flush_interval):
+                try:
+                    self._write_entries(pending, pending_records)
+                except OSError as e:
+                    print(f"⚠️  Error writing log file: {e}")
+                pending = []
+                pending_records = []
+                last_write = now
+
+            for marker in markers:
+                if marker is self._STOP:
+                    self._file.close()
+                    self._jsonl_file.close()
+                    self._index_file.close()
+                    return
+                marker.set()
+
+    def flush(self):
+        """Block until every entry logged so far is written and flushed."""
+        if self._closed:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+
+    def close(self):
+        """Write any pending entries and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(self._STOP)
+        self._writer.join()
                 
     def _should_log(self, level):
         """Check if message should be logged based on current log level."""
@@ -64,17 +356,22 @@ class Logger:
         if not self._should_log(level):
             return
             
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        now = datetime.now()
+        timestamp = now.strftime("%Y-%m-%d %H:%M:%S")
         log_entry = f"[{timestamp}] {level}: {message}\n"
-        
-        with self.lock:
-            # Write to file
-            with open(self.log_file, 'a') as f:
-                f.write(log_entry)
-            
-            # Also print to console if enabled
-            if self.console_output and self.console:
-                self._display_log_line(self.console, log_entry.rstrip())
+        record = {
+            "ts": now.isoformat(),
+            "level": level,
+            "component": getattr(self._context, 'component', None),
+            "job": getattr(self._context, 'job', None),
+            "message": str(message),
+        }
+
+        if self._closed:
+            return
+
+        # The writer thread handles the files and the console
+        self._queue.put((log_entry, (now.timestamp(), record)))
                 
     def info(self, message):
         """Log info message."""
@@ -36,23 +36,43 @@ def signal_handler(sig, frame):
 @click.option(
     "-a",
     "--agent",
-    help="Override agent for prompt execution (c/claude, g/gemini, o/codex) - only usable with -p",
+    help="Override agent for prompt or command execution (c/claude, g/gemini, o/codex, r/replay) - only usable with -p or -cmd",
+)
+@click.option(
+    "--serve", "run_server", is_flag=True, help="Run only the web API server (for web_api.mode 'external')"
 )
 @click.option("-d", "--debug", is_flag=True, help="Enable debug logging")
 @click.option(
     "--list-agents", is_flag=True, help="List available AI agents and their status"
 )
 @click.option("--show-config", is_flag=True, help="Show current configuration")
+@click.option(
+    "--stats", "show_stats", is_flag=True, help="Show p50/p95 latency per job and per agent"
+)
+@click.option(
+    "--logs", "show_logs", is_flag=True, help="Show structured log entries (filter with --since/--level/--job)"
+)
+@click.option(
+    "--since", default="7d", help="Time window for --stats and --logs (e.g. 30m, 24h, 7d, 2025-09-01)"
+)
+@click.option("--level", help="Minimum level for --logs (DEBUG, INFO, WARNING, ERROR)")
+@click.option("--job", help="Only show --logs entries for this cron job id")
 def main(
     prompt,
     command,
     arguments,
     test_cron,
     run_cron,
+    run_server,
     agent,
     debug,
     list_agents,
     show_config,
+    show_stats,
+    show_logs,
+    since,
+    level,
+    job,
 ):
     """PKM CLI - Personal Knowledge Management framework."""
     # Set up signal handler for graceful shutdown
@@ -74,10 +94,16 @@ def main(
     elif show_config:
         # Show current configuration
         app.show_config()
-    elif agent and not prompt:
-        # Error: agent option can only be used with prompts
+    elif show_stats:
+        # Show execution latency statistics
+        app.show_stats(since)
+    elif show_logs:
+        # Show structured log entries
+        app.show_logs(since, level, job)
+    elif agent and not (prompt or command):
+        # Error: agent option can only be used with prompts and commands
         click.echo(
-            "❌ Error: The --agent (-a) option can only be used with --prompt (-p)"
+            "❌ Error: The --agent (-a) option can only be used with --prompt (-p) or --command (-cmd)"
         )
         click.echo(
             "   Use 'ai4pkm --show-config' to view/change the default agent in ai4pkm_cli.json"
@@ -88,13 +114,17 @@ def main(
         app.execute_prompt(prompt, agent)
     elif command:
         # Execute the command
-        app.execute_command(command, json.loads(arguments or '{}'))
+        if not app.execute_command(command, json.loads(arguments or '{}'), agent):
+            sys.exit(1)
     elif test_cron:
         # Test a specific cron job
         app.test_cron_job()
     elif run_cron:
         # Run continuously with cron jobs and log display
         app.run_continuous()
+    elif run_server:
+        # Run the web API server on its own
+        app.serve()
     else:
         # Show default information (config and instructions)
         app.show_default_info()
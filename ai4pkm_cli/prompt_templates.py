@@ -0,0 +1,91 @@
+"""Prompt and report template loading and rendering."""
+
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, Any, Optional
+
+# {name} placeholders. Doubled braces such as {{YYYY-MM-DD}} are left alone,
+# since prompts use them as instructions for the agent itself.
+PLACEHOLDER_PATTERN = re.compile(r"(?<!\{)\{([A-Za-z_][A-Za-z0-9_]*)\}(?!\})")
+
+
+class Template:
+    """A template compiled once into literal and placeholder segments.
+
+    Rendering is a single pass over the segments. Placeholders without a
+    value are kept as literal ``{name}`` text, and any other braces in the
+    template are left untouched (unlike ``str.format``).
+    """
+
+    def __init__(self, source: str):
+        """Compile template source."""
+        self.source = source
+        self.segments = []  # (literal text, placeholder name or None)
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(source):
+            self.segments.append((source[position:match.start()], match.group(1)))
+            position = match.end()
+        self.segments.append((source[position:], None))
+        self.placeholders = frozenset(name for _, name in self.segments if name)
+
+    def render(self, params: Optional[Dict[str, Any]] = None) -> str:
+        """Substitute params into the template."""
+        if not params or not self.placeholders:
+            return self.source
+
+        parts = []
+        for literal, name in self.segments:
+            parts.append(literal)
+            if name is not None:
+                parts.append(str(params[name]) if name in params else f"{{{name}}}")
+        return "".join(parts)
+
+
+class TemplateLoader:
+    """Load template files, caching compiled templates by path and mtime."""
+
+    def __init__(self):
+        """Initialize an empty cache."""
+        self._cache = {}  # path -> ((mtime_ns, size), Template)
+        self._lock = threading.Lock()
+
+    def load(self, path: str) -> Template:
+        """Get the compiled template for a file, re-reading it only when it changed.
+
+        Raises OSError if the file cannot be read.
+        """
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._cache.get(path)
+        if cached and cached[0] == stamp:
+            return cached[1]
+
+        with open(path, 'r', encoding='utf-8') as f:
+            template = Template(f.read())
+        with self._lock:
+            self._cache[path] = (stamp, template)
+        return template
+
+
+_loader = TemplateLoader()
+
+
+def load_template(path: str) -> Template:
+    """Load a template file through the shared mtime cache."""
+    return _loader.load(path)
+
+
+@lru_cache(maxsize=256)
+def compile_template(source: str) -> Template:
+    """Compile inline template text, reusing recent compilations."""
+    return Template(source)
+
+
+def render_template(source: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Render inline template text with params."""
+    if not params:
+        return source
+    return compile_template(source).render(params)
@@ -0,0 +1,77 @@
+"""Thread-safe rate limiting for agent calls."""
+
+import asyncio
+import threading
+import time
+from typing import Optional
+
+
+class RateLimiter:
+    """Token bucket allowing ``rate_per_minute`` calls, with bursts of up to ``burst``.
+
+    ``acquire`` blocks the calling thread until a call is allowed, so worker
+    threads sharing one limiter space their calls out evenly. ``aacquire``
+    waits the same way on an event loop.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: Optional[int] = None):
+        """Initialize a full bucket."""
+        self.rate = rate_per_minute / 60.0
+        self.capacity = burst or 1
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Wait until a call is allowed and take its token."""
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def aacquire(self):
+        """Wait on the event loop until a call is allowed and take its token."""
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    def wait_time(self) -> float:
+        """Seconds until a call would be allowed, without taking a token."""
+        with self.lock:
+            self._refill()
+            return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def _take(self) -> float:
+        """Take a token and return 0, or return the seconds to wait for one."""
+        with self.lock:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+    def _refill(self):
+        """Add the tokens earned since the last update. Caller must hold the lock."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(agent_type: str, rate_per_minute: Optional[float]) -> Optional[RateLimiter]:
+    """Get the process-wide limiter for an agent type, or None when it is not limited.
+
+    The rate only applies when the limiter is first created.
+    """
+    if not rate_per_minute:
+        return None
+    with _limiters_lock:
+        if agent_type not in _limiters:
+            _limiters[agent_type] = RateLimiter(rate_per_minute)
+        return _limiters[agent_type]
@@ -5,20 +5,54 @@ import json
 import time
 import os
 import re
+import signal
+import sys
 from flask import Flask, request, jsonify, Response, send_from_directory, abort
 from .config import Config
 from .logger import Logger
 from .agent_factory import AgentFactory
+from .agent_pool import AgentPool, PoolResult
+from .agents import AgentTimeoutError
+from .admission import AdmissionController, AdmissionRejected
+from .http_server import HTTPServer
+from .session_table import SessionTable
+from .log_query import query_logs
+from .utils import parse_since
 
 class Server:
     """Web server for Vapi integration and a web application."""
-    
-    def __init__(self, logger: Logger, config: Config):
-        """Initialize the web server."""
+
+    VOICE_MAX_CHARS = 800  # Aim for ~30 seconds of speech
+
+    def __init__(self, logger: Logger, config: Config, agent=None):
+        """Initialize the web server, sharing the given agent or creating one."""
         self.logger = logger
         self.config = config
         self.port = self.config.get_web_api_port()
-        self.agent = AgentFactory.create_agent(logger, config)
+        self.web_api_config = self.config.get_web_api_config()
+        self.request_timeout = self.web_api_config['request_timeout_seconds']
+        admission_config = self.config.get_web_api_admission_config()
+        self.admission = None
+        if admission_config['enabled']:
+            self.admission = AdmissionController(
+                max_concurrent=admission_config['max_concurrent'],
+                max_queue=admission_config['max_queue'],
+                max_queue_per_client=admission_config['max_queue_per_client'],
+                max_wait=admission_config['max_wait_seconds'],
+            )
+        self.agent = agent or AgentFactory.create_agent(logger, config, pooled=True)
+        sessions_config = self.config.get_web_api_sessions_config()
+        self.sessions = None
+        self.session_agent = None
+        if sessions_config['enabled']:
+            self.sessions = SessionTable(
+                agent_type=sessions_config['agent'],
+                max_entries=sessions_config['max_entries'],
+                ttl=sessions_config['ttl_seconds'],
+                history_turns=sessions_config['history_turns'],
+                history_chars=sessions_config['history_chars'],
+            )
+            self.session_agent = self._find_session_agent(sessions_config['agent'])
 
         base_dir = os.path.dirname(os.path.abspath(__file__))
         self.web_app_dir = os.path.join(base_dir, "web_app")
@@ -27,6 +61,7 @@ class Server:
         
         self._setup_routes()
         
+        self.http_server = None
         self.server_thread = None
         self.is_running = False
     
@@ -92,6 +127,33 @@ class Server:
                 self.logger.error(f"Error processing Gobi log: {e}")
                 return jsonify({"error": "Could not process log file"}), 500
 
+        @self.app.route("/api/logs")
+        def logs():
+            """Query structured logs, e.g. /api/logs?since=1h&level=WARNING&job=dir."""
+            try:
+                since = parse_since(request.args.get("since", "24h"))
+                limit = request.args.get("limit", 200, type=int)
+                records = query_logs(
+                    self.logger.logs_dir,
+                    since=since,
+                    level=request.args.get("level"),
+                    job=request.args.get("job"),
+                    component=request.args.get("component"),
+                    limit=limit,
+                )
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            return jsonify(records)
+
+        @self.app.route("/api/metrics")
+        def metrics():
+            """Admission queue and agent load metrics."""
+            return jsonify({
+                "admission": self.admission.metrics() if self.admission else None,
+                "agents": self.agent.stats() if isinstance(self.agent, AgentPool) else None,
+                "sessions": self.sessions.stats() if self.sessions else None,
+            })
+
         @self.app.route('/files/<path:filepath>')
         def serve_file(filepath):
             """Serve files from the vault root."""
@@ -101,6 +163,8 @@ class Server:
         @self.app.route("/chat/completions", methods=["POST"])
         def chat_completions():
             """Vapi-compatible chat completions endpoint."""
+            ticket = None
+            turn = None
             try:
                 # Get JSON data from request
                 data = request.get_json()
@@ -117,104 +181,74 @@ class Server:
                     
                 message = user_messages[-1].get('content', '')
                 conversation_id = data.get('call', {}).get('id')
+                last_user_index = max(i for i, msg in enumerate(messages) if msg.get('role') == 'user')
                 
                 self.logger.info(f"Received chat completions request: {message[:100]}...")
                 
+                # Wait for a free agent slot, or turn the request away while the queue is full
+                if self.admission is not None:
+                    client = request.headers.get('X-Client-Id') or conversation_id or request.remote_addr
+                    try:
+                        ticket = self.admission.acquire(client)
+                    except AdmissionRejected as e:
+                        self.logger.warning(f"Chat request from {client} rejected ({e.reason}), retry after {e.retry_after}s")
+                        return jsonify({
+                            "error": "The assistant is busy right now. Please try again shortly."
+                        }), 429, {"Retry-After": str(e.retry_after)}
+
+                # Follow-up turns of a call resume its agent session
+                if self.sessions is not None and conversation_id:
+                    turn = self.sessions.begin_turn(conversation_id, messages[:last_user_index])
+
                 # Check if streaming is requested
                 stream = data.get('stream', False)
                 
                 if stream:
                     # Return SSE streaming response
                     def generate_stream():
-                        # Execute the prompt using the configured agent
-                        result = self.agent.run_prompt(inline_prompt=message)
+                        # Forward each chunk the moment the agent produces it
                         created = int(time.time())
+                        chunks = self._stream_turn(message, is_voice, turn)
+                        response_parts = []
+                        spoken_chars = 0
+                        try:
+                            for chunk in chunks:
+                                response_parts.append(chunk)
+                                if is_voice:
+                                    # Clean each chunk for speech and stop once the voice budget is spent
+                                    chunk = self._voice_chunk(chunk, at_start=spoken_chars == 0)
+                                    remaining = self.VOICE_MAX_CHARS - spoken_chars
+                                    if len(chunk) > remaining:
+                                        chunk = self._truncate_for_voice(chunk, remaining)
+                                        if chunk:
+                                            yield self._sse_chunk(conversation_id, created, chunk)
+                                        break
+                                    spoken_chars += len(chunk)
+                                if chunk:
+                                    yield self._sse_chunk(conversation_id, created, chunk)
+                        except AgentTimeoutError as e:
+                            self.logger.error(f"Chat completion cancelled: {e}")
+                        except Exception as e:
+                            self.logger.error(f"Error streaming chat completion: {e}")
+                        finally:
+                            chunks.close()
 
-                        if result and result[0]:
-                            response_text = result[0]
-                            if is_voice:
-                                # Optimize response for voice interaction
-                                response_text = self._optimize_for_voice(response_text)
-                                self.logger.info(f"Generated response (optimized for voice)\n{response_text}")
-                            else:
-                                self.logger.info(f"Generated response: {len(response_text)} characters")
-                            
-                            # Split response into chunks for streaming
-                            words = response_text.split(' ')
-                            chunk_size = 5  # Stream 5 words at a time
-                            
-                            for i in range(0, len(words), chunk_size):
-                                chunk_words = words[i:i + chunk_size]
-                                chunk_text = " ".join(chunk_words)
-                                
-                                # Create SSE chunk in Vapi format
-                                chunk_data = {
-                                    "id": f"resp_{conversation_id}",
-                                    "object": "chat.completion.chunk",
-                                    "created": created,
-                                    "model": "ai4pkm",
-                                    "choices": [{
-                                        "index": 0,
-                                        "delta": {
-                                            "role": "assistant",
-                                            "content": chunk_text + (" " if i + chunk_size < len(words) else "")
-                                        },
-                                        "logprobs": None,
-                                        "finish_reason": None
-                                    }]
-                                }
-                                
-                                yield f"data: {json.dumps(chunk_data)}\n\n"
-                            
-                            # Send final chunk to indicate completion
-                            final_chunk = {
-                                "id": f"resp_{conversation_id}",
-                                "object": "chat.completion.chunk",
-                                "created": created,
-                                "model": "ai4pkm",
-                                "choices": [{
-                                    "index": 0,
-                                    "delta": {},
-                                    "logprobs": None,
-                                    "finish_reason": "stop"
-                                }]
-                            }
-                            yield f"data: {json.dumps(final_chunk)}\n\n"
-                            yield "data: [DONE]\n\n"
+                        response_text = "".join(response_parts)
+                        if turn is not None:
+                            self.sessions.end_turn(turn, message, response_text.strip())
+                        if response_text.strip():
+                            self.logger.info(f"Generated response: {len(response_text)} characters")
                         else:
-                            error_chunk = {
-                                "id": f"resp_{conversation_id}",
-                                "object": "chat.completion.chunk",
-                                "created": created,
-                                "model": "ai4pkm",
-                                "choices": [{
-                                    "index": 0,
-                                    "delta": {
-                                        "role": "assistant",
-                                        "content": "I couldn't find information about that. Could you try asking in a different way?"
-                                    },
-                                    "logprobs": None,
-                                    "finish_reason": None
-                                }]
-                            }
-                            yield f"data: {json.dumps(error_chunk)}\n\n"
-                            
-                            final_chunk = {
-                                "id": f"resp_{conversation_id}",
-                                "object": "chat.completion.chunk",
-                                "created": created,
-                                "model": "ai4pkm",
-                                "choices": [{
-                                    "index": 0,
-                                    "delta": {},
-                                    "logprobs": None,
-                                    "finish_reason": "stop"
-                                }]
-                            }
-                            yield f"data: {json.dumps(final_chunk)}\n\n"
-                            yield "data: [DONE]\n\n"
-                    
-                    return Response(
+                            yield self._sse_chunk(
+                                conversation_id, created,
+                                "I couldn't find information about that. Could you try asking in a different way?"
+                            )
+
+                        # Send final chunk to indicate completion
+                        yield self._sse_chunk(conversation_id, created, finish_reason="stop")
+                        yield "data: [DONE]\n\n"
+
+                    response = Response(
                         generate_stream(),
                         mimetype='text/event-stream',
                         headers={
@@ -224,9 +258,23 @@ class Server:
                             'Access-Control-Allow-Headers': 'Cache-Control'
                         }
                     )
+                    if ticket is not None:
+                        # The slot is held until the stream has been sent or the client went away
+                        response.call_on_close(ticket.release)
+                    if turn is not None:
+                        # Frees the call's session if the client left before the turn was recorded
+                        response.call_on_close(lambda: self.sessions.cancel_turn(turn))
+                    return response
                 else:
                     # Non-streaming response (original behavior)
-                    result = self.agent.run_prompt(inline_prompt=message)
+                    result = None
+                    try:
+                        result = self._run_turn(message, turn)
+                    finally:
+                        if ticket is not None:
+                            ticket.release()
+                        if turn is not None:
+                            self.sessions.end_turn(turn, message, result[0] if result else None)
                     
                     if result and result[0]:
                         response_text = result[0]
@@ -255,11 +303,164 @@ class Server:
                     })
                 
             except Exception as e:
+                if ticket is not None:
+                    ticket.release()
+                if turn is not None:
+                    self.sessions.cancel_turn(turn)
                 self.logger.error(f"Error in chat completions endpoint: {e}")
                 return jsonify({
                     "error": "I'm having trouble processing that request right now. Please try again."
                 }), 500
     
+    def set_agent(self, agent):
+        """Switch to a new agent (e.g. after a config reload); requests in flight finish on the old one."""
+        self.agent = agent
+        if self.sessions is not None:
+            self.session_agent = self._find_session_agent(self.sessions.agent_type)
+
+    def _find_session_agent(self, agent_type: str):
+        """Get the agent whose sessions calls resume, or None if it is not in use.
+
+        A session only exists on the agent that created it, so calls are
+        pinned to this agent rather than routed across the pool.
+        """
+        if isinstance(self.agent, AgentPool):
+            return self.agent.pinned(agent_type)
+        if getattr(self.agent, 'agent_type', None) == agent_type:
+            return self.agent
+        return None
+
+    def _run_turn(self, message: str, turn=None):
+        """Run a chat turn and return the agent's result.
+
+        A turn with a session to resume goes to the session agent. Other
+        turns, and resumes that give no answer, go to the whole agent with
+        the call's history as context.
+        """
+        if turn is not None and turn.session_id and self.session_agent is not None:
+            result = self.session_agent.run_prompt(
+                inline_prompt=message, session_id=turn.session_id,
+                timeout=self.request_timeout, use_cache=False
+            )
+            if result and result[0]:
+                self._note_answer(turn, result, self.session_agent)
+                return result
+            self.logger.warning(f"No response from the session agent for call {turn.call_id}, trying all agents")
+
+        result = self.agent.run_prompt(
+            inline_prompt=message, context=turn.history if turn else None,
+            timeout=self.request_timeout, use_cache=False
+        )
+        if turn is not None and result and result[0]:
+            self._note_answer(turn, result, self.agent)
+        return result
+
+    @staticmethod
+    def _note_answer(turn, result, agent):
+        """Note on a turn which agent answered it, and in which session."""
+        turn.on_agent(result.agent if isinstance(result, PoolResult) else agent)
+        if result[1]:
+            turn.on_session(result[1])
+
+    def _stream_turn(self, message: str, is_voice: bool, turn=None):
+        """Stream a chat turn, resuming the call's session when there is one.
+
+        Turns without a session to resume take the same path as any other
+        request, hedging included, with the call's history as context.
+        """
+        if turn is not None and turn.session_id and self.session_agent is not None:
+            return self._stream_session(message, is_voice, turn)
+        return self._stream_agent(message, is_voice, turn)
+
+    def _stream_session(self, message: str, is_voice: bool, turn):
+        """Stream a turn from the session agent, falling back to all agents if it gives no answer."""
+        chunks = self._stream_from(
+            self.session_agent, turn, inline_prompt=message, session_id=turn.session_id,
+            timeout=self.request_timeout
+        )
+        streamed = False
+        try:
+            for chunk in chunks:
+                streamed = True
+                yield chunk
+        except AgentTimeoutError:
+            raise
+        except Exception as e:
+            if streamed:
+                raise
+            self.logger.warning(f"Session agent failed for call {turn.call_id}: {e}")
+        finally:
+            chunks.close()
+        if streamed:
+            return
+
+        self.logger.warning(f"No response from the session agent for call {turn.call_id}, trying all agents")
+        turn.reset_answer()
+        fallback = self._stream_agent(message, is_voice, turn)
+        try:
+            yield from fallback
+        finally:
+            fallback.close()
+
+    def _stream_agent(self, message: str, is_voice: bool, turn=None):
+        """Stream the agent's answer, hedging voice calls across pooled agents."""
+        context = turn.history if turn else None
+        hedge_after = self.config.get_web_api_hedge_after()
+        if is_voice and hedge_after and isinstance(self.agent, AgentPool):
+            return self.agent.stream_prompt_hedged(
+                inline_prompt=message, hedge_after=hedge_after, timeout=self.request_timeout, context=context,
+                on_session=turn.on_session if turn else None, on_agent=turn.on_agent if turn else None,
+            )
+        return self._stream_from(self.agent, turn, inline_prompt=message, context=context,
+                                 timeout=self.request_timeout)
+
+    @staticmethod
+    def _stream_from(agent, turn, **kwargs):
+        """Stream from an agent, noting on the turn which agent answered and its session."""
+        if turn is None:
+            return agent.stream_prompt(**kwargs)
+        if isinstance(agent, AgentPool):
+            return agent.stream_prompt(on_session=turn.on_session, on_agent=turn.on_agent, **kwargs)
+        turn.on_agent(agent)
+        return agent.stream_prompt(on_session=turn.on_session, **kwargs)
+
+    def _sse_chunk(self, conversation_id, created: int, content: str = None, finish_reason: str = None) -> str:
+        """Format one Vapi-compatible SSE chunk."""
+        delta = {"role": "assistant", "content": content} if content is not None else {}
+        chunk_data = {
+            "id": f"resp_{conversation_id}",
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": "ai4pkm",
+            "choices": [{
+                "index": 0,
+                "delta": delta,
+                "logprobs": None,
+                "finish_reason": finish_reason
+            }]
+        }
+        return f"data: {json.dumps(chunk_data)}\n\n"
+
+    def _voice_chunk(self, text: str, at_start: bool = False) -> str:
+        """Clean one streamed chunk for speech, like _optimize_for_voice but without truncation."""
+        text = text.replace("*", "").replace("_", "").replace("#", "").replace("`", "")
+        text = text.replace("&", "and").replace("@", "at").replace("%", "percent").replace("$", "dollars")
+        # Chunks are spoken back to back, so keep a single space at their edges
+        text = re.sub(r"\s+", " ", text)
+        return text.lstrip() if at_start else text
+
+    def _truncate_for_voice(self, text: str, max_chars: int) -> str:
+        """Cut a chunk to at most max_chars, at a sentence boundary when possible."""
+        if max_chars <= 0:
+            return ""
+        cut = text[:max_chars]
+        boundary = cut.rfind(". ")
+        if boundary >= 0:
+            return cut[:boundary + 1]
+        if cut.endswith("."):
+            return cut
+        return cut[:max(max_chars - 3, 0)].rstrip() + "..."
+
     def _optimize_for_voice(self, text: str) -> str:
         """Optimize text response for voice interaction."""
         # Remove markdown formatting
@@ -299,37 +500,62 @@ class Server:
         if self.is_running:
             self.logger.warning("Web API server is already running")
             return
-        
+
+        try:
+            self.http_server = HTTPServer(
+                self.app,
+                host=self.web_api_config['host'],
+                port=self.port,
+                threads=self.web_api_config['threads'],
+                channel_timeout=self.web_api_config['idle_timeout_seconds'],
+                backend=self.web_api_config['server'],
+            )
+        except Exception as e:
+            self.logger.error(f"Error starting web API server: {e}")
+            return
+
         def run_server():
             """Run the server in a separate thread."""
             try:
-                self.logger.info(f"Starting Web API server on port {self.port}")
-                import logging
-                log = logging.getLogger('werkzeug')
-                log.setLevel(logging.ERROR)
-                
-                self.app.run(
-                    port=self.port,
-                    debug=False,
-                    use_reloader=False,
-                    threaded=True
-                )
+                self.http_server.serve()
             except Exception as e:
-                self.logger.error(f"Error starting web API server: {e}")
-        
-        self.server_thread = threading.Thread(target=run_server, daemon=True)
+                self.logger.error(f"Web API server stopped unexpectedly: {e}")
+            finally:
+                self.is_running = False
+
+        self.logger.info(
+            f"Starting Web API server on port {self.port} "
+            f"({self.http_server.backend}, {self.web_api_config['threads']} threads)"
+        )
+        self.server_thread = threading.Thread(target=run_server, name="web-api", daemon=True)
         self.server_thread.start()
         self.is_running = True
-        
+
+    def serve_forever(self):
+        """Run the web API server in the foreground until interrupted or terminated."""
+        # SIGTERM (e.g. from a process manager) shuts down as gracefully as Ctrl+C
+        signal.signal(signal.SIGTERM, lambda sig, frame: sys.exit(0))
+        self.start_server()
+        try:
+            while self.server_thread is not None and self.server_thread.is_alive():
+                self.server_thread.join(1)
+        finally:
+            self.stop_server()
+
     def stop_server(self):
-        """Stop the web API server."""
-        if not self.is_running:
+        """Stop accepting requests and let the ones in flight finish."""
+        if not self.is_running or self.http_server is None:
             return
-        
-        # Flask server will stop when the thread is terminated
+
+        timeout = self.web_api_config['shutdown_timeout_seconds']
+        self.logger.info(f"Stopping Web API server, waiting up to {timeout}s for requests in flight")
+        if not self.http_server.shutdown(timeout):
+            self.logger.warning("Web API server stopped with requests still in flight")
+        if self.server_thread is not None:
+            self.server_thread.join(5)
         self.is_running = False
         self.logger.info("Web API server stopped")
-    
+
     def is_server_running(self) -> bool:
         """Check if the server is running."""
         return self.is_running
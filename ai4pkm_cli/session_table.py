@@ -0,0 +1,205 @@
+"""Agent sessions for multi-turn chat calls."""
+
+import threading
+import time
+from collections import deque, OrderedDict
+from typing import Dict, Any, Iterable, Optional
+
+
+class CallSession:
+    """Agent session and recent turns of one call."""
+
+    def __init__(self, call_id: str, history_turns: int):
+        self.call_id = call_id
+        self.session_id = None
+        self.turns = deque(maxlen=history_turns)  # (user message, response) pairs
+        self.in_use = False
+        self.last_used = time.monotonic()
+
+
+class SessionTurn:
+    """One turn of a call: the session to resume, else the history to send as context.
+
+    While the turn runs, ``on_agent`` and ``on_session`` note which agent
+    answered and the session it answered in.
+    """
+
+    def __init__(self, call_id: str, session_id: Optional[str], history: Optional[str], claimed: bool):
+        self.call_id = call_id
+        self.session_id = session_id
+        self.history = history
+        self.claimed = claimed
+        self.ended = False
+        self.answer_agent_type = None
+        self.answer_session_id = None
+
+    def on_agent(self, agent):
+        """Note the agent that answered."""
+        self.answer_agent_type = agent.agent_type
+
+    def on_session(self, session_id: str):
+        """Note the session the answer was given in."""
+        self.answer_session_id = session_id
+
+    def reset_answer(self):
+        """Forget a failed attempt before the turn is retried on another agent."""
+        self.answer_agent_type = None
+        self.answer_session_id = None
+
+
+class SessionTable:
+    """Maps call ids to agent sessions so follow-up turns resume a warm session.
+
+    Calls idle for longer than ``ttl`` seconds are dropped, and beyond
+    ``max_entries`` calls the least recently used one is evicted. Each call
+    also keeps its last ``history_turns`` turns, compacted to at most
+    ``history_chars`` characters, as context for agents without sessions
+    and for turns that cannot resume one.
+
+    Only sessions of ``agent_type`` are kept, since only that agent can
+    resume them. Only one turn of a call resumes its session at a time; a
+    turn that overlaps it (e.g. the caller interrupted and resent) starts
+    a new session from the history instead.
+    """
+
+    def __init__(self, agent_type: str = 'claude_code', max_entries: int = 256, ttl: float = 1800,
+                 history_turns: int = 6, history_chars: int = 4000):
+        """Initialize an empty table."""
+        self.agent_type = agent_type
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.history_turns = history_turns
+        self.history_chars = history_chars
+        self.lock = threading.Lock()
+        self.calls = OrderedDict()  # call id -> CallSession, least recently used first
+        self.resumed = 0
+        self.started = 0
+        self.evicted = 0
+
+    def begin_turn(self, call_id: str, earlier_messages: Iterable[Dict[str, Any]] = ()) -> SessionTurn:
+        """Claim a call's session for a turn.
+
+        ``earlier_messages`` (chat messages before the current one) seed the
+        history of a call the table does not know yet, e.g. after a restart.
+        """
+        with self.lock:
+            self._expire()
+            call = self.calls.get(call_id)
+            if call is None:
+                call = CallSession(call_id, self.history_turns)
+                call.turns.extend(self._pair_messages(earlier_messages))
+                self.calls[call_id] = call
+                self._evict()
+            else:
+                self.calls.move_to_end(call_id)
+            call.last_used = time.monotonic()
+
+            claimed = not call.in_use
+            call.in_use = True
+            session_id = call.session_id if claimed else None
+            if session_id:
+                self.resumed += 1
+            else:
+                self.started += 1
+            return SessionTurn(call_id, session_id, self._compact(call.turns), claimed)
+
+    def end_turn(self, turn: SessionTurn, message: str, response: Optional[str]):
+        """Record a finished turn and the agent session to resume next.
+
+        A turn without a response clears the session, so a session that
+        failed to resume is not tried again. So does an answer from another
+        agent, whose session the call's next turn could not resume.
+        """
+        with self.lock:
+            call = self._finish(turn)
+            if call is None:
+                return
+            if response:
+                call.turns.append((message, response))
+            if response and turn.answer_agent_type == self.agent_type:
+                call.session_id = turn.answer_session_id
+            else:
+                call.session_id = None
+
+    def cancel_turn(self, turn: SessionTurn):
+        """Release a turn that was not finished (e.g. the client went away) without recording it."""
+        with self.lock:
+            self._finish(turn)
+
+    def _finish(self, turn: SessionTurn) -> Optional[CallSession]:
+        """Release a turn's claim once, returning its call. Caller must hold the lock."""
+        if turn.ended:
+            return None
+        turn.ended = True
+        call = self.calls.get(turn.call_id)
+        if call is None:
+            return None
+        if turn.claimed:
+            call.in_use = False
+        call.last_used = time.monotonic()
+        self.calls.move_to_end(turn.call_id)
+        return call
+
+    def _expire(self):
+        """Drop calls idle for longer than the TTL. Caller must hold the lock."""
+        cutoff = time.monotonic() - self.ttl
+        for call_id, call in list(self.calls.items()):
+            if call.last_used >= cutoff:
+                break
+            if not call.in_use:
+                del self.calls[call_id]
+
+    def _evict(self):
+        """Drop least recently used calls beyond ``max_entries``. Caller must hold the lock."""
+        for call_id, call in list(self.calls.items()):
+            if len(self.calls) <= self.max_entries:
+                break
+            if not call.in_use:
+                del self.calls[call_id]
+                self.evicted += 1
+
+    @staticmethod
+    def _pair_messages(messages: Iterable[Dict[str, Any]]):
+        """Pair user messages with the assistant reply that follows each."""
+        pairs = []
+        user_message = None
+        for msg in messages:
+            content = msg.get('content')
+            if not isinstance(content, str):
+                continue
+            if msg.get('role') == 'user':
+                user_message = content
+            elif msg.get('role') == 'assistant' and user_message is not None:
+                pairs.append((user_message, content))
+                user_message = None
+        return pairs
+
+    def _compact(self, turns) -> Optional[str]:
+        """Render the most recent turns that fit in ``history_chars``, oldest first."""
+        per_message = max(self.history_chars // 4, 80)
+        lines = []
+        used = 0
+        for message, response in reversed(turns):
+            entry = f"User: {self._clip(message, per_message)}\nAssistant: {self._clip(response, per_message)}"
+            if lines and used + len(entry) > self.history_chars:
+                break
+            lines.append(entry)
+            used += len(entry)
+        if not lines:
+            return None
+        return "Earlier in this conversation:\n" + "\n".join(reversed(lines))
+
+    @staticmethod
+    def _clip(text: str, max_chars: int) -> str:
+        text = " ".join(text.split())
+        return text if len(text) <= max_chars else text[:max_chars - 3].rstrip() + "..."
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the number of tracked calls and how often turns resumed a session."""
+        with self.lock:
+            return {
+                'calls': len(self.calls),
+                'resumed_turns': self.resumed,
+                'cold_turns': self.started,
+                'evicted': self.evicted,
+            }
@@ -1,11 +1,31 @@
 """Common utilities for PKM CLI."""
 
+import re
 import sys
 import termios
 import tty
+from datetime import datetime, timedelta
 from rich.console import Console
 
 
+def parse_since(value):
+    """Parse a relative window like '30m', '24h', '7d' or an ISO date into a datetime."""
+    match = re.fullmatch(r"\s*(\d+)\s*([mhdw])\s*", value or "")
+    if match:
+        amount, unit = int(match.group(1)), match.group(2)
+        delta = {
+            "m": timedelta(minutes=amount),
+            "h": timedelta(hours=amount),
+            "d": timedelta(days=amount),
+            "w": timedelta(weeks=amount),
+        }[unit]
+        return datetime.now() - delta
+    try:
+        return datetime.fromisoformat(value.strip())
+    except (AttributeError, ValueError):
+        raise ValueError(f"Invalid time window: {value}. Use e.g. 30m, 24h, 7d or 2025-09-01")
+
+
 def interactive_select(options, title="Select an option", console=None):
     """Interactive selection menu with arrow key navigation."""
     if console is None:
@@ -0,0 +1,76 @@
+import asyncio
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from ai4pkm_cli.agents import AgentTimeoutError
+from ai4pkm_cli.agents.codex_agent import CodexAgent
+
+
+def test_subprocess_timeout_keeps_partial_output():
+    agent = CodexAgent(MagicMock(), {})
+    # The child sleeps in a grandchild process that must be killed with the group
+    cmd = ["sh", "-c", "echo partial; sleep 30 & wait"]
+
+    started = time.time()
+    with pytest.raises(AgentTimeoutError) as excinfo:
+        asyncio.run(agent._arun_subprocess(cmd, timeout=0.5))
+
+    assert time.time() - started < 10
+    assert excinfo.value.partial_output == "partial"
+    assert excinfo.value.agent_name == "Codex CLI"
+
+
+def test_timeout_falls_back_to_agent_config():
+    agent = CodexAgent(MagicMock(), {"timeout": 42})
+
+    assert agent._resolve_timeout(None, default=300) == 42
+    assert agent._resolve_timeout(5, default=300) == 5
+    assert CodexAgent(MagicMock(), {})._resolve_timeout(None, default=300) == 300
+
+
+def test_subprocesses_run_concurrently_from_one_thread():
+    agent = CodexAgent(MagicMock(), {})
+
+    async def fan_out():
+        return await asyncio.gather(
+            *(agent._arun_subprocess(["sh", "-c", f"sleep 0.5; echo {i}"], timeout=10) for i in range(5))
+        )
+
+    started = time.time()
+    results = asyncio.run(fan_out())
+
+    assert time.time() - started < 2
+    assert [(code, out.strip()) for code, out, _ in results] == [(0, str(i)) for i in range(5)]
+
+
+def test_stream_yields_lines_before_the_process_exits():
+    agent = CodexAgent(MagicMock(), {})
+    cmd = ["sh", "-c", "echo first; sleep 1; echo second"]
+
+    async def first_line():
+        stream = agent._astream_subprocess(cmd, timeout=10)
+        started = time.time()
+        line = await stream.__anext__()
+        elapsed = time.time() - started
+        await stream.aclose()
+        return line, elapsed
+
+    line, elapsed = asyncio.run(first_line())
+
+    assert line == "first\n"
+    assert elapsed < 0.9
+
+
+def test_sync_stream_prompt_forwards_chunks_and_timeouts():
+    agent = CodexAgent(MagicMock(), {})
+    agent._build_codex_command = lambda prompt: ["sh", "-c", "echo one; echo two; sleep 30"]
+
+    chunks = []
+    with pytest.raises(AgentTimeoutError) as excinfo:
+        for chunk in agent.stream_prompt(inline_prompt="hi", timeout=0.5):
+            chunks.append(chunk)
+
+    assert chunks == ["one\n", "two\n"]
+    assert excinfo.value.partial_output == "one\ntwo"
@@ -0,0 +1,53 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from ai4pkm_cli.agents.event_loop import BackgroundLoop
+
+
+@pytest.fixture
+def loop():
+    background = BackgroundLoop(max_concurrency=2)
+    yield background
+    background.stop()
+
+
+def test_coroutines_from_many_threads_share_one_bounded_loop(loop):
+    running = 0
+    peak = 0
+    loop_threads = set()
+
+    async def query():
+        nonlocal running, peak
+        loop_threads.add(threading.current_thread().name)
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+        return "done"
+
+    futures = [loop.submit(query()) for _ in range(6)]
+
+    assert [future.result(5) for future in futures] == ["done"] * 6
+    assert loop_threads == {"agent-event-loop"}
+    assert peak == 2
+
+
+def test_run_timeout_cancels_the_coroutine(loop):
+    cancelled = threading.Event()
+
+    async def slow_query():
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    started = time.time()
+    with pytest.raises(asyncio.TimeoutError):
+        loop.run(slow_query(), timeout=0.1)
+
+    assert cancelled.wait(5)
+    assert time.time() - started < 5
@@ -0,0 +1,42 @@
+import os
+from unittest.mock import MagicMock
+
+from ai4pkm_cli.agents.probe_cache import ProbeCache
+
+
+def make_binary(tmp_path, name="fakecli"):
+    binary = tmp_path / "bin" / name
+    binary.parent.mkdir(exist_ok=True)
+    binary.write_text("#!/bin/sh\necho 1.0\n")
+    binary.chmod(0o755)
+    return binary
+
+
+def test_probe_runs_once_and_is_shared_through_disk(tmp_path, monkeypatch):
+    binary = make_binary(tmp_path)
+    monkeypatch.setenv("PATH", str(binary.parent))
+    cache_file = str(tmp_path / "Cache" / "agent_probes.json")
+    probe = MagicMock(return_value=True)
+
+    assert ProbeCache(cache_file).is_available("fakecli", probe) is True
+    assert ProbeCache(cache_file).is_available("fakecli", probe) is True
+    assert probe.call_count == 1
+
+    # A reinstalled binary has a new mtime and is probed again
+    os.utime(binary, ns=(0, 1_000_000_000))
+    assert ProbeCache(cache_file).is_available("fakecli", probe) is True
+    assert probe.call_count == 2
+
+
+def test_expired_or_missing_commands_are_not_cached(tmp_path, monkeypatch):
+    binary = make_binary(tmp_path)
+    monkeypatch.setenv("PATH", str(binary.parent))
+    cache = ProbeCache(str(tmp_path / "agent_probes.json"), ttl=0)
+    probe = MagicMock(return_value=False)
+
+    assert cache.is_available("fakecli", probe) is False
+    assert cache.is_available("fakecli", probe) is False
+    assert probe.call_count == 2
+
+    assert cache.is_available("not-installed-cli", probe) is False
+    assert probe.call_count == 2
@@ -0,0 +1,97 @@
+import json
+import time
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+from ai4pkm_cli.agent_factory import AgentFactory
+from ai4pkm_cli.agents.replay_agent import ReplayAgent
+from ai4pkm_cli.job_history import JobHistory
+
+FAST = {"latency": {"distribution": "constant", "seconds": 0.0}, "tokens_per_second": 0}
+
+
+def test_replays_recorded_response_in_chunks(tmp_path):
+    corpus = tmp_path / "corpus.jsonl"
+    response = "one two three four five six seven"
+    corpus.write_text(json.dumps({"prompt": "hello", "response": response}) + "\n")
+    agent = ReplayAgent(MagicMock(), dict(FAST, corpus=str(corpus), strict=True))
+
+    chunks = list(agent.stream_prompt(inline_prompt="hello"))
+
+    assert chunks == ["one two three four five ", "six seven"]
+    assert agent.run_prompt(inline_prompt="hello")[0] == response
+    assert agent.run_prompt(inline_prompt="unknown") is None
+
+
+def test_synthetic_responses_follow_latency_token_rate_and_failures(tmp_path):
+    config = {
+        "corpus": str(tmp_path / "missing.jsonl"),
+        "latency": {"distribution": "constant", "seconds": 0.2},
+        "tokens_per_second": 100,
+        "response_tokens": 20,
+    }
+    agent = ReplayAgent(MagicMock(), config)
+
+    started = time.monotonic()
+    text, session_id = agent.run_prompt(inline_prompt="summarize")
+    elapsed = time.monotonic() - started
+
+    assert len(text.split()) == 20
+    assert session_id
+    # 0.2s latency plus 15 tokens after the first chunk at 100 tokens/s
+    assert 0.3 <= elapsed < 1.5
+    assert abs(agent.stats()["simulated_seconds"] - 0.35) < 0.01
+    # The same prompt gets the same synthetic answer
+    assert agent.run_prompt(inline_prompt="summarize")[0] == text
+
+    failing = ReplayAgent(MagicMock(), dict(FAST, failure_rate=1.0))
+    assert failing.run_prompt(inline_prompt="summarize") is None
+
+
+def test_record_mode_appends_source_responses(tmp_path):
+    corpus = tmp_path / "corpus.jsonl"
+    config = MagicMock()
+    config.get_agent_config.return_value = {}
+    agent = ReplayAgent(MagicMock(), {"corpus": str(corpus), "record_from": "codex_cli"})
+    AgentFactory._attach_record_source(MagicMock(), config, agent)
+    assert agent.source.agent_type == "codex_cli"
+
+    async def arun_prompt(*args):
+        return "recorded answer", None
+
+    agent.source = MagicMock(arun_prompt=arun_prompt)
+    assert agent.run_prompt(inline_prompt="hi") == ("recorded answer", None)
+
+    replay = ReplayAgent(MagicMock(), dict(FAST, corpus=str(corpus), strict=True))
+    assert replay.run_prompt(inline_prompt="hi")[0] == "recorded answer"
+
+
+def test_replayed_runs_report_simulated_agent_time_to_history(tmp_path):
+    config = dict(FAST, latency={"distribution": "constant", "seconds": 0.1})
+    agent = ReplayAgent(MagicMock(), config)
+    history = JobHistory(str(tmp_path / "history.db"))
+
+    with history.track("job", "cron", agent=agent.get_agent_name()) as run:
+        result = agent.run_prompt(inline_prompt="summarize")
+        run.success = True
+        run.agent_seconds = result.agent_seconds
+
+    assert result.agent_seconds == 0.1
+    stats = history.stats(datetime.now() - timedelta(minutes=1))[0]
+    assert 0 <= stats["overhead_p50"] < stats["p50"]
+
+
+def test_fallback_replay_agent_keeps_its_record_source(mocker):
+    config = MagicMock()
+    config.get_agent_config.side_effect = lambda agent_type: (
+        {"record_from": "codex_cli"} if agent_type == "replay" else {}
+    )
+    mocker.patch.object(AgentFactory, "AGENT_CLASSES", dict(
+        AgentFactory.AGENT_CLASSES,
+        **{name: MagicMock(return_value=MagicMock(is_available=MagicMock(return_value=False)))
+           for name in ("claude_code", "gemini_cli", "codex_cli")},
+    ))
+
+    agent = AgentFactory._create_fallback_agent(MagicMock(), config, exclude="replay")
+
+    assert isinstance(agent, ReplayAgent) and agent.source is not None
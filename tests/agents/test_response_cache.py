@@ -0,0 +1,69 @@
+import os
+import time
+from unittest.mock import MagicMock
+
+from ai4pkm_cli.agent_pool import AgentPool, PooledAgent
+from ai4pkm_cli.agents.codex_agent import CodexAgent
+from ai4pkm_cli.agents.response_cache import ResponseCache
+
+
+def make_agent(tmp_path, responses):
+    agent = CodexAgent(MagicMock(), {})
+    agent.response_cache = ResponseCache(str(tmp_path / "responses"))
+    calls = []
+
+    async def arun_prompt(inline_prompt=None, *args):
+        calls.append(inline_prompt)
+        return responses.pop(0), None
+
+    agent.arun_prompt = arun_prompt
+    return agent, calls
+
+
+def test_identical_prompt_is_answered_from_cache_until_file_changes(tmp_path):
+    image = tmp_path / "photo.jpg"
+    image.write_bytes(b"first")
+    agent, calls = make_agent(tmp_path, ["crowd", "receipt", "dj_booth"])
+
+    assert agent.run_prompt(inline_prompt="classify", cache_files=[str(image)]) == ("crowd", None)
+    assert agent.run_prompt(inline_prompt="classify", cache_files=[str(image)]) == ("crowd", None)
+    assert len(calls) == 1
+
+    image.write_bytes(b"second")
+    assert agent.run_prompt(inline_prompt="classify", cache_files=[str(image)]) == ("receipt", None)
+    assert agent.run_prompt(inline_prompt="classify", cache_files=[str(image)], use_cache=False) == ("dj_booth", None)
+    assert len(calls) == 3
+
+
+def test_expired_and_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses"), max_bytes=10_000, max_age=60)
+    cache.put("old", "stale")
+    old_path = os.path.join(cache.cache_dir, "old.json")
+    os.utime(old_path, (time.time() - 120, time.time() - 120))
+    cache.put("fresh", "x" * 6_000)
+    cache.put("newest", "y" * 6_000)
+
+    assert not os.path.exists(old_path)
+    assert cache.get("fresh") is None  # Evicted to stay under max_bytes
+    assert cache.get("newest") == "y" * 6_000
+
+
+def test_pool_responses_are_cached_under_the_member_that_answered(tmp_path):
+    members = {}
+    for agent_type in ["claude_code", "codex_cli"]:
+        member = CodexAgent(MagicMock(), {})
+        member.agent_type = agent_type
+
+        async def arun_prompt(inline_prompt=None, *args, agent_type=agent_type):
+            return f"{agent_type} answer", None
+
+        member.arun_prompt = arun_prompt
+        members[agent_type] = member
+    pool = AgentPool(MagicMock(), [PooledAgent(members["claude_code"], 4), PooledAgent(members["codex_cli"], 4)])
+    pool.response_cache = ResponseCache(str(tmp_path / "responses"))
+
+    assert pool.run_prompt(inline_prompt="classify") == ("claude_code answer", None)
+    # A view pinned to another member does not get the answer cached from Claude
+    assert pool.pinned("codex_cli").run_prompt(inline_prompt="classify")[0] == "codex_cli answer"
+    # The unpinned pool takes a cached answer from any member
+    assert pool.run_prompt(inline_prompt="classify") == ("claude_code answer", None)
@@ -0,0 +1,103 @@
+import json
+import os
+import time
+from unittest.mock import MagicMock
+
+from ai4pkm_cli.agent_pool import AgentPool, PooledAgent
+from ai4pkm_cli.commands.process_event_data import InboxWriter, ProcessEventData
+
+
+def make_processor(agent, batch_size=10, parallelism=1, rate_limits=None):
+    config = MagicMock()
+    config.get_event_processing_config.return_value = {
+        "batch_size": batch_size, "sample_head_chars": 20, "sample_tail_chars": 10,
+        "parallelism": parallelism, "rate_limits": rate_limits or {},
+    }
+    return ProcessEventData(MagicMock(), agent, config)
+
+
+def make_inbox(tmp_path, monkeypatch, files):
+    monkeypatch.chdir(tmp_path)
+    inbox = tmp_path / "Events" / "fest" / "_inbox"
+    inbox.mkdir(parents=True)
+    for name, content in files.items():
+        (inbox / name).write_text(content)
+    return tmp_path / "Events" / "fest" / "processed_data"
+
+
+def test_batch_reply_is_parsed_and_missing_files_are_retried(tmp_path, monkeypatch):
+    processed = make_inbox(tmp_path, monkeypatch, {
+        "a.txt": "Alice: hi\nBob: hello" + "x" * 100,
+        "b.txt": "Great event, loved it",
+        "c.txt": "Acme Foods\nBest Tacos",
+    })
+    agent = MagicMock()
+    # The batch reply is wrapped in prose and leaves out one file
+    agent.run_prompt.side_effect = [
+        ('Here you go:\n```json\n{"1": "conversation", "2": "feedback",}\n```', None),
+        ("vendor_list", None),
+    ]
+
+    make_processor(agent).process_files("fest")
+
+    batch_prompt = agent.run_prompt.call_args_list[0].kwargs["inline_prompt"]
+    assert "characters omitted" in batch_prompt
+    assert agent.run_prompt.call_count == 2
+    assert os.listdir(processed / "conversation") == ["a.txt"]
+    assert os.listdir(processed / "feedback") == ["b.txt"]
+    assert os.listdir(processed / "vendor_list") == ["c.txt"]
+
+
+def test_parse_batch_reply_handles_malformed_json():
+    parse = ProcessEventData._parse_batch_reply
+
+    assert parse('{"1": "notes", "2": "feedback"}') == {"1": "notes", "2": "feedback"}
+    assert parse('{"1": "notes", "2": "feed') == {"1": "notes"}
+    assert parse("I could not classify these files.") == {}
+
+
+def test_files_are_classified_concurrently_and_never_overwritten(tmp_path, monkeypatch):
+    processed = make_inbox(tmp_path, monkeypatch, {f"{i}.md": f"note {i}" for i in range(8)})
+    (processed / "notes").mkdir(parents=True)
+    (processed / "notes" / "0.md").write_text("from an earlier run")
+    agent = MagicMock()
+
+    def run_prompt(**kwargs):
+        time.sleep(0.2)
+        return "notes", None
+
+    agent.run_prompt.side_effect = run_prompt
+
+    started = time.monotonic()
+    make_processor(agent, batch_size=1, parallelism=8).process_files("fest")
+
+    assert time.monotonic() - started < 1.2
+    assert sorted(os.listdir(processed / "notes")) == sorted([f"{i}.md" for i in range(8)] + ["0-1.md"])
+    assert (processed / "notes" / "0.md").read_text() == "from an earlier run"
+    assert not os.listdir(tmp_path / "Events" / "fest" / "_inbox")
+
+
+def test_interrupted_run_resumes_from_journal(tmp_path, monkeypatch):
+    processed = make_inbox(tmp_path, monkeypatch, {"a.txt": "Great event"})
+    processed.mkdir(parents=True)
+    entry = {"file": "a.txt", "size": len("Great event"), "category": "feedback", "image": False}
+    (processed.parent / InboxWriter.JOURNAL_NAME).write_text(json.dumps(entry) + "\n")
+    agent = MagicMock()
+
+    make_processor(agent).process_files("fest")
+
+    agent.run_prompt.assert_not_called()
+    assert os.listdir(processed / "feedback") == ["a.txt"]
+    assert InboxWriter.JOURNAL_NAME not in os.listdir(processed)
+
+
+def test_rate_limits_apply_to_each_member_of_a_pool():
+    pool = AgentPool(MagicMock(), [
+        PooledAgent(MagicMock(agent_type="claude_code"), 1), PooledAgent(MagicMock(agent_type="gemini_cli"), 1),
+    ])
+
+    processor = make_processor(pool, rate_limits={"claude_code": 30})
+
+    assert processor.rate_limiter is None
+    assert set(processor.agent.rate_limiters) == {"claude_code"}
+    assert pool.rate_limiters == {}
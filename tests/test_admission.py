@@ -0,0 +1,54 @@
+import threading
+import time
+
+import pytest
+
+from ai4pkm_cli.admission import AdmissionController, AdmissionRejected
+
+
+def test_free_slots_go_to_waiting_clients_in_turn():
+    controller = AdmissionController(max_concurrent=1, max_queue=10, max_queue_per_client=5, max_wait=5)
+    holder = controller.acquire("busy")
+    order = []
+
+    def request(client):
+        ticket = controller.acquire(client)
+        order.append(client)
+        ticket.release()
+
+    threads = []
+    for client in ["busy", "busy", "busy", "quiet"]:
+        thread = threading.Thread(target=request, args=(client,))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.05)
+
+    holder.release()
+    for thread in threads:
+        thread.join(5)
+
+    # The quiet client is served second, not after all of the busy client's requests
+    assert order == ["busy", "quiet", "busy", "busy"]
+    assert controller.metrics()["in_flight"] == 0
+
+
+def test_requests_are_rejected_when_queue_is_full_or_wait_is_too_long():
+    controller = AdmissionController(max_concurrent=1, max_queue=1, max_queue_per_client=1, max_wait=0.2)
+    controller.acquire("a")
+
+    started = time.monotonic()
+    with pytest.raises(AdmissionRejected) as timed_out:
+        controller.acquire("b")
+    assert time.monotonic() - started >= 0.2
+    assert timed_out.value.reason == "wait_timeout"
+
+    waiting = threading.Thread(target=lambda: pytest.raises(AdmissionRejected, controller.acquire, "b"))
+    waiting.start()
+    time.sleep(0.05)
+    with pytest.raises(AdmissionRejected) as full:
+        controller.acquire("c")
+    waiting.join(5)
+
+    assert full.value.reason == "queue_full"
+    assert full.value.retry_after >= 1
+    assert controller.metrics()["rejected"] == {"queue_full": 1, "client_queue_full": 0, "wait_timeout": 2}
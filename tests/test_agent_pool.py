@@ -0,0 +1,165 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+from ai4pkm_cli.agent_pool import AgentPool, PooledAgent, CircuitBreaker, answered_by
+from ai4pkm_cli.agents import BaseAgent
+from ai4pkm_cli.rate_limiter import RateLimiter
+
+
+class FakeAgent(BaseAgent):
+    def __init__(self, agent_type, delay=0.0, fail=False):
+        super().__init__(MagicMock(), {})
+        self.agent_type = agent_type
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.peak = 0
+        self.running = 0
+
+    def is_available(self):
+        return True
+
+    def get_agent_name(self):
+        return self.agent_type
+
+    async def arun_prompt(self, inline_prompt=None, *args):
+        self.calls += 1
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.fail:
+                raise RuntimeError("backend down")
+            return f"{self.agent_type}: {inline_prompt}", None
+        finally:
+            self.running -= 1
+
+
+def test_concurrent_prompts_spread_across_agents_within_caps():
+    claude, gemini = FakeAgent("claude_code", delay=0.2), FakeAgent("gemini_cli", delay=0.2)
+    pool = AgentPool(MagicMock(), [PooledAgent(claude, 2), PooledAgent(gemini, 1)])
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        results = list(executor.map(lambda i: pool.run_prompt(inline_prompt=str(i)), range(6)))
+
+    assert all(result and result[0] for result in results)
+    assert claude.calls + gemini.calls == 6
+    assert gemini.calls >= 1
+    assert claude.peak <= 2 and gemini.peak <= 1
+
+
+def test_failed_agent_fails_over_and_is_deprioritized():
+    broken, healthy = FakeAgent("claude_code", fail=True), FakeAgent("codex_cli")
+    pool = AgentPool(MagicMock(), [PooledAgent(broken, 4), PooledAgent(healthy, 4)])
+
+    result = pool.run_prompt(inline_prompt="hi")
+    assert result == ("codex_cli: hi", None)
+    # History records the member that answered, not the pool
+    assert answered_by(result, pool) == "codex_cli"
+    assert pool.run_prompt(inline_prompt="again") == ("codex_cli: again", None)
+
+    # After one failure the healthy agent is tried first
+    assert broken.calls == 1
+    assert pool.get_member("claude_code").error_rate() == 1.0
+
+
+class StreamingAgent(FakeAgent):
+    def __init__(self, agent_type, first_chunk_delay=0.0):
+        super().__init__(agent_type)
+        self.first_chunk_delay = first_chunk_delay
+        self.cancelled = False
+
+    async def astream_prompt(self, inline_prompt=None, *args):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.first_chunk_delay)
+            yield f"{self.agent_type} says hi."
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+def test_hedged_stream_uses_backup_when_primary_is_slow():
+    slow, fast = StreamingAgent("claude_code", first_chunk_delay=2.0), StreamingAgent("gemini_cli")
+    pool = AgentPool(MagicMock(), [PooledAgent(slow, 4), PooledAgent(fast, 4)])
+
+    chunks = list(pool.stream_prompt_hedged(inline_prompt="hi", hedge_after=0.1))
+
+    assert chunks == ["gemini_cli says hi."]
+    assert slow.cancelled
+    # The cancelled loser is not counted against the primary
+    assert pool.get_member("claude_code").error_rate() == 0.0
+
+
+def test_circuit_breaker_skips_failing_agent_until_reset():
+    broken, healthy = FakeAgent("claude_code", fail=True), FakeAgent("codex_cli")
+    member = PooledAgent(broken, 4, CircuitBreaker(failure_threshold=2, reset_timeout=60))
+    pool = AgentPool(MagicMock(), [member, PooledAgent(healthy, 4)])
+    # Keep the broken agent ranked first, so only the breaker moves it
+    member.score = lambda: 0.0
+
+    for _ in range(4):
+        assert pool.run_prompt(inline_prompt="hi") == ("codex_cli: hi", None)
+
+    assert broken.calls == 2
+    assert member.breaker.state == "open"
+
+    member.breaker.opened_at -= 60
+    broken.fail = False
+    assert pool.run_prompt(inline_prompt="hi") == ("claude_code: hi", None)
+    assert member.breaker.state == "closed"
+
+
+def test_ranking_does_not_claim_the_trial_of_an_agent_that_is_not_called():
+    recovered, healthy = FakeAgent("claude_code"), FakeAgent("codex_cli")
+    member = PooledAgent(recovered, 4, CircuitBreaker(failure_threshold=1, reset_timeout=60))
+    pool = AgentPool(MagicMock(), [member, PooledAgent(healthy, 4)])
+    member.breaker.record_failure()
+    member.breaker.opened_at -= 60
+    # Rank the recovered agent last, so the healthy one takes every call
+    member.score = lambda: 100.0
+
+    for _ in range(10):
+        assert pool.run_prompt(inline_prompt="hi") == ("codex_cli: hi", None)
+
+    assert recovered.calls == 0
+    assert member.breaker.trial_started_at is None and member.breaker.is_allowed()
+
+    member.score = lambda: 0.0
+    assert pool.run_prompt(inline_prompt="hi") == ("claude_code: hi", None)
+    assert member.breaker.state == "closed"
+
+
+def test_rate_limited_view_waits_per_member_and_prefers_agents_that_are_free():
+    claude, gemini = FakeAgent("claude_code"), FakeAgent("gemini_cli")
+    pool = AgentPool(MagicMock(), [PooledAgent(claude, 4), PooledAgent(gemini, 4)])
+    limited = pool.rate_limited({"claude_code": RateLimiter(rate_per_minute=6), "gemini_cli": None})
+
+    for i in range(3):
+        assert limited.run_prompt(inline_prompt=str(i))
+    # Claude's one token goes to the first call; waiting 10s for the next costs more than using Gemini
+    assert claude.calls == 1 and gemini.calls == 2
+
+    # The pool itself is not limited
+    started = time.monotonic()
+    assert pool.pinned("claude_code").run_prompt(inline_prompt="x") == ("claude_code: x", None)
+    assert time.monotonic() - started < 1.0
+
+
+def test_pool_caps_are_not_limited_by_other_agents_on_the_shared_loop():
+    claude, gemini = FakeAgent("claude_code", delay=0.5), FakeAgent("gemini_cli", delay=0.5)
+    pool = AgentPool(MagicMock(), [PooledAgent(claude, 4), PooledAgent(gemini, 4)])
+    # Views with smaller caps use the shared loop first
+    pool.pinned("claude_code").run_prompt(inline_prompt="warm up")
+    pool.pinned("gemini_cli").run_prompt(inline_prompt="warm up")
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda i: pool.run_prompt(inline_prompt=str(i)), range(8)))
+
+    assert all(result and result[0] for result in results)
+    # All eight calls run at once, within the members' caps of 4 each
+    assert time.monotonic() - started < 0.9
+    assert claude.peak <= 4 and gemini.peak <= 4
@@ -0,0 +1,44 @@
+import json
+import os
+
+from ai4pkm_cli.config import Config
+
+
+def write_config(path, data, mtime):
+    path.write_text(json.dumps(data))
+    os.utime(path, (mtime, mtime))
+
+
+def test_instances_share_one_parse_until_the_file_changes(tmp_path, mocker):
+    config_file = tmp_path / "ai4pkm_cli.json"
+    write_config(config_file, {"default-agent": "gemini_cli"}, 1_000_000)
+    load = mocker.spy(json, "load")
+
+    first = Config(str(config_file))
+    second = Config(str(config_file))
+
+    assert first.config is second.config
+    assert load.call_count == 1
+
+    write_config(config_file, {"default-agent": "codex_cli"}, 1_000_060)
+    assert second.refresh() is True
+    assert second.get_agent() == "codex_cli"
+    assert first.get_agent() == "gemini_cli"  # Snapshots are immutable until refreshed
+    assert second.refresh() is False
+
+
+def test_override_and_set_do_not_mutate_shared_snapshot(tmp_path):
+    config_file = tmp_path / "ai4pkm_cli.json"
+    write_config(config_file, {"default-agent": "claude_code", "web_api": {"port": 8000}}, 1_000_000)
+    config = Config(str(config_file))
+    other = Config(str(config_file))
+
+    gemini = config.override("default-agent", "gemini_cli")
+    assert gemini.get_agent() == "gemini_cli"
+    assert config.get_agent() == "claude_code"
+
+    config.set("web_api.port", 9000)
+    assert config.get_web_api_port() == 9000
+    assert other.get_web_api_port() == 8000
+    assert json.loads(config_file.read_text())["web_api"]["port"] == 9000
+    assert json.loads(config_file.read_text())["default-agent"] == "claude_code"
@@ -0,0 +1,212 @@
+import threading
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from ai4pkm_cli.agent_pool import AgentPool, PooledAgent
+from ai4pkm_cli.cron_manager import CronManager
+from ai4pkm_cli.cron_state import CronState
+from ai4pkm_cli.job_history import JobHistory
+
+
+@pytest.fixture
+def make_manager(mocker, tmp_path):
+    """Create a CronManager whose config returns the given jobs."""
+
+    def factory(jobs, catch_up="run_once"):
+        mock_config = MagicMock()
+        mock_config.get_cron_jobs.return_value = jobs
+        mock_config.get_scheduler_max_workers.return_value = 2
+        mock_config.get_scheduler_catch_up.return_value = catch_up
+        mocker.patch("ai4pkm_cli.cron_manager.Config", return_value=mock_config)
+        mocker.patch(
+            "ai4pkm_cli.cron_manager.CronState",
+            return_value=CronState(str(tmp_path / "cron_state.json")),
+        )
+        mocker.patch(
+            "ai4pkm_cli.cron_manager.JobHistory",
+            return_value=JobHistory(str(tmp_path / "history.db")),
+        )
+        return CronManager(MagicMock(), MagicMock())
+
+    return factory
+
+
+def test_schedule_is_ordered_by_next_fire_time(make_manager):
+    jobs = [
+        {"inline_prompt": "daily", "cron": "0 21 * * *"},
+        {"command": "sync-gobi", "cron": "* * * * *"},
+        {"command": "disabled", "cron": "* * * * *", "enabled": False},
+        {"command": "invalid"},
+    ]
+    manager = make_manager(jobs)
+
+    manager._build_schedule()
+    fire_times = manager.get_next_fire_times()
+
+    # Disabled and invalid jobs are never scheduled
+    assert [job["command"] if "command" in job else job["inline_prompt"] for job, _ in fire_times] == [
+        "sync-gobi",
+        "daily",
+    ]
+    assert all(next_fire > datetime.now() for _, next_fire in fire_times)
+
+
+def test_fire_time_after_a_long_pause_applies_catch_up_policy(make_manager):
+    manager = make_manager([{"command": "sync-limitless", "cron": "*/30 * * * *"}])
+    manager._build_schedule()
+
+    # Pretend the machine slept through the last three hours
+    fire_time = manager._schedule[0][0] - timedelta(hours=3)
+    manager._iterators[0].set_current(fire_time)
+
+    assert manager._runs_for_fire(0, fire_time) == 1
+
+    manager.jobs[0]["catch_up"] = "run_all"
+    manager._iterators[0].set_current(fire_time)
+    assert manager._runs_for_fire(0, fire_time) == 6
+
+    manager.jobs[0]["catch_up"] = "skip"
+    manager._iterators[0].set_current(fire_time)
+    assert manager._runs_for_fire(0, fire_time) == 0
+
+    # The iterator resumes at the first window after now
+    manager._schedule.clear()
+    manager._push_next_fire(0)
+    assert datetime.now() < manager._schedule[0][0] <= datetime.now() + timedelta(minutes=30)
+
+
+def test_missed_window_is_restored_from_persisted_state(make_manager):
+    manager = make_manager([{"id": "gdr", "inline_prompt": "GDR", "cron": "0 * * * *"}])
+    missed = datetime.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=2)
+    manager.state.set_next_due("gdr", missed)
+
+    manager._build_schedule()
+
+    assert manager._schedule[0][0] == missed
+
+
+def test_overlapping_run_is_skipped_while_job_is_running(make_manager, mocker):
+    manager = make_manager([{"command": "process_photos", "cron": "0 * * * *"}])
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_job(job):
+        started.set()
+        release.wait(5)
+        return True
+
+    mocker.patch.object(manager, "_execute_job", side_effect=slow_job)
+
+    first = manager._dispatch_job(0)
+    started.wait(5)
+    second = manager._dispatch_job(0)
+    release.set()
+
+    assert first.result(5) is True
+    assert second is None
+    assert manager._execute_job.call_count == 1
+
+
+def test_batch_runs_dependents_after_upstream_jobs(make_manager, mocker):
+    jobs = [
+        {"id": "photos", "command": "process_photos", "cron": "0 * * * *"},
+        {"id": "notes", "command": "process_notes", "cron": "15 * * * *"},
+        {"id": "dir", "inline_prompt": "DIR for today", "cron": "0 21 * * *", "depends_on": ["photos", "notes"]},
+        {"id": "publish", "command": "publish", "after": "dir"},
+    ]
+    manager = make_manager(jobs)
+    finished = []
+
+    def run_job(job):
+        if job["id"] == "dir":
+            assert {"photos", "notes"} <= set(finished)
+        finished.append(job["id"])
+        return True
+
+    mocker.patch.object(manager, "_execute_job", side_effect=run_job)
+
+    assert manager.execute_jobs_batch() == [True, True, True, True]
+    assert finished[2:] == ["dir", "publish"]
+
+
+def test_failed_upstream_job_cancels_downstream(make_manager, mocker):
+    jobs = [
+        {"id": "sync", "command": "sync-gobi", "cron": "* * * * *"},
+        {"id": "dir", "inline_prompt": "DIR for today", "cron": "0 21 * * *", "depends_on": "sync"},
+    ]
+    manager = make_manager(jobs)
+    mocker.patch.object(manager, "_execute_job", side_effect=lambda job: job["id"] != "sync")
+
+    assert manager.execute_jobs_batch() == [False, False]
+    assert manager._execute_job.call_count == 1
+
+
+def test_dependency_cycles_and_unknown_jobs_are_ignored(make_manager):
+    jobs = [
+        {"id": "a", "command": "a", "cron": "* * * * *", "depends_on": ["b"]},
+        {"id": "b", "command": "b", "cron": "* * * * *", "depends_on": ["a"]},
+        {"id": "c", "command": "c", "cron": "* * * * *", "depends_on": ["a", "missing"]},
+    ]
+    manager = make_manager(jobs)
+
+    assert manager._dependencies == {2: [0]}
+
+
+def test_reuse_session_resumes_and_rolls_over(make_manager):
+    job = {"id": "cku", "inline_prompt": "CKU", "cron": "0 * * * *",
+           "reuse_session": True, "session_max_turns": 2}
+    manager = make_manager([job])
+    agent = MagicMock()
+    agent.run_prompt.side_effect = [("done", "s1"), ("done", "s1"), ("done", "s2")]
+
+    for _ in range(3):
+        assert manager._run_job_with_agent("CKU", agent, job=job)
+
+    sent = [call.kwargs["session_id"] for call in agent.run_prompt.call_args_list]
+    # The second run resumes; the third starts fresh after two turns
+    assert sent == [None, "s1", None]
+    stored = manager.state.get("cku")
+    assert stored["session_id"] == "s2" and stored["session_turns"] == 1
+
+
+def test_failed_resume_clears_session(make_manager):
+    job = {"id": "cku", "inline_prompt": "CKU", "cron": "0 * * * *", "reuse_session": True}
+    manager = make_manager([job])
+    agent = MagicMock()
+    agent.run_prompt.side_effect = [("done", "s1"), None, ("done", "s3")]
+
+    assert manager._run_job_with_agent("CKU", agent, job=job)
+    assert not manager._run_job_with_agent("CKU", agent, job=job)
+    assert manager._run_job_with_agent("CKU", agent, job=job)
+
+    sent = [call.kwargs["session_id"] for call in agent.run_prompt.call_args_list]
+    assert sent == [None, "s1", None]
+
+
+def test_session_jobs_are_pinned_to_an_agent_with_sessions(make_manager):
+    job = {"id": "cku", "inline_prompt": "CKU", "cron": "0 * * * *", "reuse_session": True}
+    manager = make_manager([job])
+    gemini = MagicMock(agent_type="gemini_cli", supports_sessions=False)
+    claude = MagicMock(agent_type="claude_code", supports_sessions=True)
+    pool = AgentPool(MagicMock(), [PooledAgent(gemini, 4), PooledAgent(claude, 4)])
+
+    session_agent = manager._session_agent(pool)
+
+    assert [member.agent for member in session_agent.members] == [claude]
+    assert manager._session_agent(gemini) is None
+
+
+def test_reloaded_agent_is_handed_to_others_sharing_it(make_manager, mocker):
+    manager = make_manager([])
+    reloaded = []
+    manager.on_agent_reloaded = reloaded.append
+    manager.config.refresh.return_value = True
+    new_agent = MagicMock()
+    mocker.patch("ai4pkm_cli.cron_manager.AgentFactory.create_agent", return_value=new_agent)
+
+    assert manager._reload_config_if_changed()
+
+    assert manager.default_agent is new_agent
+    assert reloaded == [new_agent]
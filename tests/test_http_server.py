@@ -0,0 +1,45 @@
+import threading
+import time
+import urllib.request
+
+import pytest
+
+from ai4pkm_cli.http_server import HTTPServer, create_waitress_server
+
+BACKENDS = [
+    "werkzeug",
+    pytest.param("waitress", marks=pytest.mark.skipif(create_waitress_server is None, reason="waitress not installed")),
+]
+
+
+def slow_stream_app(environ, start_response):
+    start_response("200 OK", [("Content-Type", "text/plain")])
+
+    def body():
+        for part in (b"first ", b"second"):
+            time.sleep(0.3)
+            yield part
+
+    return body()
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_shutdown_drains_requests_in_flight(backend):
+    server = HTTPServer(slow_stream_app, "127.0.0.1", 0, threads=2, backend=backend)
+    serving = threading.Thread(target=server.serve, daemon=True)
+    serving.start()
+    url = f"http://127.0.0.1:{server.port}/"
+
+    responses = []
+    client = threading.Thread(target=lambda: responses.append(urllib.request.urlopen(url, timeout=5).read()))
+    client.start()
+    time.sleep(0.1)
+
+    assert server.shutdown(timeout=5)
+    client.join(5)
+    serving.join(5)
+
+    assert responses == [b"first second"]
+    assert not serving.is_alive()
+    with pytest.raises(OSError):
+        urllib.request.urlopen(url, timeout=1)
@@ -0,0 +1,103 @@
+import gzip
+import logging
+from datetime import datetime
+
+import pytest
+
+from ai4pkm_cli.log_query import query_logs
+from ai4pkm_cli.logger import Logger
+
+
+@pytest.fixture(autouse=True)
+def info_level():
+    root = logging.getLogger()
+    previous = root.level
+    root.setLevel(logging.INFO)
+    yield
+    root.setLevel(previous)
+
+
+def test_new_logger_appends_instead_of_truncating(tmp_path):
+    log_file = tmp_path / "ai4pkm.log"
+
+    daemon = Logger(log_file=str(log_file), console_output=False)
+    daemon.info("from daemon")
+    daemon.flush()
+
+    one_shot = Logger(log_file=str(log_file), console_output=False)
+    one_shot.info("from one-shot run")
+    one_shot.close()
+    daemon.close()
+
+    content = log_file.read_text()
+    assert "from daemon" in content
+    assert "from one-shot run" in content
+
+
+def test_log_is_rotated_and_compressed_past_max_bytes(tmp_path):
+    log_file = tmp_path / "ai4pkm.log"
+    logger = Logger(log_file=str(log_file), console_output=False, max_bytes=500, backup_count=2)
+
+    for batch in range(4):
+        for line in range(10):
+            logger.info(f"batch {batch} line {line}")
+        logger.flush()
+    logger.close()
+
+    assert sorted(path.name for path in tmp_path.glob("ai4pkm.log*")) == [
+        "ai4pkm.log",
+        "ai4pkm.log.1.gz",
+        "ai4pkm.log.2.gz",
+    ]
+    assert "batch 3" in log_file.read_text()
+    assert "batch 2" in gzip.open(tmp_path / "ai4pkm.log.1.gz", "rt").read()
+    # The structured log and its index rotate in step, and queries read the kept segments in order
+    assert sorted(path.name for path in tmp_path.glob("ai4pkm.jsonl*")) == [
+        "ai4pkm.jsonl",
+        "ai4pkm.jsonl.1.gz",
+        "ai4pkm.jsonl.1.idx",
+        "ai4pkm.jsonl.2.gz",
+        "ai4pkm.jsonl.2.idx",
+        "ai4pkm.jsonl.idx",
+    ]
+    messages = [record["message"] for record in query_logs(str(tmp_path))]
+    assert messages[-1] == "batch 3 line 9"
+    assert messages == sorted(messages)
+
+
+def test_structured_log_can_be_queried_by_time_level_and_job(tmp_path, mocker):
+    logger = Logger(log_file=str(tmp_path / "ai4pkm.log"), console_output=False)
+    mocker.patch.object(Logger, "INDEX_INTERVAL", 0)
+
+    logger.info("before window")
+    logger.flush()
+    since = datetime.now()
+    with logger.context(component="cron", job="dir"):
+        logger.info("dir started")
+        logger.error("dir failed")
+    logger.warning("unrelated warning")
+    logger.close()
+
+    assert (tmp_path / "ai4pkm.jsonl.idx").read_text().strip()
+    messages = [r["message"] for r in query_logs(str(tmp_path), since=since)]
+    assert messages == ["dir started", "dir failed", "unrelated warning"]
+    assert [r["message"] for r in query_logs(str(tmp_path), level="WARNING", job="dir")] == ["dir failed"]
+    assert query_logs(str(tmp_path), since=since, limit=1)[0]["message"] == "unrelated warning"
+
+
+def test_logs_with_brackets_are_shown_as_plain_text(tmp_path, mocker):
+    from rich.console import Console
+    from ai4pkm_cli.cli import PKMApp
+
+    logger = Logger(log_file=str(tmp_path / "ai4pkm.log"), console_output=False)
+    with logger.context(component="cron", job="[dir]"):
+        logger.warning("Skipping job [process_photos]: output in [/tmp] x")
+    logger.close()
+    app = PKMApp.__new__(PKMApp)
+    app.logger = logger
+    app.console = Console(record=True, width=200)
+
+    app.show_logs(since="1h")
+
+    output = app.console.export_text()
+    assert "[dir] Skipping job [process_photos]: output in [/tmp] x" in output
@@ -0,0 +1,26 @@
+import os
+
+from ai4pkm_cli.prompt_templates import Template, TemplateLoader
+
+
+def test_render_fills_known_placeholders_and_keeps_other_braces():
+    template = Template('Report for {event}: {data_sources}\n{unknown} {"json": true} {{YYYY-MM-DD}}')
+
+    rendered = template.render({"event": "Festival", "data_sources": ["a", "b"]})
+
+    assert rendered == "Report for Festival: ['a', 'b']\n{unknown} {\"json\": true} {{YYYY-MM-DD}}"
+    assert template.placeholders == {"event", "data_sources", "unknown"}
+
+
+def test_loader_recompiles_only_when_file_changes(tmp_path):
+    path = tmp_path / "Prompt.md"
+    path.write_text("Hello {name}")
+    os.utime(path, (1_000_000, 1_000_000))
+    loader = TemplateLoader()
+
+    first = loader.load(str(path))
+    assert loader.load(str(path)) is first
+
+    path.write_text("Bye {name}")
+    os.utime(path, (1_000_060, 1_000_060))
+    assert loader.load(str(path)).render({"name": "Ann"}) == "Bye Ann"
@@ -0,0 +1,20 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ai4pkm_cli.rate_limiter import RateLimiter, get_rate_limiter
+
+
+def test_calls_from_many_threads_are_spaced_to_the_rate():
+    limiter = RateLimiter(rate_per_minute=600)  # One call every 0.1s
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda _: limiter.acquire(), range(5)))
+
+    # The first call uses the initial token, the other four wait
+    assert 0.35 <= time.monotonic() - started < 1.0
+
+
+def test_unlimited_agents_get_no_limiter():
+    assert get_rate_limiter("gemini_cli", None) is None
+    assert get_rate_limiter("test_agent", 60) is get_rate_limiter("test_agent", 120)
@@ -0,0 +1,180 @@
+import asyncio
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from ai4pkm_cli.agent_pool import AgentPool, PooledAgent
+from ai4pkm_cli.agents import BaseAgent
+from ai4pkm_cli.config import Config
+from ai4pkm_cli.server import Server
+
+
+@pytest.fixture
+def make_client(mocker, tmp_path):
+    """Create a test client whose agent streams the given chunks."""
+
+    def factory(chunks, admission=None):
+        agent = MagicMock()
+        agent.stream_prompt.side_effect = lambda **kwargs: (chunk for chunk in chunks)
+        mocker.patch("ai4pkm_cli.server.AgentFactory.create_agent", return_value=agent)
+        config = Config(str(tmp_path / "ai4pkm_cli.json"))
+        if admission:
+            config = config.override("web_api.admission", admission)
+        server = Server(MagicMock(), config)
+        return server.app.test_client()
+
+    return factory
+
+
+def streamed_content(response):
+    events = [line[len("data: "):] for line in response.get_data(as_text=True).split("\n\n") if line]
+    assert events[-1] == "[DONE]"
+    deltas = [json.loads(event)["choices"][0]["delta"] for event in events[:-1]]
+    return [delta["content"] for delta in deltas if delta]
+
+
+def test_stream_forwards_each_agent_chunk(make_client):
+    client = make_client(["Hello", " there.\n", "More **text**"])
+
+    response = client.post("/chat/completions", json={
+        "stream": True,
+        "messages": [{"role": "user", "content": "hi"}],
+    })
+
+    assert streamed_content(response) == ["Hello", " there.\n", "More **text**"]
+
+
+def test_voice_stream_cleans_chunks_and_stops_at_budget(make_client):
+    sentence = "This is one spoken sentence. "
+    client = make_client(["# **Title**\n\n"] + [sentence] * 40)
+
+    response = client.post("/chat/completions", json={
+        "stream": True,
+        "call": {"type": "webCall", "id": "call-1"},
+        "messages": [{"role": "user", "content": "hi"}],
+    })
+    content = streamed_content(response)
+
+    assert content[0] == "Title "
+    spoken = "".join(content)
+    assert len(spoken) <= Server.VOICE_MAX_CHARS
+    assert spoken.endswith(".")
+
+
+def test_full_admission_queue_rejects_with_retry_after(make_client):
+    client = make_client(["Hello"], admission={"max_concurrent": 1, "max_queue": 0})
+    request = {"stream": True, "messages": [{"role": "user", "content": "hi"}]}
+
+    # The first stream holds the only slot until it has been sent
+    first = client.post("/chat/completions", json=request, buffered=False)
+    second = client.post("/chat/completions", json=request)
+
+    assert second.status_code == 429
+    assert int(second.headers["Retry-After"]) >= 1
+    first.close()
+
+    third = client.post("/chat/completions", json=request)
+    assert third.status_code == 200
+    third.close()
+    admission = client.get("/api/metrics").get_json()["admission"]
+    assert admission["rejected"]["queue_full"] == 1
+    assert admission["admitted"] == 2 and admission["in_flight"] == 0
+
+
+def make_session_client(mocker, tmp_path, agent_type):
+    """Create a test client whose agent streams one answer and reports a new session per call."""
+    calls = []
+
+    def stream_prompt(on_session=None, **kwargs):
+        calls.append(kwargs)
+        if on_session is not None:
+            on_session(f"sess-{len(calls)}")
+        return (chunk for chunk in ["Answer."])
+
+    agent = MagicMock(agent_type=agent_type)
+    agent.stream_prompt.side_effect = stream_prompt
+    mocker.patch("ai4pkm_cli.server.AgentFactory.create_agent", return_value=agent)
+    server = Server(MagicMock(), Config(str(tmp_path / "ai4pkm_cli.json")))
+    return server.app.test_client(), agent, calls
+
+
+def test_follow_up_turns_of_a_call_resume_the_agent_session(mocker, tmp_path):
+    client, agent, calls = make_session_client(mocker, tmp_path, "claude_code")
+    agent.run_prompt.return_value = ("Spoken answer.", "sess-2")
+    call = {"type": "webCall", "id": "call-1"}
+
+    client.post("/chat/completions", json={
+        "stream": True, "call": call, "messages": [{"role": "user", "content": "hi"}],
+    }).get_data()
+    client.post("/chat/completions", json={
+        "call": call, "messages": [{"role": "user", "content": "and then?"}],
+    })
+    client.post("/chat/completions", json={
+        "stream": True, "call": call, "messages": [{"role": "user", "content": "thanks"}],
+    }).get_data()
+
+    assert "session_id" not in calls[0]
+    assert agent.run_prompt.call_args.kwargs["session_id"] == "sess-1"
+    assert calls[1]["session_id"] == "sess-2" and "context" not in calls[1]
+    assert client.get("/api/metrics").get_json()["sessions"]["resumed_turns"] == 2
+
+
+def test_agents_without_sessions_get_the_call_history_as_context(mocker, tmp_path):
+    client, agent, calls = make_session_client(mocker, tmp_path, "gemini_cli")
+    call = {"type": "webCall", "id": "call-1"}
+    question = {"role": "user", "content": "What is the capital of France?"}
+
+    client.post("/chat/completions", json={"stream": True, "call": call, "messages": [question]}).get_data()
+    client.post("/chat/completions", json={
+        "stream": True, "call": call, "messages": [question, {"role": "user", "content": "Its population?"}],
+    }).get_data()
+
+    assert calls[0]["context"] is None
+    assert "User: What is the capital of France?\nAssistant: Answer." in calls[1]["context"]
+    assert "session_id" not in calls[1]
+
+
+class SessionAgent(BaseAgent):
+    """Streams one sentence after a delay, in a new session per call."""
+
+    def __init__(self, agent_type, first_chunk_delay=0.0):
+        super().__init__(MagicMock(), {})
+        self.agent_type = agent_type
+        self.first_chunk_delay = first_chunk_delay
+        self.calls = 0
+
+    def is_available(self):
+        return True
+
+    def get_agent_name(self):
+        return self.agent_type
+
+    async def arun_prompt(self, *args):
+        return None
+
+    async def astream_prompt(self, inline_prompt=None, prompt_name=None, params=None, context=None,
+                             session_id=None, timeout=None, on_session=None):
+        self.calls += 1
+        on_session(f"{self.agent_type}-session")
+        await asyncio.sleep(self.first_chunk_delay)
+        yield f"{self.agent_type.split('_')[0]} says hi."
+
+
+def test_first_turn_of_a_voice_call_is_hedged(mocker, tmp_path):
+    slow, fast = SessionAgent("claude_code", first_chunk_delay=2.0), SessionAgent("gemini_cli")
+    pool = AgentPool(MagicMock(), [PooledAgent(slow, 4), PooledAgent(fast, 4)])
+    config = Config(str(tmp_path / "ai4pkm_cli.json")).override("web_api.hedge_after_seconds", 0.1)
+    server = Server(MagicMock(), config, agent=pool)
+    client = server.app.test_client()
+
+    response = client.post("/chat/completions", json={
+        "stream": True,
+        "call": {"type": "webCall", "id": "call-1"},
+        "messages": [{"role": "user", "content": "hi"}],
+    })
+
+    assert streamed_content(response) == ["gemini says hi."]
+    assert slow.calls == 1 and fast.calls == 1
+    # The answer came from an agent without resumable sessions, so none is kept for the call
+    assert server.sessions.calls["call-1"].session_id is None
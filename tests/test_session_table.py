@@ -0,0 +1,67 @@
+import time
+from unittest.mock import MagicMock
+
+from ai4pkm_cli.session_table import SessionTable
+
+
+def answer(table, turn, session_id, agent_type="claude_code", message="hi", response="hello"):
+    turn.on_agent(MagicMock(agent_type=agent_type))
+    turn.on_session(session_id)
+    table.end_turn(turn, message, response)
+
+
+def test_follow_up_turn_resumes_the_session_of_its_call():
+    table = SessionTable()
+    first = table.begin_turn("call-1")
+    assert first.session_id is None and first.history is None
+    answer(table, first, "sess-1", message="What is on my list?", response="Three tasks.")
+
+    second = table.begin_turn("call-1")
+    assert second.session_id == "sess-1"
+    # An overlapping turn of the same call does not resume the session, but gets the history
+    overlapping = table.begin_turn("call-1")
+    assert overlapping.session_id is None
+    assert "User: What is on my list?\nAssistant: Three tasks." in overlapping.history
+
+    table.end_turn(second, "And tomorrow?", "")
+    # A turn without an answer clears the session so it is not resumed again
+    assert table.begin_turn("call-1").session_id is None
+    assert table.stats()["resumed_turns"] == 1
+
+
+def test_sessions_of_other_agents_are_not_kept():
+    table = SessionTable(agent_type="claude_code")
+    answer(table, table.begin_turn("call-1"), "replay-session", agent_type="replay")
+
+    assert table.begin_turn("call-1").session_id is None
+
+
+def test_calls_expire_after_ttl_and_least_recently_used_is_evicted():
+    table = SessionTable(max_entries=2, ttl=0.2)
+    for call_id in ["a", "b", "a", "c"]:
+        answer(table, table.begin_turn(call_id), f"sess-{call_id}")
+
+    assert set(table.calls) == {"a", "c"}
+    assert table.stats()["evicted"] == 1
+
+    time.sleep(0.3)
+    assert table.begin_turn("a").session_id is None
+
+
+def test_history_is_seeded_from_earlier_messages_and_compacted():
+    table = SessionTable(history_turns=2, history_chars=400)
+    messages = [
+        {"role": "system", "content": "You are helpful."},
+        {"role": "user", "content": "first question"},
+        {"role": "assistant", "content": "first answer"},
+        {"role": "user", "content": "second question"},
+        {"role": "assistant", "content": "x" * 1000},
+        {"role": "user", "content": "third question"},
+        {"role": "assistant", "content": "third answer"},
+    ]
+
+    history = table.begin_turn("call-1", messages).history
+
+    assert "first question" not in history
+    assert history.index("second question") < history.index("third question")
+    assert "x" * 101 not in history and "..." in history